@@ -0,0 +1,91 @@
+"""Cold-import benchmark for the DynamoDB connection setup.
+
+Each sample runs in a fresh interpreter, so it measures what a Lambda cold start pays.
+Both scenarios import the real handler module; they differ only in how DynamoDB objects are built.
+
+    before  the previous pattern: db_helper built a resource and a client at import time,
+            and the handler module built its own resource and Table objects on top
+    after   the shared connection layer: one session and one resource, created by the first
+            get_table() call a request makes (the low-level client is only built if a code path asks for it)
+
+Usage: python benchmarks/cold_import.py [--runs N] [--handler add-to-cart]
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+API_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Shared prologue: import the handler module the way the Lambda runtime does
+IMPORT_HANDLER = """
+import time, importlib.util
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location('handler_module', 'handler/{handler}.py')
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+imported = time.perf_counter()
+"""
+
+# Legacy module-level setup, reproduced from the handlers and db_helper before the connection layer
+BEFORE = IMPORT_HANDLER + """
+import boto3
+dynamodb = boto3.resource('dynamodb')              # helper/db_helper.py
+dynamodb_client = boto3.client('dynamodb')         # helper/db_helper.py
+handler_dynamodb = boto3.resource('dynamodb')      # handler module
+tables = [handler_dynamodb.Table(name) for name in ('Carts', 'Users', 'Product')]
+connected = time.perf_counter()
+print(imported - start, connected - start)
+"""
+
+# Current setup: create the connection objects the first request needs through helper.connection
+AFTER = IMPORT_HANDLER + """
+from helper.connection import get_table
+tables = [get_table(name) for name in ('Carts', 'Users', 'Product')]
+connected = time.perf_counter()
+print(imported - start, connected - start)
+"""
+
+
+# Function to run one snippet in a fresh interpreter and return (import seconds, ready seconds)
+def run_sample(code):
+    env = dict(os.environ)
+    env.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+    output = subprocess.run(
+        [sys.executable, '-c', code], cwd=API_ROOT, env=env, check=True, capture_output=True, text=True
+    ).stdout.strip().splitlines()[-1]
+    import_seconds, ready_seconds = output.split()
+    return float(import_seconds), float(ready_seconds)
+
+
+# Function to summarize a list of samples in milliseconds
+def summarize(samples):
+    return {
+        'median_ms': round(statistics.median(samples) * 1000, 2),
+        'min_ms': round(min(samples) * 1000, 2),
+        'max_ms': round(max(samples) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=15, help='fresh interpreters per scenario')
+    parser.add_argument('--handler', default='add-to-cart', help='handler module (under handler/) to import')
+    args = parser.parse_args()
+
+    results = {}
+    for name, code in (('before', BEFORE), ('after', AFTER)):
+        code = code.format(handler=args.handler)
+        samples = [run_sample(code) for _ in range(args.runs)]
+        results[name] = {
+            'import': summarize([sample[0] for sample in samples]),
+            'import_and_connect': summarize([sample[1] for sample in samples]),
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
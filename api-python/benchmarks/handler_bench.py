@@ -0,0 +1,302 @@
+"""Per-handler latency, throughput and peak memory against an in-process DynamoDB stand-in.
+
+Every lambda_handler under handler/ is invoked with synthetic API Gateway events built from a
+seeded data set (see benchmarks/local_dynamodb.py), first timed on its own and then again under
+tracemalloc for peak memory. Results are written as JSON, so two commits can be compared:
+
+    python benchmarks/handler_bench.py --output before.json
+    python benchmarks/handler_bench.py --output after.json --compare before.json
+
+Usage: python benchmarks/handler_bench.py [--users N] [--products N] [--cart-lines N] [--orders-per-user N]
+       [--iterations N] [--memory-iterations N] [--handlers a,b] [--output FILE] [--compare FILE] [--threshold PCT]
+"""
+import os
+import sys
+import glob
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+import subprocess
+import tracemalloc
+import contextlib
+import importlib.util
+from datetime import datetime, timezone
+
+API_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from local_dynamodb import LocalAWS, DEFAULT_SCALE, IMPORT_BUCKET, EXPORT_BUCKET, SNAPSHOT_BUCKET  # noqa: E402
+from local_dynamodb import seed, synthetic_products  # noqa: E402
+
+# Products in the file the import-products benchmark ingests on every invocation
+IMPORT_FILE_ROWS = 100
+IMPORT_FILE_KEY = 'bench/products.ndjson'
+# Product snapshot used with --catalog-snapshot (and rebuilt by the build-catalog-snapshot benchmark)
+CATALOG_SNAPSHOT_LOCATION = f's3://{SNAPSHOT_BUCKET}/bench/product.snap'
+# Suggestion snapshot the suggest-products index loads from (written after seeding, as the scheduled builder would)
+SUGGEST_SNAPSHOT_LOCATION = f's3://{SNAPSHOT_BUCKET}/bench/suggest.ndjson'
+
+# Metrics compared by --compare, and whether a larger value is a regression
+COMPARED_METRICS = {'p50_ms': True, 'p95_ms': True, 'p99_ms': True, 'throughput_rps': False, 'peak_memory_kb': True}
+
+
+# Function to wrap a body or query string in an API Gateway HTTP API (v2) event
+def api_event(body=None, query=None):
+    return {
+        'version': '2.0',
+        'headers': {'content-type': 'application/json', 'accept-encoding': 'gzip'},
+        'queryStringParameters': query,
+        'body': json.dumps(body) if body is not None else None,
+        'isBase64Encoded': False,
+    }
+
+
+# Function to wrap an api_event as the router receives it (method and path in the HTTP API v2 request context)
+def routed_event(method, path, body=None, query=None):
+    event = api_event(body, query)
+    event.update({'routeKey': '$default', 'rawPath': path, 'requestContext': {'http': {'method': method, 'path': path}}})
+    return event
+
+
+# Event factories, one per handler: each takes (random generator, seeded ids, iteration number) and returns an event
+SCENARIOS = {
+    'register-user': lambda rng, data, i: api_event({
+        'name': 'Bench User', 'email': f'new-{i}-{rng.randrange(10 ** 9)}@bench.local',
+        'password': 'bench-password', 'shippingAddress': '1 Bench Street'
+    }),
+    'get-user-profile': lambda rng, data, i: api_event(query={'userId': rng.choice(data['user_ids'])}),
+    'update-profile': lambda rng, data, i: api_event({
+        'userId': rng.choice(data['user_ids']), 'updatedName': f'User {i}', 'updatedShippingAddress': f'{i} Bench Road'
+    }),
+    'create-product': lambda rng, data, i: api_event({
+        'productId': f'created-{i}-{rng.randrange(10 ** 9)}', 'name': f'Created {i}', 'category': 'Category 1',
+        'subcategory': 'Subcategory 1', 'price': 19.99, 'keywords': f'item{i % 1000} created bench'
+    }),
+    'import-products': lambda rng, data, i: {'Records': [
+        {'s3': {'bucket': {'name': IMPORT_BUCKET}, 'object': {'key': IMPORT_FILE_KEY}}}
+    ]},
+    'search-products': lambda rng, data, i: api_event(query={
+        'keywords': f'item{rng.randrange(1000)} bench', 'category': f'Category {rng.randrange(20)}',
+        'minPrice': '1', 'maxPrice': '600', 'match': rng.choice(['all', 'any'])
+    }),
+    # Autocomplete as the user types: growing prefixes of a keyword, sometimes after a complete word
+    'suggest-products': lambda rng, data, i: api_event(query={
+        'q': ('bench ' if i % 3 == 0 else '') + f'item{rng.randrange(1000)}'[:1 + i % 7]
+    }),
+    'get-product': lambda rng, data, i: api_event(query={'productId': rng.choice(data['product_ids'])}),
+    # Alternate single-line adds with five-line batch adds
+    'add-to-cart': lambda rng, data, i: api_event({
+        'userId': rng.choice(data['user_ids']), 'productId': rng.choice(data['product_ids']), 'quantity': rng.randint(1, 3)
+    } if i % 2 == 0 else {
+        'userId': rng.choice(data['user_ids']),
+        'items': [{'productId': product_id, 'quantity': rng.randint(1, 3)} for product_id in rng.sample(data['product_ids'], 5)]
+    }),
+    # Bulk removal: a single-product delete of a row that is not in the cart is a 404 by design
+    'remove-from-cart': lambda rng, data, i: api_event({
+        'userId': rng.choice(data['user_ids']), 'productIds': rng.sample(data['product_ids'], 5)
+    }),
+    'clear-cart': lambda rng, data, i: api_event(query={'userId': rng.choice(data['user_ids'])}),
+    'get-cart': lambda rng, data, i: api_event(query={'userId': rng.choice(data['user_ids'])}),
+    'checkout': lambda rng, data, i: api_event({
+        'userId': rng.choice(data['user_ids']), 'shippingAddress': '1 Bench Street', 'paymentMethod': 'card',
+        'cartItems': [{'productId': product_id, 'quantity': 1} for product_id in rng.sample(data['product_ids'], 3)]
+    }),
+    'get-order-history': lambda rng, data, i: api_event(query={'userId': rng.choice(data['user_ids']), 'limit': '20'}),
+    'order-tracking': lambda rng, data, i: api_event(query={'orderId': rng.choice(data['order_ids'])}),
+    'export-orders': lambda rng, data, i: api_event(query={'userId': rng.choice(data['user_ids']), 'segments': str(1 + i % 4)}),
+    'build-catalog-snapshot': lambda rng, data, i: {},
+    'build-suggest-snapshot': lambda rng, data, i: {},
+    'get-order-summary': lambda rng, data, i: api_event(query={'userId': rng.choice(data['user_ids'])}),
+    # Single-function entry point: alternate read routes so dispatch and lazy handler loading are both measured
+    'router': lambda rng, data, i: [
+        lambda: routed_event('GET', '/api/profile', query={'userId': rng.choice(data['user_ids'])}),
+        lambda: routed_event('GET', '/api/cart', query={'userId': rng.choice(data['user_ids'])}),
+        lambda: routed_event('GET', f"/api/orders/{rng.choice(data['order_ids'])}/status"),
+    ][i % 3](),
+}
+
+
+# Function to import a handler module from its (hyphenated) file name
+def load_handler(name):
+    spec = importlib.util.spec_from_file_location(name.replace('-', '_'), os.path.join(API_ROOT, 'handler', f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.lambda_handler
+
+
+# Function to list the handlers under handler/ by name
+def discover_handlers():
+    return sorted(os.path.splitext(os.path.basename(path))[0] for path in glob.glob(os.path.join(API_ROOT, 'handler', '*.py')))
+
+
+# Function to tell whether a handler result is a success (API responses by status code, S3 imports by their reports)
+def succeeded(result):
+    if 'statusCode' in result:
+        return 200 <= result['statusCode'] < 400
+    return not any('error' in report for report in result.get('imports', []))
+
+
+# Function to call a handler once per event, returning the per-call latencies (seconds) and the number of failures
+def run_events(handler, events):
+    latencies = []
+    failures = 0
+    for event in events:
+        start = time.perf_counter()
+        result = handler(event, None)
+        latencies.append(time.perf_counter() - start)
+        failures += not succeeded(result)
+    return latencies, failures
+
+
+# Function to benchmark one handler: a warm-up, a timed pass and a tracemalloc pass for peak memory
+def bench_handler(name, handler, data, args):
+    rng = random.Random(f'{args.seed}-{name}')
+    make_event = SCENARIOS[name]
+    events = [make_event(rng, data, i) for i in range(args.warmup + args.iterations + args.memory_iterations)]
+    warmup, timed, traced = (events[:args.warmup], events[args.warmup:args.warmup + args.iterations],
+                             events[args.warmup + args.iterations:])
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):  # Handlers log errors and reports with print
+        run_events(handler, warmup)
+        started = time.perf_counter()
+        latencies, failures = run_events(handler, timed)
+        elapsed = time.perf_counter() - started
+
+        tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            run_events(handler, traced)
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    cuts = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+    return {
+        'iterations': len(latencies),
+        'failures': failures,
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+        'p50_ms': round(cuts[49] * 1000, 3),
+        'p95_ms': round(cuts[94] * 1000, 3),
+        'p99_ms': round(cuts[98] * 1000, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'peak_memory_kb': round(peak_bytes / 1024, 1),
+    }
+
+
+# Function to describe the run, so result files say what they measured
+def run_metadata(args):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=API_ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scale': {'users': args.users, 'products': args.products, 'cart_lines': args.cart_lines,
+                  'orders_per_user': args.orders_per_user},
+        'iterations': args.iterations,
+        'memory_iterations': args.memory_iterations,
+        'seed': args.seed,
+        'catalog_snapshot': args.catalog_snapshot,
+    }
+
+
+# Function to print the change of every metric against a baseline; returns the regressions above the threshold
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f"{'handler':<20}" + ''.join(f'{metric:>22}' for metric in COMPARED_METRICS))
+    for name, metrics in results['handlers'].items():
+        before = baseline.get('handlers', {}).get(name)
+        if not before:
+            print(f'{name:<20}  (not in baseline)')
+            continue
+        cells = []
+        for metric, higher_is_worse in COMPARED_METRICS.items():
+            old, new = before.get(metric), metrics[metric]
+            if not old:
+                cells.append(f'{new:>22}')
+                continue
+            change = (new - old) / old * 100
+            cells.append(f'{old:>9} -> {new:<8}{change:+.0f}%'.rjust(22))
+            if (change if higher_is_worse else -change) > threshold:
+                regressions.append(f'{name} {metric}: {old} -> {new} ({change:+.1f}%)')
+        print(f'{name:<20}' + ''.join(cells))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=DEFAULT_SCALE['users'])
+    parser.add_argument('--products', type=int, default=DEFAULT_SCALE['products'])
+    parser.add_argument('--cart-lines', type=int, default=DEFAULT_SCALE['cart_lines'])
+    parser.add_argument('--orders-per-user', type=int, default=DEFAULT_SCALE['orders_per_user'])
+    parser.add_argument('--iterations', type=int, default=200, help='timed invocations per handler')
+    parser.add_argument('--warmup', type=int, default=20, help='untimed invocations per handler before timing')
+    parser.add_argument('--memory-iterations', type=int, default=20, help='invocations per handler under tracemalloc')
+    parser.add_argument('--handlers', help='comma-separated handler names (default: every handler under handler/)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--catalog-snapshot', action='store_true',
+                        help='serve product reads from a memory-mapped catalog snapshot built after seeding')
+    parser.add_argument('--output', help='write the JSON results to this file')
+    parser.add_argument('--compare', help='baseline JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=10.0, help='regression threshold in percent for --compare')
+    args = parser.parse_args()
+
+    names = args.handlers.split(',') if args.handlers else discover_handlers()
+    if not args.catalog_snapshot and 'build-catalog-snapshot' in names:
+        if args.handlers:
+            parser.error('build-catalog-snapshot needs --catalog-snapshot')
+        names.remove('build-catalog-snapshot')  # Without a snapshot location the handler has nothing to do
+    missing = [name for name in names if name not in SCENARIOS]
+    if missing:
+        parser.error(f"no benchmark scenario for handler(s): {', '.join(missing)}")
+
+    results = {'meta': run_metadata(args), 'handlers': {}}
+    with LocalAWS():
+        os.environ['ORDER_EXPORT_BUCKET'] = EXPORT_BUCKET  # Exports go to the S3 stand-in rather than local files
+        data = seed(args.users, args.products, args.cart_lines, args.orders_per_user, seed_value=args.seed)
+
+        from helper.connection import get_s3_client
+        products_file = ''.join(json.dumps(row) + '\n' for _, row in synthetic_products(IMPORT_FILE_ROWS, prefix='imported'))
+        get_s3_client().put_object(Bucket=IMPORT_BUCKET, Key=IMPORT_FILE_KEY, Body=products_file.encode('utf-8'))
+
+        # Set before any handler imports helper.suggest, which reads it once
+        os.environ['SUGGEST_SNAPSHOT'] = SUGGEST_SNAPSHOT_LOCATION
+        load_handler('build-suggest-snapshot')({}, None)
+
+        if args.catalog_snapshot:
+            # Set before any handler imports helper.catalog_snapshot, which reads it once
+            os.environ['CATALOG_SNAPSHOT'] = CATALOG_SNAPSHOT_LOCATION
+            load_handler('build-catalog-snapshot')({}, None)
+
+        for name in names:
+            results['handlers'][name] = bench_handler(name, load_handler(name), data, args)
+            print(f"{name:<20} p50 {results['handlers'][name]['p50_ms']:>8} ms  "
+                  f"p99 {results['handlers'][name]['p99_ms']:>8} ms  "
+                  f"{results['handlers'][name]['throughput_rps']:>8} req/s", file=sys.stderr)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(output + '\n')
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.threshold)
+        if regressions:
+            print('Regressions above {:.0f}%:\n  {}'.format(args.threshold, '\n  '.join(regressions)))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""Bulk product import throughput against a local DynamoDB stand-in.
+
+Generates synthetic products in memory and runs them through helper.product_import, so the number
+reported is the pipeline's own throughput (validation, keyword indexing, parallel batch writes).
+
+    docker run -p 8000:8000 amazon/dynamodb-local
+    python benchmarks/import_throughput.py --rows 50000 --workers 8 --create-tables
+
+Usage: python benchmarks/import_throughput.py [--rows N] [--workers N] [--chunk-size N] [--endpoint-url URL]
+"""
+import os
+import sys
+import json
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from local_dynamodb import create_tables, synthetic_products  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--chunk-size', type=int, default=500)
+    parser.add_argument('--endpoint-url', default=os.environ.get('DYNAMODB_ENDPOINT_URL', 'http://localhost:8000'))
+    parser.add_argument('--create-tables', action='store_true', help='create Product and ProductKeywords if missing')
+    args = parser.parse_args()
+
+    os.environ['DYNAMODB_ENDPOINT_URL'] = args.endpoint_url
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+    from helper.product_import import import_products
+    if args.create_tables:
+        create_tables(['Product', 'ProductKeywords'])
+
+    report = import_products(synthetic_products(args.rows), workers=args.workers, chunk_size=args.chunk_size)
+    print(json.dumps({key: value for key, value in report.items() if key != 'rejects'}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""In-process DynamoDB (and S3) stand-in for local benchmarks, plus synthetic data at configurable scale.
+
+Built on moto, so every call still goes through boto3/botocore (request building, serialization,
+retries) exactly as in Lambda; only the network and the service itself are replaced. Absolute
+latencies are therefore not DynamoDB latencies, but they are comparable between commits.
+
+    pip install -r benchmarks/requirements.txt
+"""
+import os
+import sys
+import random
+from decimal import Decimal
+from datetime import datetime, timedelta
+
+API_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if API_ROOT not in sys.path:
+    sys.path.insert(0, API_ROOT)
+
+# Key schema, global secondary indexes and non-string key types of every table the handlers use (mirrors serverless.yml)
+TABLES = {
+    'Users': {'keys': [('userId', 'HASH')]},
+    'Product': {
+        'keys': [('productId', 'HASH')],
+        'indexes': {
+            'CategoryPriceIndex': [('categoryIndexKey', 'HASH'), ('price', 'RANGE')],
+            'SubcategoryPriceIndex': [('subcategoryIndexKey', 'HASH'), ('price', 'RANGE')],
+        },
+        'types': {'price': 'N'},  # Attribute types other than S
+    },
+    'ProductKeywords': {'keys': [('token', 'HASH'), ('productKey', 'RANGE')]},
+    'Carts': {'keys': [('userId', 'HASH'), ('productId', 'RANGE')]},
+    'Orders': {
+        'keys': [('userId', 'HASH'), ('orderId', 'RANGE')],
+        'indexes': {'OrderIndex': [('orderId', 'HASH')]},
+        'projections': {'OrderIndex': ['orderStatus', 'orderDate']},  # INCLUDE projection; ALL when not listed
+    },
+    'OrderSummaries': {'keys': [('userId', 'HASH')]},
+    'IdempotencyKeys': {'keys': [('idempotencyKey', 'HASH')]},
+}
+
+# Bucket the product import handler reads from, the one order exports are written to, and the catalog snapshot bucket
+IMPORT_BUCKET = 'api-python-product-imports'
+EXPORT_BUCKET = 'api-python-order-exports'
+SNAPSHOT_BUCKET = 'api-python-catalog-snapshots'
+
+# Default scale of the synthetic data set
+DEFAULT_SCALE = {'users': 200, 'products': 2000, 'cart_lines': 5, 'orders_per_user': 30}
+
+# Stock given to products that track it; large enough that benchmark checkouts never run out
+BENCH_STOCK = 10 ** 9
+
+
+# Function to build the key schema arguments of create_table / a global secondary index
+def _key_schema(keys):
+    return [{'AttributeName': attribute, 'KeyType': key_type} for attribute, key_type in keys]
+
+
+# Function to create tables (all of TABLES by default) if they do not exist yet
+def create_tables(names=None):
+    from helper.connection import get_client
+    client = get_client()
+    existing = set(client.list_tables()['TableNames'])
+    for name in names or TABLES:
+        if name in existing:
+            continue
+        definition = TABLES[name]
+        attributes = dict(definition['keys'])
+        for index_keys in definition.get('indexes', {}).values():
+            attributes.update(dict(index_keys))
+        params = {
+            'TableName': name,
+            'KeySchema': _key_schema(definition['keys']),
+            'AttributeDefinitions': [
+                {'AttributeName': attribute, 'AttributeType': definition.get('types', {}).get(attribute, 'S')}
+                for attribute in attributes
+            ],
+            'BillingMode': 'PAY_PER_REQUEST',
+        }
+        if definition.get('indexes'):
+            projections = definition.get('projections', {})
+            params['GlobalSecondaryIndexes'] = [{
+                'IndexName': index_name,
+                'KeySchema': _key_schema(index_keys),
+                'Projection': ({'ProjectionType': 'INCLUDE', 'NonKeyAttributes': projections[index_name]}
+                               if index_name in projections else {'ProjectionType': 'ALL'})
+            } for index_name, index_keys in definition['indexes'].items()]
+        client.create_table(**params)
+        client.get_waiter('table_exists').wait(TableName=name)
+
+
+# Context manager that starts the in-process AWS stand-in with every table and the import bucket created
+class LocalAWS:
+    def __init__(self, region='us-east-1'):
+        self.region = region
+        self._mock = None
+        self._saved_environ = None
+
+    def __enter__(self):
+        from moto import mock_aws
+        from helper.connection import reset_connections, get_s3_client
+
+        self._saved_environ = dict(os.environ)
+        os.environ.pop('DYNAMODB_ENDPOINT_URL', None)  # Point the connection layer at the stand-in, not DynamoDB Local
+        os.environ['AWS_DEFAULT_REGION'] = self.region
+        self._mock = mock_aws()
+        self._mock.start()
+        reset_connections()  # Drop clients created before the mock was started
+
+        create_tables()
+        get_s3_client().create_bucket(Bucket=IMPORT_BUCKET)
+        get_s3_client().create_bucket(Bucket=EXPORT_BUCKET)
+        get_s3_client().create_bucket(Bucket=SNAPSHOT_BUCKET)
+        return self
+
+    def __exit__(self, *exc_info):
+        from helper.connection import reset_connections
+        self._mock.stop()
+        reset_connections()
+        os.environ.clear()
+        os.environ.update(self._saved_environ)
+        return False
+
+
+# Generator that yields synthetic (line number, row) pairs shaped like an NDJSON product import file
+def synthetic_products(count, start=1, prefix='bench'):
+    for number in range(start, start + count):
+        row = {
+            'productId': f'{prefix}-{number}',
+            'name': f'Product {number}',
+            'category': f'Category {number % 20}',
+            'subcategory': f'Subcategory {number % 100}',
+            'price': round(1 + (number % 5000) / 7, 2),
+            'keywords': f'item{number % 1000} group{number % 50} bench',
+        }
+        if number % 2 == 0:
+            row['stock'] = BENCH_STOCK  # Half the catalog tracks stock, so checkout exercises both paths
+        yield number, row
+
+
+# Function to seed users, products (with their keyword index), carts, orders and order summaries; returns the ids it created
+def seed(users=DEFAULT_SCALE['users'], products=DEFAULT_SCALE['products'], cart_lines=DEFAULT_SCALE['cart_lines'],
+         orders_per_user=DEFAULT_SCALE['orders_per_user'], seed_value=0):
+    from helper.db_helper import batch_write_items
+    from helper.product_import import import_products
+
+    rng = random.Random(seed_value)
+    user_ids = [f'user-{number}@bench.local' for number in range(users)]
+    product_ids = [f'bench-{number}' for number in range(1, products + 1)]
+
+    batch_write_items('Users', put_items=[{
+        'userId': user_id, 'name': f'User {number}', 'email': user_id,
+        'password': 'bench-password', 'shippingAddress': f'{number} Bench Street'
+    } for number, user_id in enumerate(user_ids)])
+
+    report = import_products(synthetic_products(products))
+    if report['failedChunks'] or report['rejected']:
+        raise RuntimeError(f"Seeding products failed: {report}")
+
+    cart_items = []
+    for user_id in user_ids:
+        for product_id in rng.sample(product_ids, min(cart_lines, len(product_ids))):
+            cart_items.append({'userId': user_id, 'productId': product_id, 'quantity': rng.randint(1, 3)})
+    batch_write_items('Carts', put_items=cart_items)
+
+    order_ids = []
+    orders = []
+    first_order_date = datetime(2024, 1, 1)
+    for user_id in user_ids:
+        for number in range(orders_per_user):
+            order_id = f'order-{user_id}-{number}'
+            order_ids.append(order_id)
+            lines = [{'productId': product_id, 'quantity': 1} for product_id in rng.sample(product_ids, 2)]
+            orders.append({
+                'orderId': order_id, 'userId': user_id, 'shippingAddress': 'Bench Street',
+                'paymentMethod': 'card', 'cartItems': lines, 'orderStatus': rng.choice(['Placed', 'Shipped', 'Delivered']),
+                'orderDate': (first_order_date + timedelta(hours=rng.randint(0, 24 * 365))).isoformat(),
+                'totalAmount': Decimal(str(round(rng.uniform(5, 500), 2))),
+            })
+    batch_write_items('Orders', put_items=orders)
+
+    # Summaries as checkout would have maintained them for the seeded orders
+    summaries = {}
+    for order in orders:
+        summary = summaries.setdefault(order['userId'], {'userId': order['userId'], 'orderCount': 0, 'totalSpent': Decimal(0)})
+        summary['orderCount'] += 1
+        summary['totalSpent'] += order['totalAmount']
+        if order['orderDate'] > summary.get('lastOrderDate', ''):
+            summary['lastOrderId'], summary['lastOrderDate'] = order['orderId'], order['orderDate']
+        summary['firstOrderDate'] = min(summary.get('firstOrderDate', order['orderDate']), order['orderDate'])
+    batch_write_items('OrderSummaries', put_items=list(summaries.values()))
+
+    return {'user_ids': user_ids, 'product_ids': product_ids, 'order_ids': order_ids}
@@ -0,0 +1,296 @@
+"""Local HTTP server that runs the handlers in-process, for load testing the real Python code paths.
+
+Each HTTP request is translated into an API Gateway HTTP API (v2) event and dispatched through the
+single-function router (helper.routing) on a pool of worker threads, the way a warm Lambda
+container would run it. Concurrency is bounded like a Lambda reserved concurrency:
+
+    --max-concurrency   invocations running at once (default: --workers)
+    --max-pending       requests allowed to wait for a free slot; beyond that the server answers
+                        429, as API Gateway does when Lambda throttles
+
+Run against DynamoDB Local, or against the in-process stand-in seeded with synthetic data:
+
+    python benchmarks/local_server.py --endpoint-url http://localhost:8000
+    python benchmarks/local_server.py --stand-in --users 500 --products 5000
+
+GET /__stats returns the request, throttle and in-flight counters.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import base64
+import signal
+import asyncio
+import argparse
+from urllib.parse import parse_qsl, unquote
+from datetime import datetime, timezone
+from http import HTTPStatus
+from concurrent.futures import ThreadPoolExecutor
+
+API_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Largest request body accepted (API Gateway's payload limit)
+MAX_BODY_BYTES = 10 * 1024 * 1024
+# Seconds an idle keep-alive connection stays open
+KEEP_ALIVE_TIMEOUT = 5
+# Content types whose bodies API Gateway passes through as text; everything else is base64-encoded
+TEXT_CONTENT_TYPES = ('text/', 'application/json', 'application/xml', 'application/x-www-form-urlencoded')
+
+
+# Error raised for requests the server cannot parse, answered with the given status code
+class BadRequest(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# Minimal stand-in for the Lambda context object the handlers receive
+class LocalContext:
+    def __init__(self, function_name, timeout_seconds):
+        self.function_name = function_name
+        self.function_version = '$LATEST'
+        self.memory_limit_in_mb = 1024
+        self.aws_request_id = str(uuid.uuid4())
+        self._deadline = time.monotonic() + timeout_seconds
+
+    def get_remaining_time_in_millis(self):
+        return max(0, int((self._deadline - time.monotonic()) * 1000))
+
+
+# Function to read one HTTP/1.1 request; returns (method, target, version, headers as (name, value) pairs, body)
+async def read_request(reader):
+    request_line = await reader.readline()
+    if not request_line:
+        return None  # Client closed the connection
+    try:
+        method, target, version = request_line.decode('latin-1').strip().split(' ', 2)
+    except ValueError:
+        raise BadRequest(400, 'Malformed request line')
+
+    headers = []
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers.append((name.strip().lower(), value.strip()))
+
+    header_map = dict(headers)
+    if 'chunked' in header_map.get('transfer-encoding', '').lower():
+        raise BadRequest(411, 'Chunked request bodies are not supported; send Content-Length')
+    length = int(header_map.get('content-length') or 0)
+    if length > MAX_BODY_BYTES:
+        raise BadRequest(413, 'Request body too large')
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), target, version, headers, body
+
+
+# Function to translate a parsed request into an API Gateway HTTP API (v2) event
+def build_event(method, target, headers, body, source_ip):
+    path, _, raw_query = target.partition('?')
+    event_headers = {}
+    cookies = []
+    for name, value in headers:
+        if name == 'cookie':
+            cookies.extend(cookie.strip() for cookie in value.split(';') if cookie.strip())
+        else:
+            event_headers[name] = f'{event_headers[name]},{value}' if name in event_headers else value  # Repeats are comma-joined
+
+    query = {}
+    for name, value in parse_qsl(raw_query, keep_blank_values=True):
+        query[name] = f'{query[name]},{value}' if name in query else value
+
+    content_type = event_headers.get('content-type', '')
+    is_text = not body or content_type.startswith(TEXT_CONTENT_TYPES)
+    if is_text:
+        try:
+            event_body = body.decode('utf-8')
+        except UnicodeDecodeError:
+            is_text = False
+    if not is_text:
+        event_body = base64.b64encode(body).decode('ascii')
+
+    now = datetime.now(timezone.utc)
+    event = {
+        'version': '2.0',
+        'routeKey': '$default',
+        'rawPath': unquote(path),
+        'rawQueryString': raw_query,
+        'headers': event_headers,
+        'requestContext': {
+            'accountId': 'local',
+            'apiId': 'local',
+            'domainName': event_headers.get('host', 'localhost'),
+            'http': {
+                'method': method,
+                'path': unquote(path),
+                'protocol': 'HTTP/1.1',
+                'sourceIp': source_ip,
+                'userAgent': event_headers.get('user-agent', ''),
+            },
+            'requestId': str(uuid.uuid4()),
+            'routeKey': '$default',
+            'stage': '$default',
+            'time': now.strftime('%d/%b/%Y:%H:%M:%S +0000'),
+            'timeEpoch': int(now.timestamp() * 1000),
+        },
+        'isBase64Encoded': not is_text,
+    }
+    if cookies:
+        event['cookies'] = cookies
+    if query:
+        event['queryStringParameters'] = query
+    if body:
+        event['body'] = event_body
+    return event
+
+
+# Function to turn a handler result into (status, headers, body bytes), as API Gateway does for payload format 2.0
+def response_parts(result):
+    if not isinstance(result, dict) or 'statusCode' not in result:
+        # A bare return value becomes a 200 JSON response
+        return 200, {'content-type': 'application/json'}, json.dumps(result, default=str).encode('utf-8')
+    body = result.get('body') or ''
+    body = base64.b64decode(body) if result.get('isBase64Encoded') else body.encode('utf-8')
+    headers = {name.lower(): str(value) for name, value in (result.get('headers') or {}).items()}
+    return int(result['statusCode']), headers, body
+
+
+# Function to write an HTTP/1.1 response
+async def write_response(writer, status, headers, body, keep_alive):
+    reason = HTTPStatus(status).phrase if status in HTTPStatus._value2member_map_ else ''
+    lines = [f'HTTP/1.1 {status} {reason}']
+    headers = dict(headers, **{'content-length': str(len(body)), 'connection': 'keep-alive' if keep_alive else 'close'})
+    lines.extend(f'{name}: {value}' for name, value in headers.items())
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+    await writer.drain()
+
+
+# The server: accepts connections, throttles like a bounded Lambda concurrency, and runs invocations on worker threads
+class LocalServer:
+    def __init__(self, handler, workers=16, max_concurrency=None, max_pending=100, timeout=30, function_name='api'):
+        self.handler = handler
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='invoke')
+        self.max_concurrency = max_concurrency or workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.function_name = function_name
+        self.stats = {'requests': 0, 'throttled': 0, 'errors': 0, 'timeouts': 0, 'in_flight': 0, 'pending': 0}
+        self._slots = None  # Created inside the running loop
+
+    # Function to run one invocation on a worker thread within the concurrency limit; returns a handler result
+    async def invoke(self, event):
+        if self._slots.locked() and self.stats['pending'] >= self.max_pending:
+            self.stats['throttled'] += 1
+            return {'statusCode': 429, 'headers': {'Content-Type': 'application/json'},
+                    'body': json.dumps({'message': 'Too Many Requests'})}
+
+        self.stats['pending'] += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.stats['pending'] -= 1
+        self.stats['in_flight'] += 1
+        try:
+            context = LocalContext(self.function_name, self.timeout)
+            loop = asyncio.get_running_loop()
+            return await asyncio.wait_for(loop.run_in_executor(self.executor, self.handler, event, context), self.timeout)
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1  # The worker keeps running, as a timed-out Lambda would until it is killed
+            return {'statusCode': 504, 'body': json.dumps({'message': 'Endpoint request timed out'})}
+        except Exception as error:
+            self.stats['errors'] += 1
+            print(f"Unhandled handler error: {error!r}", file=sys.stderr)
+            return {'statusCode': 500, 'body': json.dumps({'message': 'Internal Server Error'})}
+        finally:
+            self.stats['in_flight'] -= 1
+            self._slots.release()
+
+    # Function to serve every request on one client connection (HTTP/1.1 keep-alive)
+    async def handle_connection(self, reader, writer):
+        source_ip = (writer.get_extra_info('peername') or ('127.0.0.1',))[0]
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), KEEP_ALIVE_TIMEOUT)
+                except BadRequest as error:
+                    await write_response(writer, error.status, {'content-type': 'text/plain'}, str(error).encode(), False)
+                    break
+                if request is None:
+                    break
+                method, target, version, headers, body = request
+                keep_alive = dict(headers).get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                self.stats['requests'] += 1
+
+                if target.split('?', 1)[0] == '/__stats':
+                    result = {'statusCode': 200, 'headers': {'Content-Type': 'application/json'}, 'body': json.dumps(self.stats)}
+                else:
+                    result = await self.invoke(build_event(method, target, headers, body, source_ip))
+                await write_response(writer, *response_parts(result), keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass  # Idle keep-alive timeout or the client went away
+        finally:
+            writer.close()
+
+    async def serve(self, host, port):
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog=1024)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signal_number, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Signal handlers are unavailable on this platform; Ctrl+C still interrupts
+        addresses = ', '.join(f'http://{sock.getsockname()[0]}:{sock.getsockname()[1]}' for sock in server.sockets)
+        print(f"Serving on {addresses} (concurrency {self.max_concurrency}, pending {self.max_pending})", file=sys.stderr)
+        async with server:
+            await stop.wait()
+        self.executor.shutdown(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=3000)
+    parser.add_argument('--workers', type=int, default=16, help='worker threads running invocations')
+    parser.add_argument('--max-concurrency', type=int, help='invocations running at once (default: --workers)')
+    parser.add_argument('--max-pending', type=int, default=100, help='requests queued for a slot before 429s')
+    parser.add_argument('--timeout', type=float, default=30, help='seconds before an invocation answers 504')
+    parser.add_argument('--endpoint-url', help='DynamoDB endpoint, e.g. http://localhost:8000 for DynamoDB Local')
+    parser.add_argument('--stand-in', action='store_true', help='use the in-process DynamoDB stand-in with synthetic data')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--cart-lines', type=int, default=5)
+    parser.add_argument('--orders-per-user', type=int, default=30)
+    parser.add_argument('--quiet-metrics', action='store_true', help='drop the per-invocation metric lines')
+    args = parser.parse_args()
+
+    if args.endpoint_url:
+        os.environ['DYNAMODB_ENDPOINT_URL'] = args.endpoint_url  # Read when the connection layer first connects
+    if args.quiet_metrics:
+        from helper.metrics import set_sink
+        set_sink(lambda document: None)
+
+    from helper.routing import dispatch
+    server = LocalServer(dispatch, args.workers, args.max_concurrency, args.max_pending, args.timeout)
+
+    if args.stand_in:
+        from local_dynamodb import LocalAWS, seed
+        with LocalAWS():
+            data = seed(args.users, args.products, args.cart_lines, args.orders_per_user)
+            print(f"Seeded {len(data['user_ids'])} users, {len(data['product_ids'])} products and "
+                  f"{len(data['order_ids'])} orders (users are user-N@bench.local)", file=sys.stderr)
+            asyncio.run(server.serve(args.host, args.port))
+    else:
+        asyncio.run(server.serve(args.host, args.port))
+
+
+if __name__ == '__main__':
+    main()
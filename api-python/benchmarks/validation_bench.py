@@ -0,0 +1,90 @@
+"""Validation microbenchmark: cold import cost and validations per second for each schema.
+
+Import times come from fresh interpreters (what a cold start pays):
+    validation_module   `import helper.validation` alone (no schema is built)
+    <schema>            loading that one schema (pydantic import included, as for the first schema a handler uses)
+Throughput is measured in-process on a valid payload after a warm-up.
+
+Usage: python benchmarks/validation_bench.py [--runs N] [--iterations N]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+API_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_ROOT)
+
+# A valid payload and the validate function for each schema
+SAMPLES = {
+    'ProductSchema': ('validate_product', {
+        'productId': 'prod-1234', 'name': 'Laptop', 'category': 'Electronics', 'subcategory': 'Computers',
+        'price': 1200.50, 'keywords': 'laptop, computer, electronics', 'stock': 12
+    }),
+    'UserSchema': ('validate_user', {
+        'name': 'Ada', 'email': 'ada@example.com', 'password': 'correct-horse', 'shippingAddress': '1 Main Street'
+    }),
+    'QuerySchema': ('validate_query_params', {
+        'keywords': 'laptop', 'category': 'Electronics', 'subcategory': None, 'minPrice': 100.0, 'maxPrice': 2000.0
+    }),
+    'CartItem': ('validate_cart_item', {'userId': 'ada@example.com', 'productId': 'prod-1234', 'quantity': 2}),
+}
+
+IMPORT_MODULE = """
+import time
+start = time.perf_counter()
+import helper.validation
+print(time.perf_counter() - start)
+"""
+
+IMPORT_SCHEMA = """
+import time
+import helper.validation
+start = time.perf_counter()
+helper.validation.get_schema('{schema}')
+print(time.perf_counter() - start)
+"""
+
+
+# Function to time a snippet in a fresh interpreter, returning the median in milliseconds
+def cold_import_ms(code, runs):
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', code], cwd=API_ROOT, check=True, capture_output=True, text=True)
+        samples.append(float(output.stdout.strip().splitlines()[-1]))
+    return round(statistics.median(samples) * 1000, 3)
+
+
+# Function to measure how many validations per second a validate function sustains
+def validations_per_second(validate, payload, iterations):
+    for _ in range(1000):
+        validate(payload)  # Warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        validate(payload)
+    return round(iterations / (time.perf_counter() - start))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=9, help='fresh interpreters per import measurement')
+    parser.add_argument('--iterations', type=int, default=50000, help='validations per throughput measurement')
+    args = parser.parse_args()
+
+    import helper.validation as validation
+
+    results = {'validation_module': {'import_ms': cold_import_ms(IMPORT_MODULE, args.runs)}}
+    for schema, (function_name, payload) in SAMPLES.items():
+        results[schema] = {
+            'import_ms': cold_import_ms(IMPORT_SCHEMA.format(schema=schema), args.runs),
+            'validations_per_second': validations_per_second(getattr(validation, function_name), payload, args.iterations),
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,87 +1,89 @@
 import json
-import boto3
-from helper.db_helper import save_item, get_item
-from helper.db_helper import validate_cart_item  # Import the helper functions
+from helper.db_helper import item_exists, batch_get_items, run_in_parallel
+from helper.validation import validate_cart_item  # Import the helper functions
+from helper.cart import add_cart_lines, merge_cart_lines, CART_BATCH_MAX_ITEMS
+from helper.db_helper import enable_cache, PRODUCT_CACHE_TTL_SECONDS, PRODUCT_CACHE_NEGATIVE_TTL_SECONDS
+from helper.catalog_snapshot import enable_catalog_snapshot
+from helper.response import build_response  # Shared JSON (Decimal-aware) response builder
+from helper.metrics import instrument_handler  # Per-invocation DynamoDB latency and capacity metrics
+from helper.idempotency import idempotent  # Idempotency-Key: retried requests replay the stored response
 
-# Initialize DynamoDB resource
-dynamodb = boto3.resource('dynamodb')
-cart_table = dynamodb.Table('Carts')
-users_table = dynamodb.Table('Users')
-products_table = dynamodb.Table('Product')
+# Table names (connections are created lazily and shared through helper.connection); cart rows are written by helper.cart
+users_table = 'Users'
+products_table = 'Product'
+
+# Cache product lookups in the warm container; writes to Product in this container invalidate them
+enable_cache('Product', ['productId'], PRODUCT_CACHE_TTL_SECONDS, PRODUCT_CACHE_NEGATIVE_TTL_SECONDS)
+# Serve product reads from the memory-mapped catalog snapshot when CATALOG_SNAPSHOT is set (misses go to DynamoDB)
+enable_catalog_snapshot()
 
 # Lambda handler function
+@instrument_handler
+@idempotent
 def lambda_handler(event, context):
     try:
-        # Parse the request body to extract userId, productId, and quantity
+        # Parse the request body: either one line ({userId, productId, quantity}) or a batch ({userId, items: [...]})
         body = json.loads(event['body'])
         userId = body.get('userId')
-        productId = body.get('productId')
-        quantity = body.get('quantity', 1)
+        batch = 'items' in body
+        items = body.get('items') if batch else [{'productId': body.get('productId'), 'quantity': body.get('quantity', 1)}]
+
+        if not isinstance(items, list) or not items or len(items) > CART_BATCH_MAX_ITEMS:
+            return build_response(400, {'message': f'items must be a list of 1 to {CART_BATCH_MAX_ITEMS} cart lines'}, event)
 
-        # Validate the input data using the validate_cart_item helper function
-        try:
-            validated_item = validate_cart_item({
-                'userId': userId,
-                'productId': productId,
-                'quantity': quantity
-            })
-        except ValueError as e:
-            # If validation fails, return a 400 status code with detailed validation errors
-            return {
-                'statusCode': 400,
-                'body': json.dumps({
+        # Validate every line using the validate_cart_item helper function
+        lines = []
+        for position, item in enumerate(items):
+            item = item if isinstance(item, dict) else {}
+            try:
+                validated_item = validate_cart_item({
+                    'userId': userId,
+                    'productId': item.get('productId'),
+                    'quantity': item.get('quantity', 1)
+                })
+            except ValueError as e:
+                # If validation fails, return a 400 status code with detailed validation errors
+                return build_response(400, {
                     'message': 'Invalid input data',
-                    'details': str(e)  # Detailed validation errors
-                }),
-            }
+                    'details': f'items[{position}]: {e}' if batch else str(e)  # Detailed validation errors
+                }, event)
+            lines.append({'productId': validated_item.productId, 'quantity': validated_item.quantity})
 
-        # Check if the user exists in the Users table using the get_item helper function
-        user = get_item(users_table, {'userId': userId})
+        # The same product listed twice is one cart row
+        lines = merge_cart_lines(lines)
+
+        # Check that the user and every product exist: the user lookup and one bulk product fetch run concurrently
+        user, products = run_in_parallel(
+            lambda: item_exists(users_table, {'userId': userId}),
+            lambda: batch_get_items(products_table, [{'productId': line['productId']} for line in lines],
+                                    attributes=['productId'])
+        )
         if not user:
             # If the user does not exist, return a 404 status code
-            return {
-                'statusCode': 404,
-                'body': json.dumps({'message': f'User with ID {userId} does not exist.'}),
-            }
-
-        # Check if the product exists in the Products table using the get_item helper function
-        product = get_item(products_table, {'productId': productId})
-        if not product:
-            # If the product does not exist, return a 404 status code
-            return {
-                'statusCode': 404,
-                'body': json.dumps({'message': f'Product with ID {productId} does not exist.'}),
-            }
+            return build_response(404, {'message': f'User with ID {userId} does not exist.'}, event)
 
-        # Create a cartItem object with the userId, productId, and quantity
-        cart_item = {
-            'userId': userId,
-            'productId': productId,
-            'quantity': quantity
-        }
+        found = {product['productId'] for product in products}
+        missing_products = [line['productId'] for line in lines if line['productId'] not in found]
+        if missing_products:
+            # If any product does not exist, return a 404 status code listing all of them
+            return build_response(404, {
+                'message': (f'Product with ID {missing_products[0]} does not exist.' if len(missing_products) == 1
+                            else f"Products not found: {', '.join(missing_products)}"),
+                'missingProducts': missing_products
+            }, event)
 
-        # Insert the cart item into the Cart table using the save_item helper function
-        result = save_item(cart_item, cart_table)
+        # Add every line to the cart as an atomic quantity increment
+        cart_lines = add_cart_lines(userId, lines)
 
-        if result:
-            # Return a success response with a 201 status code if the product is added to the cart
-            return {
-                'statusCode': 201,
-                'body': json.dumps({'message': 'Product added to cart successfully'}),
-            }
-        else:
-            # If saving the item fails, return a 500 status code with a failure message
-            return {
-                'statusCode': 500,
-                'body': json.dumps({'message': 'Failed to add product to cart'}),
-            }
+        # Return a success response with a 201 status code and the resulting cart quantities
+        return build_response(201, {
+            'message': 'Products added to cart successfully' if batch else 'Product added to cart successfully',
+            'items': cart_lines
+        }, event)
 
     except Exception as e:
         # Log any errors that occur during the process for debugging purposes
         print(f"Error: {e}")
 
         # Return a 500 status code with a generic error message in case of internal server error
-        return {
-            'statusCode': 500,
-            'body': json.dumps({'message': 'Internal server error'}),
-        }
+        return build_response(500, {'message': 'Internal server error'}, event)
@@ -0,0 +1,27 @@
+import os
+import uuid
+from helper.connection import get_s3_client
+from helper.catalog_snapshot import build_snapshot, CATALOG_SNAPSHOT, CATALOG_SNAPSHOT_DIR
+from helper.metrics import instrument_handler  # Per-invocation DynamoDB latency and capacity metrics
+
+# Lambda handler function for the scheduled rebuild of the product snapshot at CATALOG_SNAPSHOT (s3://bucket/key)
+@instrument_handler
+def lambda_handler(event, context):
+    if not CATALOG_SNAPSHOT or not CATALOG_SNAPSHOT.startswith('s3://'):
+        print("CATALOG_SNAPSHOT must be an s3://bucket/key location")
+        return {'snapshot': None}
+
+    bucket, _, key = CATALOG_SNAPSHOT[len('s3://'):].partition('/')
+    path = os.path.join(CATALOG_SNAPSHOT_DIR, f'catalog-build-{uuid.uuid4().hex[:8]}.snap')
+    try:
+        # Scan the Product table into the snapshot file, then publish it for containers to load on their next reload
+        count = build_snapshot(path)
+        size = os.path.getsize(path)
+        get_s3_client().upload_file(path, bucket, key)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+    report = {'snapshot': CATALOG_SNAPSHOT, 'products': count, 'bytes': size}
+    print(f"Snapshot report: {report}")
+    return report
@@ -0,0 +1,14 @@
+from helper.suggest import write_snapshot, SUGGEST_SNAPSHOT
+from helper.metrics import instrument_handler  # Per-invocation DynamoDB latency and capacity metrics
+
+# Lambda handler function for the scheduled rewrite of the suggestion snapshot at SUGGEST_SNAPSHOT (s3://bucket/key)
+@instrument_handler
+def lambda_handler(event, context):
+    if not SUGGEST_SNAPSHOT or not SUGGEST_SNAPSHOT.startswith('s3://'):
+        print("SUGGEST_SNAPSHOT must be an s3://bucket/key location")
+        return {'snapshot': None}
+
+    # Scan the suggestion fields of the Product table once here, so suggest containers only ever read the snapshot
+    report = {'snapshot': SUGGEST_SNAPSHOT, 'products': write_snapshot(SUGGEST_SNAPSHOT)}
+    print(f"Snapshot report: {report}")
+    return report
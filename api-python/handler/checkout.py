@@ -1,50 +1,68 @@
 import json
 import uuid
-import boto3
+from decimal import Decimal
 from datetime import datetime
-from helper.db_helper import get_item, save_item  # Importing helper functions
-
-# Initialize DynamoDB resource (This is optional, as it is done inside the helper file)
-dynamodb = boto3.resource('dynamodb')
-products_table = dynamodb.Table('Product')
-orders_table = dynamodb.Table('Orders')
+from helper.cart import load_cart, price_cart, place_order  # Importing helper functions
+from helper.validation import validate_cart_item  # CartItem schema: productId and a positive integer quantity
+from helper.response import build_response  # Shared JSON (Decimal-aware) response builder
+from helper.metrics import instrument_handler  # Per-invocation DynamoDB latency and capacity metrics
+from helper.idempotency import idempotent  # Idempotency-Key: retried requests replay the stored response
 
 # Lambda handler function
+@instrument_handler
+@idempotent
 def lambda_handler(event, context):
     try:
         # Parse the incoming request body to get user details and cart items
-        body = json.loads(event['body'])
+        body = json.loads(event['body'], parse_float=Decimal)  # Decimals so quantities can be stored in DynamoDB
         userId = body.get('userId')
         shippingAddress = body.get('shippingAddress')
         paymentMethod = body.get('paymentMethod')
         cartItems = body.get('cartItems')
 
         # Validate if all required fields are present
-        if not userId or not shippingAddress or not paymentMethod or not cartItems or len(cartItems) == 0:
-            return {
-                'statusCode': 400,  # Return 400 if required fields are missing or cartItems is empty
-                'body': json.dumps({'message': 'UserID, ShippingAddress, PaymentMethod, and CartItems are required'})
-            }
-
-        totalAmount = 0  # Initialize totalAmount to 0 for calculating total order price
+        if not userId or not shippingAddress or not paymentMethod:
+            return build_response(400, {'message': 'UserID, ShippingAddress and PaymentMethod are required'}, event)  # Return 400 if required fields are missing
 
-        # Iterate through each item in the cart to calculate the total amount
-        for item in cartItems:
-            productId = item.get('productId')
-            key = {'productId': productId}  # Prepare the product key using productId from cart item
+        # Without cartItems in the body, check out the user's server-side cart (one paginated Query on Carts)
+        cartRows = None
+        if not cartItems:
+            cartItems = cartRows = load_cart(userId, consistent_read=True)
+            if not cartItems:
+                return build_response(400, {'message': 'Cart is empty'}, event)
+        else:
+            if not isinstance(cartItems, list):
+                return build_response(400, {'message': 'cartItems must be a list of cart lines'}, event)
 
-            # Fetch product data from the 'Products' table
-            product = get_item(products_table, key)
+            # Validate every line sent in the body (a zero, negative or fractional quantity would corrupt the total
+            # and the stock update)
+            lines = []
+            for position, item in enumerate(cartItems):
+                item = item if isinstance(item, dict) else {}
+                try:
+                    validated_item = validate_cart_item({
+                        'userId': userId,
+                        'productId': item.get('productId'),
+                        'quantity': item.get('quantity', 1)
+                    })
+                except ValueError as e:
+                    return build_response(400, {
+                        'message': 'Invalid input data',
+                        'details': f'cartItems[{position}]: {e}'  # Detailed validation errors
+                    }, event)
+                lines.append({'productId': validated_item.productId, 'quantity': validated_item.quantity})
+            cartItems = lines
 
-            # If product is not found in the database, return a 404 error
-            if not product:
-                return {
-                    'statusCode': 404,
-                    'body': json.dumps({'message': f'Product {productId} not found'})
-                }
+        # Price every line with a single bulk product lookup instead of one get_item per line. The read is strongly
+        # consistent, so the order is charged current prices (never a cached or snapshotted copy)
+        priced_items, totalAmount, missing_products = price_cart(cartItems, consistent_read=True)
 
-            # Calculate the total amount by multiplying product price and quantity
-            totalAmount += product['price'] * item['quantity']
+        # If any product is not found in the database, return a 404 listing all of them
+        if missing_products:
+            return build_response(404, {
+                'message': f"Products not found: {', '.join(map(str, missing_products))}",
+                'missingProducts': missing_products
+            }, event)
 
         # Generate a unique order ID using UUID
         orderId = f"order-{uuid.uuid4()}"
@@ -61,27 +79,22 @@ def lambda_handler(event, context):
             'totalAmount': totalAmount  # Total calculated amount for the order
         }
 
-        # Save the order details to the 'Orders' table using the save_item helper function
-        save_order_result = save_item(order_details, orders_table)
+        # In one transaction: save the order, update the user's order summary, clear the purchased cart rows and
+        # decrement stock where it is tracked
+        out_of_stock = place_order(order_details, priced_items, cart_rows=cartRows)
 
-        if save_order_result:
-            return {
-                'statusCode': 201,  # Success status code
-                'body': json.dumps({'message': 'Order placed successfully', 'orderId': orderId}),
-            }
-        else:
-            # If saving the order failed, return a 500 Internal Server Error response
-            return {
-                'statusCode': 500,  # Internal server error status code
-                'body': json.dumps({'message': 'Failed to save order details.'}),
-            }
+        if out_of_stock:
+            # Nothing was written; report every product that could not be fulfilled
+            return build_response(409, {
+                'message': 'Some products are out of stock or no longer available',
+                'outOfStockProducts': out_of_stock
+            }, event)
+
+        return build_response(201, {'message': 'Order placed successfully', 'orderId': orderId}, event)  # Success status code
 
     except Exception as error:
         # Log any errors that occur during processing
         print(f"Error: {error}")
 
         # Return a 500 Internal Server Error response for any exceptions that occur
-        return {
-            'statusCode': 500,  # Internal server error status code
-            'body': json.dumps({'message': 'Internal server error'}),
-        }
+        return build_response(500, {'message': 'Internal server error'}, event)  # Internal server error status code
@@ -0,0 +1,26 @@
+from helper.cart import clear_cart  # Import the helper function
+from helper.response import build_response  # Shared JSON (Decimal-aware) response builder
+from helper.metrics import instrument_handler  # Per-invocation DynamoDB latency and capacity metrics
+
+# Lambda handler function
+@instrument_handler
+def lambda_handler(event, context):
+    # Extract the userId from the query string parameters in the event
+    user_id = (event.get('queryStringParameters') or {}).get('userId')
+
+    # If userId is not provided, return a 400 (Bad Request) response
+    if not user_id:
+        return build_response(400, {'message': 'User ID is required'}, event)
+
+    try:
+        # One key-only Query for the cart rows, then BatchWriteItem deletes of up to 25 rows each
+        removed = clear_cart(user_id)
+
+        return build_response(200, {'message': 'Cart cleared successfully', 'removed': removed}, event)
+
+    except Exception as error:
+        # Log any errors encountered
+        print(f"Error clearing cart: {error}")
+
+        # Return a 500 (Internal Server Error) if there was an exception during the process
+        return build_response(500, {'message': 'Internal server error'}, event)
@@ -1,24 +1,24 @@
 # Import necessary modules and functions
 import json
-import boto3
 from helper.validation import validate_product  # Import ProductSchema and validate_product
-from helper.db_helper import save_item  # Assuming save_item is in another helper file
+from helper.db_helper import save_item, save_keyword_index, price_index_attributes  # Assuming save_item is in another helper file
+from helper.db_helper import get_item, KEYWORD_INDEX_SOURCE_ATTRIBUTES
+from helper.suggest import add_product as add_suggestion  # In-memory autocomplete index of this container
+from helper.response import build_response  # Shared JSON (Decimal-aware) response builder
+from helper.metrics import instrument_handler  # Per-invocation DynamoDB latency and capacity metrics
 from decimal import Decimal
 from pydantic import ValidationError
 
-# Initialize the DynamoDB client
-dynamodb = boto3.resource('dynamodb')
-products_table = dynamodb.Table('Product')
+# Table name (connections are created lazily and shared through helper.connection)
+products_table = 'Product'
 
 # Lambda function handler
+@instrument_handler
 def lambda_handler(event, context):
     try:
         # Check if the request body exists
         if not event.get('body'):
-            return {
-                'statusCode': 400,
-                'body': json.dumps({'message': 'Body is required'})
-            }
+            return build_response(400, {'message': 'Body is required'}, event)
 
         # Parse the request body
         body = json.loads(event['body'])
@@ -28,10 +28,7 @@ def lambda_handler(event, context):
             product = validate_product(body)  # Validate and parse the incoming data into ProductSchema model
         except ValidationError as e:
             # If validation fails, return a 400 Bad Request response with error details
-            return {
-                'statusCode': 400,
-                'body': json.dumps({'message': e.errors()[0]['msg']})
-            }
+            return build_response(400, {'message': e.errors()[0]['msg']}, event)
 
         # Construct the product item to be inserted into DynamoDB
         product_item = {
@@ -42,27 +39,31 @@ def lambda_handler(event, context):
             'price': Decimal(str(product.price)),  # Use Decimal for precise floating point handling
             'keywords': product.keywords,
         }
+        if product.stock is not None:
+            product_item['stock'] = product.stock  # Only products with a stock attribute are decremented at checkout
 
-        # Save the product item to DynamoDB using the imported save_item function
-        result = save_item(product_item, products_table)
+        # Read the version being replaced (if any), so its keyword index items that no longer apply can be removed
+        previous = get_item(products_table, {'productId': product_item['productId']},
+                            attributes=KEYWORD_INDEX_SOURCE_ATTRIBUTES, consistent_read=True)
+
+        # Save the product item to DynamoDB, with the keys that place it in the category price indexes
+        result = save_item({**product_item, **price_index_attributes(product_item)}, products_table)
+
+        # Write one keyword index item per token so the product is searchable by any of its keywords
+        if result and not save_keyword_index(product_item, previous):
+            return build_response(500, {'message': 'Failed to index product keywords'}, event)
 
         if result:
+            # Make the product suggestible right away in this container (others pick it up on their next refresh)
+            add_suggestion(product_item)
+
             # Return a 201 Created response if the product was successfully saved
-            return {
-                'statusCode': 201,
-                'body': json.dumps({'message': 'Product created successfully', 'product': product_item})
-            }
+            return build_response(201, {'message': 'Product created successfully', 'product': product_item}, event)
 
         # If saving the product fails, return a 500 Internal Server Error response
-        return {
-            'statusCode': 500,
-            'body': json.dumps({'message': 'Failed to create product'})
-        }
+        return build_response(500, {'message': 'Failed to create product'}, event)
 
     except Exception as e:
         # Log and return a 500 Internal Server Error if an unexpected error occurs
         print(f"Error: {str(e)}")
-        return {
-            'statusCode': 500,
-            'body': json.dumps({'message': 'Internal server error'})
-        }
+        return build_response(500, {'message': 'Internal server error'}, event)
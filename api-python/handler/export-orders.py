@@ -0,0 +1,37 @@
+from helper.order_export import export_orders, open_sink, EXPORT_MAX_SEGMENTS  # Import the helper functions
+from helper.response import build_response  # Shared JSON (Decimal-aware) response builder
+from helper.metrics import instrument_handler  # Per-invocation DynamoDB latency and capacity metrics
+
+# Lambda handler function
+@instrument_handler
+def lambda_handler(event, context):
+    # Extract the userId, segment count and optional date range from the query parameters
+    query_string_params = event.get('queryStringParameters') or {}
+    user_id = query_string_params.get('userId')
+    segments = query_string_params.get('segments', 1)
+    date_from = query_string_params.get('from')
+    date_to = query_string_params.get('to')
+
+    # Validate that the userId is provided
+    if not user_id:
+        return build_response(400, {'message': 'User ID is required'}, event)
+
+    # Validate that segments is a whole number within the allowed range
+    try:
+        segments = int(segments)
+    except (TypeError, ValueError):
+        segments = 0
+    if segments < 1 or segments > EXPORT_MAX_SEGMENTS:
+        return build_response(400, {'message': f'Segments must be an integer between 1 and {EXPORT_MAX_SEGMENTS}'}, event)
+
+    try:
+        # Stream every order to the export sink page by page; the response only carries the handle, never the orders
+        report = export_orders(user_id, open_sink(user_id), segments=segments, date_from=date_from, date_to=date_to)
+
+        return build_response(200, report, event)
+    except Exception as error:
+        # Log any errors encountered during the process
+        print(f"Error exporting user orders: {error}")
+
+        # Return a 500 response if the export failed (a partial export is discarded)
+        return build_response(500, {'message': 'Internal server error'}, event)
@@ -0,0 +1,40 @@
+from helper.cart import load_cart, price_cart
+from helper.db_helper import enable_cache, PRODUCT_CACHE_TTL_SECONDS, PRODUCT_CACHE_NEGATIVE_TTL_SECONDS
+from helper.catalog_snapshot import enable_catalog_snapshot
+from helper.response import build_response  # Shared JSON (Decimal-aware) response builder
+from helper.metrics import instrument_handler  # Per-invocation DynamoDB latency and capacity metrics
+
+# Cache product lookups in the warm container; writes to Product in this container invalidate them
+enable_cache('Product', ['productId'], PRODUCT_CACHE_TTL_SECONDS, PRODUCT_CACHE_NEGATIVE_TTL_SECONDS)
+# Serve product reads from the memory-mapped catalog snapshot when CATALOG_SNAPSHOT is set (misses go to DynamoDB)
+enable_catalog_snapshot()
+
+# Lambda handler function
+@instrument_handler
+def lambda_handler(event, context):
+    # Extract the userId from the query string parameters in the event
+    user_id = (event.get('queryStringParameters') or {}).get('userId')
+
+    # If userId is not provided, return a 400 (Bad Request) response
+    if not user_id:
+        return build_response(400, {'message': 'User ID is required'}, event)
+
+    try:
+        # Load the cart with one paginated Query and price it with one bulk product fetch
+        cart_items = load_cart(user_id)
+        priced_items, total_amount, missing_products = price_cart(cart_items)
+
+        # Return the priced cart; products removed from the catalog since they were added are listed separately
+        return build_response(200, {
+            'userId': user_id,
+            'items': priced_items,
+            'totalAmount': total_amount,
+            'unavailableProducts': missing_products
+        }, event)
+
+    except Exception as error:
+        # Log any errors encountered
+        print(f"Error fetching cart: {error}")
+
+        # Return a 500 (Internal Server Error) if there was an exception during the process
+        return build_response(500, {'message': 'Internal server error'}, event)
@@ -1,44 +1,51 @@
-import json
-import boto3
-from helper.db_helper import query_orders  # Import the helper function
+from helper.db_helper import query_orders_page, ORDER_PAGE_DEFAULT_LIMIT, ORDER_PAGE_MAX_LIMIT  # Import the helper function
+from helper.response import build_response  # Shared JSON (Decimal-aware) response builder
+from helper.metrics import instrument_handler  # Per-invocation DynamoDB latency and capacity metrics
 
-# Initialize DynamoDB resource and specify table name
+# Specify table name (connections are created lazily and shared through helper.connection)
 orders_table_name = 'Orders'
 
 # Lambda handler function
+@instrument_handler
 def lambda_handler(event, context):
-    # Extract the userId from the query parameters
-    user_id = event.get('queryStringParameters', {}).get('userId')
+    # Extract the userId, page size and cursor from the query parameters
+    query_string_params = event.get('queryStringParameters') or {}
+    user_id = query_string_params.get('userId')
+    limit = query_string_params.get('limit', ORDER_PAGE_DEFAULT_LIMIT)
+    cursor = query_string_params.get('cursor')
 
     # Validate that the userId is provided
     if not user_id:
-        return {
-            'statusCode': 400,  # Return 400 if userId is not provided
-            'body': json.dumps({'message': 'User ID is required'})  # Include a message indicating userId is missing
-        }
-    
+        return build_response(400, {'message': 'User ID is required'}, event)  # Return 400 if userId is not provided
+
+    # Validate that the limit is a whole number within the allowed page size
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        limit = 0
+    if limit < 1 or limit > ORDER_PAGE_MAX_LIMIT:
+        return build_response(400, {'message': f'Limit must be an integer between 1 and {ORDER_PAGE_MAX_LIMIT}'}, event)
+
     try:
-        # Fetch the user's order history using the helper function
-        order_history = query_orders(user_id, orders_table_name)
-
-        # If no order history is found, return a 404 response
-        if not order_history:
-            return {
-                'statusCode': 404,  # Return 404 if no orders are found for the user
-                'body': json.dumps({'message': 'User not found'})  # Provide a message indicating no user found
-            }
-
-        # Return the order history if found
-        return {
-            'statusCode': 200,  # Return 200 for successful retrieval of order history
-            'body': json.dumps(order_history)  # Include the order history data in the response body
-        }
+        # Fetch one page of the user's order history using the helper function
+        try:
+            order_history, next_cursor = query_orders_page(user_id, orders_table_name, limit=limit, cursor=cursor)
+        except ValueError:
+            # The cursor could not be decoded, so the client sent something we never issued
+            return build_response(400, {'message': 'Invalid cursor'}, event)
+
+        # If no order history is found on the first page, return a 404 response
+        if not order_history and not cursor:
+            return build_response(404, {'message': 'User not found'}, event)  # Return 404 if no orders are found for the user
+
+        # Return the page of order history along with the cursor for the next page (None on the last page)
+        return build_response(200, {  # Return 200 for successful retrieval of order history
+            'orders': order_history,  # Include the order history data in the response body
+            'nextCursor': next_cursor
+        }, event)
     except Exception as error:
         # Log any errors encountered during the process
         print(f"Error fetching user orders: {error}")
-        
+
         # Return a 500 response if there is an error fetching the order history
-        return {
-            'statusCode': 500,  # Internal server error status code
-            'body': json.dumps({'message': 'Internal server error'})  # General error message
-        }
+        return build_response(500, {'message': 'Internal server error'}, event)  # Internal server error status code
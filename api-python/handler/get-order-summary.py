@@ -0,0 +1,31 @@
+from helper.db_helper import get_item  # Import the helper function
+from helper.cart import ORDER_SUMMARIES_TABLE
+from helper.response import build_response  # Shared JSON (Decimal-aware) response builder
+from helper.metrics import instrument_handler  # Per-invocation DynamoDB latency and capacity metrics
+
+# Lambda handler function
+@instrument_handler
+def lambda_handler(event, context):
+    # Extract the userId from the query string parameters in the event
+    user_id = (event.get('queryStringParameters') or {}).get('userId')
+
+    # If userId is not provided, return a 400 (Bad Request) response
+    if not user_id:
+        return build_response(400, {'message': 'User ID is required'}, event)
+
+    try:
+        # One get_item on the summary checkout keeps up to date, however long the order history is
+        summary = get_item(ORDER_SUMMARIES_TABLE, {'userId': user_id})
+
+        # A user without orders has no summary item yet, which is simply an empty summary
+        if not summary:
+            summary = {'userId': user_id, 'orderCount': 0, 'totalSpent': 0}
+
+        return build_response(200, summary, event)
+
+    except Exception as error:
+        # Log any errors encountered
+        print(f"Error fetching order summary: {error}")
+
+        # Return a 500 (Internal Server Error) if there was an exception during the process
+        return build_response(500, {'message': 'Internal server error'}, event)
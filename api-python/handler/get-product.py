@@ -0,0 +1,42 @@
+from helper.db_helper import get_item, PRODUCTS_TABLE, PRICE_INDEX_ATTRIBUTES  # Import the helper functions
+from helper.db_helper import enable_cache, PRODUCT_CACHE_TTL_SECONDS, PRODUCT_CACHE_NEGATIVE_TTL_SECONDS
+from helper.catalog_snapshot import enable_catalog_snapshot
+from helper.response import build_response, build_conditional_response  # Shared JSON (Decimal-aware) response builders
+from helper.metrics import instrument_handler  # Per-invocation DynamoDB latency and capacity metrics
+
+# Product details change rarely, so they are cached per container for a short TTL
+enable_cache('Product', ['productId'], PRODUCT_CACHE_TTL_SECONDS, PRODUCT_CACHE_NEGATIVE_TTL_SECONDS)
+# Serve product reads from the memory-mapped catalog snapshot when CATALOG_SNAPSHOT is set (misses go to DynamoDB)
+enable_catalog_snapshot()
+
+# Lambda handler function
+@instrument_handler
+def lambda_handler(event, context):
+    # Extract the productId from the path (or the query string when called without a path template)
+    product_id = ((event.get('pathParameters') or {}).get('productId')
+                  or (event.get('queryStringParameters') or {}).get('productId'))
+
+    # If productId is not provided, return a 400 (Bad Request) response
+    if not product_id:
+        return build_response(400, {'message': 'Product ID is required'}, event)
+
+    try:
+        # Fetch the product (served from the cache when it was read recently)
+        product = get_item(PRODUCTS_TABLE, {'productId': product_id})
+
+        # If no product is found, return a 404 (Not Found) response
+        if not product:
+            return build_response(404, {'message': 'Product not found'}, event)
+
+        # The price index keys are storage details, not part of the product
+        product = {name: value for name, value in product.items() if name not in PRICE_INDEX_ATTRIBUTES}
+
+        # Return the product with a 200 (OK) status code and its ETag, or 304 if the client already has it
+        return build_conditional_response(200, product, event)
+
+    except Exception as error:
+        # Log any errors encountered
+        print(f"Error fetching product: {error}")
+
+        # Return a 500 (Internal Server Error) if there was an exception during the process
+        return build_response(500, {'message': 'Internal server error'}, event)
@@ -1,6 +1,11 @@
-import json
 from helper.db_helper import get_item  # Import the helper function
+from helper.response import build_response, build_conditional_response  # Shared JSON (Decimal-aware) response builders
+from helper.metrics import instrument_handler  # Per-invocation DynamoDB latency and capacity metrics
 
+# Profile attributes returned to the client (the stored password is never read)
+profile_attributes = ['userId', 'name', 'email', 'shippingAddress']
+
+@instrument_handler
 def lambda_handler(event, context):
     # Extract the userId from the query string parameters in the event
     user_id = event.get('queryStringParameters', {}).get('userId')
@@ -8,37 +13,25 @@ def lambda_handler(event, context):
 
     # If userId is not provided, return a 400 (Bad Request) response
     if not user_id:
-        return {
-            'statusCode': 400,
-            'body': json.dumps({'message': 'User ID is required'})
-        }
+        return build_response(400, {'message': 'User ID is required'}, event)
 
     # Construct the key to query the 'Users' table by userId
     key = {'userId': user_id}
 
     try:
         # Fetch the user profile using the get_item helper function
-        user_profile = get_item('Users', key)
+        user_profile = get_item('Users', key, attributes=profile_attributes)
         
         # If no user profile is found, return a 404 (Not Found) response
         if not user_profile:
-            return {
-                'statusCode': 404,
-                'body': json.dumps({'message': 'User not found'})
-            }
+            return build_response(404, {'message': 'User not found'}, event)
         
-        # Return the user profile with a 200 (OK) status code if the user is found
-        return {
-            'statusCode': 200,
-            'body': json.dumps(user_profile)  # Return the user profile details
-        }
+        # Return the user profile with a 200 (OK) status code and its ETag, or 304 if the client already has it
+        return build_conditional_response(200, user_profile, event)  # Return the user profile details
 
     except Exception as error:
         # Log any errors encountered
         print(f"Error fetching user profile: {error}")
         
         # Return a 500 (Internal Server Error) if there was an exception during the process
-        return {
-            'statusCode': 500,
-            'body': json.dumps({'message': 'Internal server error'})
-        }
+        return build_response(500, {'message': 'Internal server error'}, event)
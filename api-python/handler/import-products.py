@@ -0,0 +1,31 @@
+import codecs
+from urllib.parse import unquote_plus
+from helper.connection import get_s3_client
+from helper.product_import import import_products, iter_product_rows, detect_format
+from helper.metrics import instrument_handler  # Per-invocation DynamoDB latency and capacity metrics
+
+# Lambda handler function for S3 object-created events on product import files (.csv or .ndjson)
+@instrument_handler
+def lambda_handler(event, context):
+    reports = []
+
+    for record in event.get('Records', []):
+        # Extract the bucket and object key of the uploaded file (keys arrive URL-encoded)
+        bucket = record['s3']['bucket']['name']
+        key = unquote_plus(record['s3']['object']['key'])
+
+        try:
+            # Stream the object line by line instead of downloading it into memory
+            body = get_s3_client().get_object(Bucket=bucket, Key=key)['Body']
+            stream = codecs.getreader('utf-8')(body)
+            report = import_products(iter_product_rows(stream, detect_format(key)))
+        except Exception as error:
+            # Log the failure and keep going with the remaining files
+            print(f"Error importing s3://{bucket}/{key}: {error}")
+            report = {'error': str(error)}
+
+        report['source'] = f"s3://{bucket}/{key}"
+        print(f"Import report: {report}")  # Rejected rows (first ones) and throughput end up in the logs
+        reports.append(report)
+
+    return {'imports': reports}
@@ -1,45 +1,36 @@
-import json
-import boto3
 from helper.db_helper import query_order_track  # Import the get_item function from dynamodb_helpers.py
+from helper.response import build_response, build_conditional_response  # Shared JSON (Decimal-aware) response builders
+from helper.metrics import instrument_handler  # Per-invocation DynamoDB latency and capacity metrics
 
-# Initialize DynamoDB resource (optional, as it's initialized in the helper file)
-dynamodb = boto3.resource('dynamodb')
-orders_table = dynamodb.Table('Orders')  # The name of the 'Orders' table
+# Table name (connections are created lazily and shared through helper.connection)
+orders_table = 'Orders'  # The name of the 'Orders' table
 
+# Tracking only reports status, so the potentially large cartItems list is never read
+tracking_attributes = ['orderId', 'userId', 'orderStatus', 'orderDate']
+
+@instrument_handler
 def lambda_handler(event, context):
-    # Extract the orderId from the query string parameters in the event
-    order_id = event.get('queryStringParameters', {}).get('orderId')
+    # Extract the orderId from the path (/api/orders/{orderID}/status) or, failing that, the query string
+    order_id = (event.get('pathParameters') or {}).get('orderID') or (event.get('queryStringParameters') or {}).get('orderId')
 
     # Validate that orderId is provided
     if not order_id:
-        return {
-            'statusCode': 400,
-            'body': json.dumps({'message': 'Order ID is required'})
-        }
+        return build_response(400, {'message': 'Order ID is required'}, event)
     
     try:
         # Fetch the order from the 'Orders' table using the get_item function
-        order = query_order_track(orders_table, {'orderId': order_id})
+        order = query_order_track(order_id, orders_table, attributes=tracking_attributes)
         
         # If no order is found, return a 404 (Not Found) response
         if not order:
-            return {
-                'statusCode': 404,
-                'body': json.dumps({'message': 'No order found'})
-            }
+            return build_response(404, {'message': 'No order found'}, event)
 
-        # Return the order with a 200 (OK) status code
-        return {
-            'statusCode': 200,
-            'body': json.dumps(order)  # Return the order details
-        }
+        # Return the order with a 200 (OK) status code and its ETag, or 304 if the status has not changed since the last poll
+        return build_conditional_response(200, order, event)  # Return the order details
 
     except Exception as error:
         # Log any errors encountered
         print(f"Error fetching order details: {error}")
         
         # Return a 500 (Internal Server Error) if something went wrong
-        return {
-            'statusCode': 500,
-            'body': json.dumps({'message': 'Internal server error'})
-        }
+        return build_response(500, {'message': 'Internal server error'}, event)
@@ -1,22 +1,20 @@
 import json
-import boto3
 from pydantic import ValidationError
 from helper.db_helper import save_item
 from helper.validation import validate_user
+from helper.response import build_response  # Shared JSON (Decimal-aware) response builder
+from helper.metrics import instrument_handler  # Per-invocation DynamoDB latency and capacity metrics
 
-# Initialize DynamoDB client
-dynamodb = boto3.resource('dynamodb')
-table = dynamodb.Table('Users')
+# Table name (connections are created lazily and shared through helper.connection)
+table = 'Users'
 
 # Lambda function handler
+@instrument_handler
 def lambda_handler(event, context):
     try:
         # Check if the request body exists
         if not event.get('body'):
-            return {
-                'statusCode': 400,
-                'body': json.dumps({'message': 'Body is required'})
-            }
+            return build_response(400, {'message': 'Body is required'}, event)
 
         # Parse the request body
         body = json.loads(event['body'])
@@ -25,10 +23,7 @@ def lambda_handler(event, context):
         try:
             user = validate_user(body)  # This will raise an exception if validation fails
         except ValidationError as e:
-            return {
-                'statusCode': 400,
-                'body': json.dumps({'message': 'Validation failed', 'details': str(e)})
-            }
+            return build_response(400, {'message': 'Validation failed', 'details': str(e)}, event)
 
         # Prepare the item to save in DynamoDB
         item = {
@@ -43,23 +38,14 @@ def lambda_handler(event, context):
         result = save_item(item, table)  # Call the save_item function to save the item in DynamoDB
 
         if result:
-            return {
-                'statusCode': 201,
-                'body': json.dumps({'message': 'User registered successfully'})
-            }
+            return build_response(201, {'message': 'User registered successfully'}, event)
 
         # If saving fails
-        return {
-            'statusCode': 500,
-            'body': json.dumps({'message': 'Failed to register user'})
-        }
+        return build_response(500, {'message': 'Failed to register user'}, event)
 
     except Exception as e:
         # Log the error for debugging purposes
         print(f"Error: {e}")
 
         # Return an internal server error if something goes wrong
-        return {
-            'statusCode': 500,
-            'body': json.dumps({'message': 'Internal server error'})
-        }
+        return build_response(500, {'message': 'Internal server error'}, event)
@@ -1,22 +1,35 @@
 import json
-import boto3
-from pydantic import BaseModel, validator
-from typing import Optional
-from helper.db_helper import delete_item, get_item
-from helper.db_helper import validate_cart_item
+from helper.db_helper import delete_item
+from helper.validation import validate_cart_item
+from helper.cart import remove_cart_lines, CART_BATCH_MAX_ITEMS
+from helper.response import build_response  # Shared JSON (Decimal-aware) response builder
+from helper.metrics import instrument_handler  # Per-invocation DynamoDB latency and capacity metrics
 
-# Initialize DynamoDB resource
-dynamodb = boto3.resource('dynamodb')
-cart_table = dynamodb.Table('Carts')
-users_table = dynamodb.Table('Users')
-products_table = dynamodb.Table('Product')
+# Table names (connections are created lazily and shared through helper.connection)
+cart_table = 'Carts'
 
 # Lambda handler function
+@instrument_handler
 def lambda_handler(event, context):
     try:
-        # Parse the incoming request body to get user details and cart item data
+        # Parse the incoming request body: one product ({userId, productId}) or several ({userId, productIds: [...]})
         body = json.loads(event['body'])
         userId = body.get('userId')
+
+        if 'productIds' in body:
+            productIds = body.get('productIds')
+            if (not isinstance(productIds, list) or not productIds or len(productIds) > CART_BATCH_MAX_ITEMS
+                    or not all(isinstance(productId, str) and productId for productId in productIds)):
+                return build_response(400, {
+                    'message': f'productIds must be a list of 1 to {CART_BATCH_MAX_ITEMS} product IDs'
+                }, event)
+            if not isinstance(userId, str) or not userId:
+                return build_response(400, {'message': 'User ID is required'}, event)
+
+            # Delete every row with chunked BatchWriteItem requests; rows that are not in the cart are ignored
+            removed = remove_cart_lines(userId, productIds)
+            return build_response(200, {'message': 'Products removed from cart successfully', 'removed': removed}, event)
+
         productId = body.get('productId')
         quantity = body.get('quantity', 1)  # Default to 1 if not provided
 
@@ -29,50 +42,24 @@ def lambda_handler(event, context):
             })
         except ValueError as e:
             # If validation fails, return a 400 status code with detailed validation errors
-            return {
-                'statusCode': 400,
-                'body': json.dumps({
-                    'message': 'Invalid input data',
-                    'details': str(e)  # Validation error message
-                }),
-            }
-
-        # Check if the user exists in the Users table using the get_item helper function
-        user = get_item(users_table, {'userId': userId})
-        if not user:
-            # Return a 404 status code if the user is not found in the Users table
-            return {
-                'statusCode': 404,
-                'body': json.dumps({'message': f'User with ID {userId} does not exist.'}),
-            }
-
-        # Check if the product exists in the Products table using the get_item helper function
-        product = get_item(products_table, {'productId': productId})
-        if not product:
-            # Return a 404 status code if the product is not found in the Products table
-            return {
-                'statusCode': 404,
-                'body': json.dumps({'message': f'Product with ID {productId} does not exist.'}),
-            }
+            return build_response(400, {
+                'message': 'Invalid input data',
+                'details': str(e)  # Validation error message
+            }, event)
 
         # Define the key for deleting the cart item (based on userId and productId)
         key = {'userId': userId, 'productId': productId}
 
-        # Call the delete_item helper function to remove the item from the Cart table
-        result = delete_item(cart_table, key)
+        # Delete the row only if it exists: the condition answers "is it in the cart?" in the same request, so the
+        # user and product do not have to be read first (an unknown user or product simply has no cart row)
+        result = delete_item(cart_table, key, condition_expression='attribute_exists(productId)')
 
         if result:
             # Return a success response with a 200 status code if the product is removed from the cart
-            return {
-                'statusCode': 200,
-                'body': json.dumps({'message': 'Product removed from cart successfully'}),
-            }
+            return build_response(200, {'message': 'Product removed from cart successfully'}, event)
         else:
             # If deleting the item fails, return a 500 status code with an error message
-            return {
-                'statusCode': 500,
-                'body': json.dumps({'message': 'Failed to remove product from cart'}),
-            }
+            return build_response(500, {'message': 'Failed to remove product from cart'}, event)
 
     except Exception as e:
         # Log the error encountered during the process
@@ -80,18 +67,12 @@ def lambda_handler(event, context):
 
         # Handle DynamoDB-specific error when the item does not exist
         if 'ConditionalCheckFailedException' in str(e):
-            return {
-                'statusCode': 404,
-                'body': json.dumps({
-                    'message': 'The specified user or product does not exist in the cart'
-                }),
-            }
+            return build_response(404, {
+                'message': 'The specified user or product does not exist in the cart'
+            }, event)
 
         # Handle any other unexpected errors and return a generic error message
-        return {
-            'statusCode': 500,
-            'body': json.dumps({
-                'message': 'Error removing product from cart',
-                'error': str(e)  # Include the error message from the exception
-            }),
-        }
+        return build_response(500, {
+            'message': 'Error removing product from cart',
+            'error': str(e)  # Include the error message from the exception
+        }, event)
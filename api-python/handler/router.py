@@ -0,0 +1,9 @@
+from helper.routing import dispatch, preload  # Route table and lazy handler loading
+
+# Import the handlers named in ROUTER_PRELOAD during init; every other handler is imported on its first request
+preload()
+
+# Lambda handler function: one entry point for every API route, so all routes share one pool of warm containers
+# (and the connections and caches they hold). Each route's own lambda_handler still does the work.
+def lambda_handler(event, context):
+    return dispatch(event, context)
@@ -1,57 +1,57 @@
-import json
-import boto3
-from pydantic import BaseModel, ValidationError, condecimal, validator
-from typing import Optional
-from helper.db_helper import query_products  # Import query_products
+from pydantic import ValidationError
+from helper.db_helper import search_products  # Import search_products
 from helper.validation import validate_query_params  # Import QuerySchema and validate_query_params
-
-# Initialize DynamoDB resource
-dynamodb = boto3.resource('dynamodb')
-products_table = dynamodb.Table('Product')
+from helper.response import build_response  # Shared JSON (Decimal-aware) response builder
+from helper.metrics import instrument_handler  # Per-invocation DynamoDB latency and capacity metrics
 
 # Lambda handler function
+@instrument_handler
 def lambda_handler(event, context):
     try:
         # Extract query parameters from the event object
-        query_string_params = event.get('queryStringParameters', {})
-        
+        query_string_params = event.get('queryStringParameters') or {}
+
+        # Convert the price bounds to numbers, rejecting values that are not numeric
+        try:
+            min_price = float(query_string_params['minPrice']) if query_string_params.get('minPrice') else None
+            max_price = float(query_string_params['maxPrice']) if query_string_params.get('maxPrice') else None
+        except ValueError:
+            return build_response(400, {'message': 'Invalid query parameters', 'details': 'minPrice and maxPrice must be numbers'}, event)
+
         # Construct the queryParams object using the extracted query parameters
         query_params = {
             'keywords': query_string_params.get('keywords'),
             'category': query_string_params.get('category'),
             'subcategory': query_string_params.get('subcategory'),
-            'minPrice': query_string_params.get('minPrice', type=float),
-            'maxPrice': query_string_params.get('maxPrice', type=float),
+            'minPrice': min_price,
+            'maxPrice': max_price,
         }
 
+        # 'all' returns products matching every keyword, 'any' returns products matching at least one (best first)
+        match = query_string_params.get('match', 'all')
+        if match not in ('all', 'any'):
+            return build_response(400, {'message': 'Invalid query parameters', 'details': "match must be 'all' or 'any'"}, event)
+
         # Validate the query parameters using Pydantic
         try:
             validated_params = validate_query_params(query_params)  # Validate and parse the query parameters
         except ValidationError as e:
             # If validation fails, return a 400 (Bad Request) response
-            return {
-                'statusCode': 400,  # Return 400 status code indicating bad request
-                'body': json.dumps({
-                    'message': 'Invalid query parameters',  # Message indicating invalid query parameters
-                    'details': e.errors(),  # Return the validation error details for debugging
-                }),
-            }
+            return build_response(400, {  # Return 400 status code indicating bad request
+                'message': 'Invalid query parameters',  # Message indicating invalid query parameters
+                'details': e.errors(include_url=False, include_context=False),  # Return the validation error details for debugging
+            }, event)
 
-        # If parameters are valid, query the database using the queryProducts function
-        products = query_products(query_params)
+        # If parameters are valid, search: with a category and a price bound only that price range of the category
+        # is read (category price index); otherwise every keyword token is looked up in the inverted index in parallel
+        products = search_products(query_params, match=match)
 
         # Return the products in the response with a 200 (OK) status
-        return {
-            'statusCode': 200,  # Return 200 status code for successful operation
-            'body': json.dumps({
-                'products': products,  # Return the list of products found based on the query parameters
-            }),
-        }
+        return build_response(200, {  # Return 200 status code for successful operation
+            'products': products,  # Return the list of products found based on the query parameters
+        }, event)
 
     except Exception as error:
         # Log the error and return a 500 (Internal Server Error) response
         print(f"Error in handler: {error}")
-        return {
-            'statusCode': 500,  # Internal Server Error
-            'body': json.dumps({'message': 'Internal server error'})  # Error message
-        }
+        return build_response(500, {'message': 'Internal server error'}, event)  # Internal Server Error
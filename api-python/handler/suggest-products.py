@@ -0,0 +1,40 @@
+from helper.suggest import suggest_products, preload_index  # Import the helper functions
+from helper.suggest import SUGGEST_DEFAULT_LIMIT, SUGGEST_MAX_LIMIT, SUGGEST_RETRY_SECONDS
+from helper.response import build_response  # Shared JSON (Decimal-aware) response builder
+from helper.metrics import instrument_handler  # Per-invocation DynamoDB latency and capacity metrics
+
+# Suggestions may be a few minutes stale anyway, so let clients cache them briefly while the user types
+SUGGEST_CACHE_CONTROL = 'public, max-age=60'
+
+# Load the prefix index from the suggestion snapshot during init, so no request waits for it
+preload_index()
+
+# Lambda handler function
+@instrument_handler
+def lambda_handler(event, context):
+    # Extract the typed text and the number of suggestions from the query parameters
+    query_string_params = event.get('queryStringParameters') or {}
+    query = query_string_params.get('q', '')
+    limit = query_string_params.get('limit', SUGGEST_DEFAULT_LIMIT)
+
+    # Validate that the limit is a whole number within the allowed range
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        limit = 0
+    if limit < 1 or limit > SUGGEST_MAX_LIMIT:
+        return build_response(400, {'message': f'Limit must be an integer between 1 and {SUGGEST_MAX_LIMIT}'}, event)
+
+    try:
+        # Served from the in-memory prefix index loaded at init
+        suggestions = suggest_products(query, limit)
+        if suggestions is None:
+            # The index could not be loaded yet (it is retried in the background); tell the client to try again
+            return build_response(503, {'message': 'Suggestions are not available yet'}, event,
+                                  headers={'Retry-After': str(SUGGEST_RETRY_SECONDS)})
+
+        return build_response(200, {'suggestions': suggestions}, event, headers={'Cache-Control': SUGGEST_CACHE_CONTROL})
+    except Exception as error:
+        # Log the error and return a 500 (Internal Server Error) response
+        print(f"Error suggesting products: {error}")
+        return build_response(500, {'message': 'Internal server error'}, event)
@@ -1,12 +1,13 @@
 import json
-import boto3
 from helper.db_helper import update_item  # Import the update_item function
 from helper.validation import validate_cart_item  # Import CartItem class and validate_cart_item function
+from helper.response import build_response  # Shared JSON (Decimal-aware) response builder
+from helper.metrics import instrument_handler  # Per-invocation DynamoDB latency and capacity metrics
 
-# Initialize the DynamoDB client
-dynamodb = boto3.resource('dynamodb')
-users_table = dynamodb.Table('Users')  # Table name for Users
+# Table name (connections are created lazily and shared through helper.connection)
+users_table = 'Users'  # Table name for Users
 
+@instrument_handler
 def lambda_handler(event, context):
     try:
         # Parse the incoming request body
@@ -20,10 +21,7 @@ def lambda_handler(event, context):
 
         # Validate that userId is provided
         if not user_id:
-            return {
-                'statusCode': 400,
-                'body': json.dumps({'message': 'User ID is required'})
-            }
+            return build_response(400, {'message': 'User ID is required'}, event)
 
         # Initialize parts for the update expression, attribute values, and attribute names
         update_expression_parts = []
@@ -48,10 +46,7 @@ def lambda_handler(event, context):
 
         # If no fields are provided for updating, return a 400 status code
         if not update_expression_parts:
-            return {
-                'statusCode': 400,
-                'body': json.dumps({'message': 'No fields to update'})
-            }
+            return build_response(400, {'message': 'No fields to update'}, event)
 
         # Construct the update expression by joining the parts
         update_expression = 'SET ' + ', '.join(update_expression_parts)
@@ -69,21 +64,15 @@ def lambda_handler(event, context):
         updated_attributes = response or {}
 
         # Return a success response with the updated attributes
-        return {
-            'statusCode': 200,
-            'body': json.dumps({
-                'message': 'User profile updated successfully',
-                'updatedAttributes': updated_attributes
-            })
-        }
+        return build_response(200, {
+            'message': 'User profile updated successfully',
+            'updatedAttributes': updated_attributes
+        }, event)
 
     except Exception as error:
         # Log the error and return a 500 status code in case of failure
         print(f"Error updating profile: {error}")
-        return {
-            'statusCode': 500,
-            'body': json.dumps({
-                'message': 'Error updating profile',
-                'error': str(error)
-            })
-        }
+        return build_response(500, {
+            'message': 'Error updating profile',
+            'error': str(error)
+        }, event)
@@ -0,0 +1,233 @@
+from decimal import Decimal
+from botocore.exceptions import ClientError
+from helper.db_helper import batch_get_items, query_cart, transact_write_items, transaction_cancellation_codes
+from helper.db_helper import increment_item, TRANSACT_MAX_ITEMS
+from helper.db_helper import batch_write_items
+
+# Table names used by the cart helpers
+CARTS_TABLE = 'Carts'
+PRODUCTS_TABLE = 'Product'
+ORDERS_TABLE = 'Orders'
+# One item per user (userId HASH) with order count, lifetime spend and the latest order, kept in step with Orders
+ORDER_SUMMARIES_TABLE = 'OrderSummaries'
+# Upper bound on lines in one batch add-to-cart request (matches a single BatchGetItem for the product check)
+CART_BATCH_MAX_ITEMS = 100
+
+
+# Function to load a user's cart from the Carts table as checkout-style lines ({productId, quantity}).
+# Checkout reads consistently so an item added just before is never missed.
+def load_cart(user_id, consistent_read=False):
+    return [
+        {'productId': item['productId'], 'quantity': item.get('quantity', 1)}
+        for item in query_cart(user_id, CARTS_TABLE, attributes=['productId', 'quantity'], consistent_read=consistent_read)
+    ]
+
+
+# Function to merge cart lines that name the same product, summing their quantities (first occurrence keeps its place)
+def merge_cart_lines(lines):
+    merged = {}
+    for line in lines:
+        merged[line['productId']] = merged.get(line['productId'], 0) + line['quantity']
+    return [{'productId': product_id, 'quantity': quantity} for product_id, quantity in merged.items()]
+
+
+# Function to add lines to a user's cart. Each line is an atomic ADD on its cart row, so adding a product that is
+# already in the cart increases its quantity, and concurrent adds (e.g. two tabs) are never lost. BatchWriteItem
+# cannot be used here: it only puts, which would overwrite the quantity. Several lines are added in one transaction,
+# so a failure leaves the cart untouched and a retry cannot add some lines twice (CART_BATCH_MAX_ITEMS fits in one).
+# Returns the lines with their new cart quantities.
+def add_cart_lines(user_id, lines):
+    if len(lines) == 1:
+        line = lines[0]
+        quantity = increment_item(CARTS_TABLE, {'userId': user_id, 'productId': line['productId']}, 'quantity',
+                                  line['quantity'])
+        return [{'productId': line['productId'], 'quantity': quantity}]
+
+    transact_write_items([{'Update': {
+        'TableName': CARTS_TABLE,
+        'Key': {'userId': user_id, 'productId': line['productId']},
+        'UpdateExpression': 'ADD quantity :quantity',
+        'ExpressionAttributeValues': {':quantity': line['quantity']}
+    }} for line in lines])
+
+    # Transactions return no values, so read the new quantities back. The lines are already added: if this read
+    # fails, report the quantities as unknown rather than fail (a failed request would be retried and add them again)
+    try:
+        rows = batch_get_items(CARTS_TABLE, [{'userId': user_id, 'productId': line['productId']} for line in lines],
+                               attributes=['quantity'], consistent_read=True)
+        quantities = {row['productId']: row.get('quantity') for row in rows}
+    except Exception as error:
+        print(f"Error reading cart quantities: {error}")
+        quantities = {}
+    return [{'productId': line['productId'], 'quantity': quantities.get(line['productId'])} for line in lines]
+
+
+# Function to remove products from a user's cart with chunked BatchWriteItem deletes (25 keys per request, unprocessed
+# keys retried). Deleting a row that is not in the cart is a no-op. Returns the number of keys deleted.
+def remove_cart_lines(user_id, product_ids):
+    product_ids = list(dict.fromkeys(product_ids))  # A batch may not name the same key twice
+    return batch_write_items(CARTS_TABLE, delete_keys=[{'userId': user_id, 'productId': product_id}
+                                                       for product_id in product_ids])
+
+
+# Function to empty a user's cart: one consistent, key-only Query for the rows, then batch deletes.
+# Returns the number of rows removed.
+def clear_cart(user_id):
+    rows = query_cart(user_id, CARTS_TABLE, attributes=['productId'], consistent_read=True)
+    return remove_cart_lines(user_id, [row['productId'] for row in rows]) if rows else 0
+
+
+# Function to price cart lines with one bulk product fetch; returns (priced lines, total amount, missing productIds).
+# Checkout passes consistent_read=True so the prices it charges come from DynamoDB, never the cache or the snapshot.
+def price_cart(cart_items, consistent_read=False):
+    product_keys = [{'productId': item.get('productId')} for item in cart_items]
+    products_by_id = {product['productId']: product
+                      for product in batch_get_items(PRODUCTS_TABLE, product_keys, consistent_read=consistent_read)}
+
+    priced_items = []
+    missing_products = []
+    total_amount = 0
+    for item in cart_items:
+        product = products_by_id.get(item.get('productId'))
+        if not product:
+            if item.get('productId') not in missing_products:
+                missing_products.append(item.get('productId'))  # Report each missing productId once
+            continue
+
+        # Calculate the line total by multiplying product price and quantity
+        line_total = product['price'] * item['quantity']
+        total_amount += line_total
+        priced_item = {
+            'productId': product['productId'],
+            'name': product.get('name'),
+            'price': product['price'],
+            'quantity': item['quantity'],
+            'lineTotal': line_total
+        }
+        if 'stock' in product:
+            priced_item['stock'] = product['stock']  # Only present for products whose inventory is tracked
+        priced_items.append(priced_item)
+
+    return priced_items, total_amount, missing_products
+
+
+# Function to build the transaction actions for one product: decrement its stock (or just check it still exists)
+# and delete the matching cart row
+def _product_actions(user_id, product_id, quantity, tracks_stock):
+    if tracks_stock:
+        stock_action = {'Update': {
+            'TableName': PRODUCTS_TABLE,
+            'Key': {'productId': product_id},
+            'UpdateExpression': 'SET stock = stock - :quantity',
+            'ConditionExpression': 'stock >= :quantity',  # Fails the whole transaction instead of overselling
+            'ExpressionAttributeValues': {':quantity': quantity}
+        }}
+    else:
+        stock_action = {'ConditionCheck': {
+            'TableName': PRODUCTS_TABLE,
+            'Key': {'productId': product_id},
+            'ConditionExpression': 'attribute_exists(productId)'
+        }}
+    cart_action = {'Delete': {'TableName': CARTS_TABLE, 'Key': {'userId': user_id, 'productId': product_id}}}
+    return [stock_action, cart_action]
+
+
+# Function to build the actions that undo a committed chunk: put the stock back and restore the cart rows that
+# existed before checkout (cart_quantities, productId -> quantity read from Carts) with their original quantities.
+# Lines that were only sent in the request body were never in the cart, so nothing is put back for them.
+def _compensating_actions(user_id, chunk_products, cart_quantities):
+    actions = []
+    for product_id, quantity, tracks_stock in chunk_products:
+        if tracks_stock:
+            actions.append({'Update': {
+                'TableName': PRODUCTS_TABLE,
+                'Key': {'productId': product_id},
+                'UpdateExpression': 'ADD stock :quantity',
+                'ExpressionAttributeValues': {':quantity': quantity}
+            }})
+        if product_id in cart_quantities:
+            actions.append({'Put': {
+                'TableName': CARTS_TABLE,
+                'Item': {'userId': user_id, 'productId': product_id, 'quantity': cart_quantities[product_id]}
+            }})
+    return actions
+
+
+# Function to build the transaction action that folds a new order into its user's summary item
+def _order_summary_action(order_details):
+    return {'Update': {
+        'TableName': ORDER_SUMMARIES_TABLE,
+        'Key': {'userId': order_details['userId']},
+        'UpdateExpression': 'ADD orderCount :one, totalSpent :amount '
+                            'SET lastOrderId = :orderId, lastOrderDate = :orderDate, '
+                            'firstOrderDate = if_not_exists(firstOrderDate, :orderDate)',
+        'ExpressionAttributeValues': {
+            ':one': 1,
+            ':amount': Decimal(str(order_details['totalAmount'])),
+            ':orderId': order_details['orderId'],
+            ':orderDate': order_details['orderDate']
+        }
+    }}
+
+
+# Function to place an order transactionally: put the order, delete the cart rows and decrement stock.
+# cart_rows are the user's cart lines as read from Carts, when the caller already has them (they are what a failed
+# multi-chunk order restores). Returns the productIds that were out of stock (empty when the order was placed).
+def place_order(order_details, priced_items, cart_rows=None):
+    user_id = order_details['userId']
+
+    # A transaction may touch each item only once, so merge repeated lines for the same product
+    quantities = {}
+    tracked = {}
+    for item in priced_items:
+        quantities[item['productId']] = quantities.get(item['productId'], 0) + Decimal(str(item['quantity']))
+        tracked[item['productId']] = 'stock' in item
+
+    # Pack each product's two actions into chunks, leaving room for the order put and the summary update in the
+    # last chunk. Most carts fit in one chunk and are fully atomic; larger ones are undone chunk by chunk on failure.
+    per_chunk = (TRANSACT_MAX_ITEMS - 2) // 2
+    product_ids = list(quantities)
+    chunks = [product_ids[start:start + per_chunk] for start in range(0, len(product_ids), per_chunk)] or [[]]
+    order_action = {'Put': {
+        'TableName': ORDERS_TABLE,
+        'Item': order_details,
+        'ConditionExpression': 'attribute_not_exists(orderId)'
+    }}
+
+    # Only a multi-chunk order can need a rollback; read the cart rows it would restore before deleting any of them
+    if len(chunks) > 1 and cart_rows is None:
+        cart_rows = load_cart(user_id, consistent_read=True)
+    cart_quantities = {row['productId']: row['quantity'] for row in cart_rows or []}
+
+    committed = []
+    for index, chunk in enumerate(chunks):
+        chunk_products = [(product_id, quantities[product_id], tracked[product_id]) for product_id in chunk]
+        actions = [action for product in chunk_products for action in _product_actions(user_id, *product)]
+        if index == len(chunks) - 1:
+            actions.append(order_action)
+            actions.append(_order_summary_action(order_details))  # Summary and order commit (or fail) together
+
+        try:
+            transact_write_items(actions)
+        except ClientError as error:
+            codes = transaction_cancellation_codes(error)
+
+            # Undo the chunks that already went through, newest first
+            for done in reversed(committed):
+                transact_write_items(_compensating_actions(user_id, done, cart_quantities))
+
+            if codes is None:
+                raise error
+            # Each product contributed its stock action first, so even action indexes map back to products
+            out_of_stock = [
+                chunk_products[position // 2][0]
+                for position, code in enumerate(codes[:len(chunk_products) * 2])
+                if code == 'ConditionalCheckFailed' and position % 2 == 0
+            ]
+            if not out_of_stock:
+                raise error
+            return out_of_stock
+
+        committed.append(chunk_products)
+
+    return []
@@ -0,0 +1,240 @@
+import os
+import sys
+import json
+import mmap
+import time
+import uuid
+import struct
+import argparse
+import threading
+from decimal import Decimal
+from helper.connection import get_s3_client
+from helper.db_helper import scan_items, enable_snapshot, PRODUCTS_TABLE
+
+# Where the snapshot comes from: a local path (e.g. /opt/catalog/product.snap shipped in a layer) or s3://bucket/key,
+# downloaded to /tmp once per container. Unset means product reads go to DynamoDB as before.
+CATALOG_SNAPSHOT = os.environ.get('CATALOG_SNAPSHOT') or None
+# A snapshot older than this is expired, wherever it comes from: its lookups miss (falling back to DynamoDB) until a
+# newer one is loaded. S3 snapshots are republished by the scheduled builder; a local (layer) snapshot is only
+# replaced by a deployment, so after this age it stops serving until then.
+CATALOG_SNAPSHOT_MAX_AGE_SECONDS = float(os.environ.get('CATALOG_SNAPSHOT_MAX_AGE_SECONDS', '900'))
+# Minimum time between attempts to load a newer snapshot once the current one has expired
+CATALOG_SNAPSHOT_RELOAD_SECONDS = 60
+CATALOG_SNAPSHOT_DIR = '/tmp'
+
+# File layout: header | item values (compact JSON) | keys (UTF-8 productIds) | index entries sorted by key.
+# Fixed-size index entries allow a binary search straight on the mapped pages; only the value found is decoded.
+# Numbers are written exactly as DynamoDB returned them and read back as Decimal, so a snapshot hit and a DynamoDB
+# read give the same values and types.
+SNAPSHOT_MAGIC = b'PRODSNAP'
+SNAPSHOT_FORMAT_VERSION = 2
+_HEADER = struct.Struct('<8sIIQQQ')  # magic, format version, item count, built at (epoch seconds), keys offset, index offset
+_ENTRY = struct.Struct('<QQII')  # key offset, value offset, key length, value length
+
+
+# Function to encode an item as compact JSON without going through float: Decimals are written with their exact
+# digits (DynamoDB sets become lists)
+def _encode_value(value):
+    if isinstance(value, dict):
+        return '{' + ','.join(f'{json.dumps(str(name))}:{_encode_value(item)}' for name, item in value.items()) + '}'
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return '[' + ','.join(_encode_value(item) for item in value) + ']'
+    if isinstance(value, Decimal):
+        return str(value)
+    return json.dumps(value)
+
+
+# Function to write a snapshot of the Product table (or of the given items) to path. Values are streamed to the file
+# as they are scanned; only the keys and offsets are held in memory. The file is replaced atomically.
+def build_snapshot(path, items=None, built_at=None):
+    items = scan_items(PRODUCTS_TABLE) if items is None else items
+    temporary_path = f'{path}.{uuid.uuid4().hex[:8]}.tmp'
+    entries = []
+    with open(temporary_path, 'wb') as snapshot_file:
+        snapshot_file.write(b'\0' * _HEADER.size)
+        offset = _HEADER.size
+        for item in items:
+            value = _encode_value(item).encode('utf-8')
+            entries.append([str(item['productId']).encode('utf-8'), offset, len(value)])
+            snapshot_file.write(value)
+            offset += len(value)
+
+        entries.sort(key=lambda entry: entry[0])
+        keys_offset = offset
+        key_offsets = []
+        for key, _, _ in entries:
+            key_offsets.append(offset)
+            snapshot_file.write(key)
+            offset += len(key)
+
+        index_offset = offset
+        for (key, value_offset, value_length), key_offset in zip(entries, key_offsets):
+            snapshot_file.write(_ENTRY.pack(key_offset, value_offset, len(key), value_length))
+
+        snapshot_file.seek(0)
+        snapshot_file.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, len(entries),
+                                         int(built_at if built_at is not None else time.time()), keys_offset, index_offset))
+        snapshot_file.flush()
+        os.fsync(snapshot_file.fileno())
+    os.replace(temporary_path, path)
+    return len(entries)
+
+
+# Read-only, memory-mapped product snapshot. The pages are shared by every invocation of the container (and by
+# containers mapping the same layer file), and a lookup touches only the index entries it compares and one value.
+class CatalogSnapshot:
+    key_attributes = ('productId',)
+
+    def __init__(self, path, max_age_seconds=CATALOG_SNAPSHOT_MAX_AGE_SECONDS):
+        with open(path, 'rb') as snapshot_file:
+            self._map = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, format_version, count, built_at, _, index_offset = _HEADER.unpack_from(self._map, 0)
+        if magic != SNAPSHOT_MAGIC or format_version != SNAPSHOT_FORMAT_VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {SNAPSHOT_FORMAT_VERSION} product snapshot")
+        self.path = path
+        self.count = count
+        self.built_at = built_at
+        self.max_age_seconds = max_age_seconds
+        self._index_offset = index_offset
+
+    def __len__(self):
+        return self.count
+
+    def expired(self):
+        return time.time() - self.built_at > self.max_age_seconds
+
+    # Function to find the raw JSON value of a productId with a binary search over the index entries
+    def find(self, product_id):
+        key = str(product_id).encode('utf-8')
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            key_offset, value_offset, key_length, value_length = _ENTRY.unpack_from(
+                self._map, self._index_offset + middle * _ENTRY.size)
+            candidate = self._map[key_offset:key_offset + key_length]
+            if candidate == key:
+                return self._map[value_offset:value_offset + value_length]
+            if candidate < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    # Function to get a product as DynamoDB would return it (numbers as Decimal), or None if it is not in the snapshot
+    def get(self, product_id):
+        value = self.find(product_id)
+        return json.loads(value, parse_float=Decimal, parse_int=Decimal) if value is not None else None
+
+    # Function used by db_helper: (hit, item); products missing from the snapshot and expired snapshots miss
+    def lookup(self, key):
+        if self.expired():
+            return False, None
+        item = self.get(key.get('productId'))
+        return item is not None, item
+
+    def close(self):
+        self._map.close()
+
+
+# Function to open the snapshot at a local path, or download it from s3://bucket/key into /tmp first
+def open_snapshot(location):
+    if location.startswith('s3://'):
+        bucket, _, key = location[len('s3://'):].partition('/')
+        path = os.path.join(CATALOG_SNAPSHOT_DIR, f'catalog-{uuid.uuid4().hex[:8]}.snap')
+        get_s3_client().download_file(bucket, key, path)
+        try:
+            return CatalogSnapshot(path)
+        finally:
+            os.remove(path)  # The mapping keeps the pages; the name is not needed (and /tmp stays clean on reloads)
+    return CatalogSnapshot(location)
+
+
+# The snapshot registered with db_helper: serves lookups from the current CatalogSnapshot and, once that has
+# expired, loads a newer one from the same location in the background (at most once a minute)
+class SnapshotSource:
+    key_attributes = CatalogSnapshot.key_attributes
+
+    def __init__(self, location, snapshot):
+        self.location = location
+        self.snapshot = snapshot
+        self._last_reload = time.monotonic()
+        self._reloading = False
+        self._lock = threading.Lock()
+
+    def lookup(self, key):
+        snapshot = self.snapshot
+        if snapshot.expired():
+            self._reload_soon()
+            return False, None
+        return snapshot.lookup(key)
+
+    def _reload_soon(self):
+        with self._lock:
+            if self._reloading or time.monotonic() - self._last_reload < CATALOG_SNAPSHOT_RELOAD_SECONDS:
+                return
+            self._reloading = True
+            self._last_reload = time.monotonic()
+        threading.Thread(target=self._reload, name='catalog-snapshot-reload', daemon=True).start()
+
+    def _reload(self):
+        try:
+            snapshot = open_snapshot(self.location)
+            if snapshot.built_at > self.snapshot.built_at:
+                self.snapshot = snapshot  # The old mapping is released once no lookup holds it
+            else:
+                snapshot.close()
+                # Nothing newer yet (e.g. a layer snapshot, or a failing builder): reads keep going to DynamoDB
+                print(f"Catalog snapshot {self.location} is older than {CATALOG_SNAPSHOT_MAX_AGE_SECONDS:.0f}s "
+                      f"and has not been replaced; product reads fall back to DynamoDB")
+        except Exception as error:
+            print(f"Error reloading catalog snapshot: {error}")
+        finally:
+            self._reloading = False
+
+
+# Snapshot sources opened in this container, by location (handlers sharing a container share the mapping)
+_sources = {}
+_sources_lock = threading.Lock()
+
+
+# Function to serve Product reads from the configured snapshot in this container (a no-op without CATALOG_SNAPSHOT).
+# A snapshot that cannot be opened is logged and skipped: every read then simply goes to DynamoDB.
+def enable_catalog_snapshot(location=None):
+    location = location or CATALOG_SNAPSHOT
+    if not location:
+        return None
+    with _sources_lock:
+        source = _sources.get(location)
+        if source is None:
+            try:
+                source = _sources[location] = SnapshotSource(location, open_snapshot(location))
+            except Exception as error:
+                print(f"Error opening catalog snapshot {location}: {error}")
+                return None
+    enable_snapshot(PRODUCTS_TABLE, source)
+    return source
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build the memory-mapped product snapshot from the Product table.')
+    parser.add_argument('path', help='file to write, e.g. layer/catalog/product.snap')
+    parser.add_argument('--upload', help='also upload the snapshot to s3://bucket/key')
+    parser.add_argument('--endpoint-url', help='DynamoDB endpoint, e.g. http://localhost:8000 for DynamoDB Local')
+    args = parser.parse_args(argv)
+
+    if args.upload and not args.upload.startswith('s3://'):
+        parser.error('--upload must be an s3://bucket/key location')
+    if args.endpoint_url:
+        os.environ['DYNAMODB_ENDPOINT_URL'] = args.endpoint_url  # Read when the connection layer first connects
+
+    count = build_snapshot(args.path)
+    if args.upload:
+        bucket, _, key = args.upload[len('s3://'):].partition('/')
+        get_s3_client().upload_file(args.path, bucket, key)
+    print(json.dumps({'path': args.path, 'products': count, 'bytes': os.path.getsize(args.path)}))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
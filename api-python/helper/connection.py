@@ -0,0 +1,101 @@
+import os
+import threading
+import boto3
+from botocore.config import Config
+
+# Explicit botocore settings, overridable per deployment through environment variables
+DYNAMODB_CONFIG = Config(
+    max_pool_connections=int(os.environ.get('DYNAMODB_MAX_POOL_CONNECTIONS', '25')),  # Enough for parallel fan-out reads
+    tcp_keepalive=True,  # Keep pooled connections alive between warm invocations
+    connect_timeout=float(os.environ.get('DYNAMODB_CONNECT_TIMEOUT', '1')),
+    read_timeout=float(os.environ.get('DYNAMODB_READ_TIMEOUT', '3')),
+    retries={
+        'mode': 'adaptive',  # Client-side rate limiting on top of standard retries when DynamoDB throttles
+        'max_attempts': int(os.environ.get('DYNAMODB_MAX_ATTEMPTS', '5'))
+    }
+)
+
+# The session and low-level client are created once per container and shared (clients are thread-safe).
+# boto3 resources and Table objects are not thread-safe, so each thread gets its own, cached for reuse.
+_session = None
+_client = None
+_s3_client = None
+_local = threading.local()
+_lock = threading.Lock()
+_generation = 0  # Bumped by reset_connections so every thread rebuilds its resource
+
+
+# Function to read the optional endpoint override, e.g. to point at a local DynamoDB
+def _endpoint_url():
+    return os.environ.get('DYNAMODB_ENDPOINT_URL') or None
+
+
+# Function to get the shared boto3 session, creating it on first use
+def get_session():
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = boto3.session.Session()
+    return _session
+
+
+# Function to get the shared low-level DynamoDB client, creating it on first use
+def get_client():
+    global _client
+    if _client is None:
+        session = get_session()
+        with _lock:
+            if _client is None:
+                _client = session.client('dynamodb', config=DYNAMODB_CONFIG, endpoint_url=_endpoint_url())
+    return _client
+
+
+# Function to get the shared S3 client (used to stream import files), creating it on first use
+def get_s3_client():
+    global _s3_client
+    if _s3_client is None:
+        session = get_session()
+        with _lock:
+            if _s3_client is None:
+                _s3_client = session.client('s3', config=Config(tcp_keepalive=True, retries={'mode': 'adaptive'}))
+    return _s3_client
+
+
+# Function to get this thread's DynamoDB resource, creating it on first use
+def get_resource():
+    resource = getattr(_local, 'resource', None)
+    if resource is None or _local.generation != _generation:
+        session = get_session()
+        with _lock:  # Building a resource loads service models, which is not safe to do concurrently
+            resource = session.resource('dynamodb', config=DYNAMODB_CONFIG, endpoint_url=_endpoint_url())
+        _local.resource = resource
+        _local.tables = {}
+        _local.generation = _generation
+    return resource
+
+
+# Function to get the name of a table given either its name or a Table object
+def table_name(table):
+    return table if isinstance(table, str) else table.name
+
+
+# Function to get a Table object given either its name or a Table object, caching Table objects by name
+def get_table(table):
+    if not isinstance(table, str):
+        return table  # Already a Table object
+    resource = get_resource()
+    tables = _local.tables
+    if table not in tables:
+        tables[table] = resource.Table(table)
+    return tables[table]
+
+
+# Function to drop every cached connection object (e.g. after changing the endpoint in local tooling)
+def reset_connections():
+    global _session, _client, _s3_client, _generation
+    with _lock:
+        _session = None
+        _client = None
+        _s3_client = None
+        _generation += 1
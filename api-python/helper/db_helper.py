@@ -1,62 +1,557 @@
-import boto3
+import os
+import re
+import json
+import copy
+import time
+import random
+import base64
+import threading
+import binascii
+from decimal import Decimal
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.types import TypeSerializer, TypeDeserializer
 from botocore.exceptions import ClientError
 
-# Instantiate a DynamoDB client
-dynamodb = boto3.resource('dynamodb')
-dynamodb_client = boto3.client('dynamodb')
+# DynamoDB connections come from the shared, lazily-initialized connection layer
+from helper.connection import get_client, get_resource, get_table, table_name as resolve_table_name
+# Every DynamoDB call is timed and its consumed capacity recorded for the invocation's metrics
+from helper.metrics import record_call, bind_context
+
+# BatchGetItem accepts at most 100 keys per request
+BATCH_GET_MAX_KEYS = 100
+# BatchWriteItem accepts at most 25 put/delete requests per call
+BATCH_WRITE_MAX_ITEMS = 25
+# TransactWriteItems accepts at most 100 actions per call
+TRANSACT_MAX_ITEMS = 100
+# Retry settings for keys/items DynamoDB hands back as UnprocessedKeys/UnprocessedItems
+BATCH_MAX_RETRIES = 5
+BATCH_BASE_BACKOFF = 0.05
+
+# Page size bounds for cursor-paginated order history
+ORDER_PAGE_DEFAULT_LIMIT = 20
+ORDER_PAGE_MAX_LIMIT = 100
+
+# Inverted keyword index: one item per (token, product), partitioned by token
+KEYWORD_INDEX_TABLE = 'ProductKeywords'
+KEYWORD_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+KEYWORD_MIN_TOKEN_LENGTH = 2
+# Upper bound on tokens per search so one request cannot fan out without limit
+KEYWORD_MAX_SEARCH_TOKENS = 10
+# Product attributes that determine its keyword index keys (read before a rewrite to find the keys it leaves behind)
+KEYWORD_INDEX_SOURCE_ATTRIBUTES = ['productId', 'category', 'subcategory', 'keywords']
+
+# Sparse Product indexes partitioned by category (or category#subcategory) with price as the sort key, so
+# price-bounded searches read only the matching price range. PRICE_INDEX_ENABLED=false keeps every search on the
+# keyword index (e.g. until the indexes exist and older products are backfilled).
+PRODUCTS_TABLE = 'Product'
+CATEGORY_PRICE_INDEX = 'CategoryPriceIndex'
+SUBCATEGORY_PRICE_INDEX = 'SubcategoryPriceIndex'
+PRICE_INDEX_ATTRIBUTES = ('categoryIndexKey', 'subcategoryIndexKey')
+PRICE_INDEX_ENABLED = os.environ.get('PRICE_INDEX_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+# Items read by the first page of each candidate path of a price-bounded search (pages double from there on)
+SEARCH_PROBE_ITEMS = 100
+
+# Shared worker pool for fanning out independent reads; kept below the connection pool size in helper.connection
+PARALLEL_READ_WORKERS = int(os.environ.get('PARALLEL_READ_WORKERS', '16'))
+
+# Warm-container read-through cache shared by every cached table, evicted least-recently-used first
+CACHE_MAX_ENTRIES = 2048
+# Product rows barely change, so handlers that read them cache them for a short while
+PRODUCT_CACHE_TTL_SECONDS = float(os.environ.get('PRODUCT_CACHE_TTL_SECONDS', '60'))
+PRODUCT_CACHE_NEGATIVE_TTL_SECONDS = float(os.environ.get('PRODUCT_CACHE_NEGATIVE_TTL_SECONDS', '5'))
+
+# (De)serializers used to turn a LastEvaluatedKey into an opaque cursor and back
+type_serializer = TypeSerializer()
+type_deserializer = TypeDeserializer()
+
+# Per-table cache settings (only tables registered through enable_cache are cached) and the shared LRU store
+_cache_settings = {}
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+# Function to build a hashable marker for a DynamoDB key
+def _key_marker(key):
+    return tuple(sorted(key.items()))
+
+# Function to opt a table into the read-through cache for get_item and batch_get_items
+def enable_cache(table_name, key_attributes, ttl_seconds=60, negative_ttl_seconds=None):
+    _cache_settings[resolve_table_name(table_name)] = {
+        'key_attributes': tuple(key_attributes),  # Needed to find the cached key of an item passed to save_item
+        'ttl': ttl_seconds,
+        'negative_ttl': ttl_seconds if negative_ttl_seconds is None else negative_ttl_seconds
+    }
+
+# Function to turn the cache off for a table and drop whatever it holds
+def disable_cache(table_name):
+    _cache_settings.pop(resolve_table_name(table_name), None)
+    clear_cache(table_name)
+
+# Function to drop cached entries for one table, or for every table when no name is given
+def clear_cache(table_name=None):
+    with _cache_lock:
+        if table_name is None:
+            _cache.clear()
+            return
+        name = resolve_table_name(table_name)
+        for cache_key in [cache_key for cache_key in _cache if cache_key[0] == name]:
+            del _cache[cache_key]
+
+# Function to look up a key in the cache; returns (hit, item) where item is None for a cached miss
+def _cache_get(table_name, key):
+    cache_key = (resolve_table_name(table_name), _key_marker(key))
+    with _cache_lock:
+        entry = _cache.get(cache_key)
+        if entry is None:
+            return False, None
+        expires_at, item = entry
+        if expires_at <= time.monotonic():
+            del _cache[cache_key]  # Expired entries are removed on read
+            return False, None
+        _cache.move_to_end(cache_key)
+    return True, copy.deepcopy(item)  # Hand out a copy so callers cannot mutate the cached item
+
+# Function to store an item (or None for a miss) in the cache, evicting the least recently used entries
+def _cache_put(table_name, key, item):
+    settings = _cache_settings.get(resolve_table_name(table_name))
+    if not settings:
+        return
+    ttl = settings['ttl'] if item is not None else settings['negative_ttl']
+    if ttl <= 0:
+        return
+    cache_key = (resolve_table_name(table_name), _key_marker(key))
+    with _cache_lock:
+        _cache[cache_key] = (time.monotonic() + ttl, copy.deepcopy(item))
+        _cache.move_to_end(cache_key)
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+# Function to drop a single key from the cache after it was written in this container
+def _cache_invalidate(table_name, key):
+    name = resolve_table_name(table_name)
+    with _cache_lock:
+        _cache.pop((name, _key_marker(key)), None)
+        if name in _snapshots:
+            _snapshot_written.add((name, _key_marker(key)))  # The snapshot's copy is now older than the table's
+
+# Function to find the key attributes of a table whose written items must be invalidated (cached or snapshotted)
+def _written_key_attributes(table_name):
+    name = resolve_table_name(table_name)
+    if name in _cache_settings:
+        return _cache_settings[name]['key_attributes']
+    if name in _snapshots:
+        return _snapshots[name].key_attributes
+    return None
+
+# Read-only snapshots that serve a table's eventually consistent reads ahead of the cache (see helper.catalog_snapshot),
+# and the keys written in this container since, which must bypass them
+_snapshots = {}
+_snapshot_written = set()
+
+# Function to serve a table's eventually consistent reads from a read-only snapshot first. The snapshot is any object
+# with key_attributes and lookup(key) -> (hit, item); keys it does not have (and an expired snapshot) fall back to the
+# cache and DynamoDB.
+def enable_snapshot(table_name, snapshot):
+    _snapshots[resolve_table_name(table_name)] = snapshot
+
+# Function to stop serving a table from its snapshot
+def disable_snapshot(table_name):
+    name = resolve_table_name(table_name)
+    _snapshots.pop(name, None)
+    with _cache_lock:
+        _snapshot_written.difference_update([written for written in _snapshot_written if written[0] == name])
+
+# Function to look up a key in the table's snapshot; returns (hit, item), never hitting for keys written since
+def _snapshot_get(table_name, key):
+    name = resolve_table_name(table_name)
+    snapshot = _snapshots.get(name)
+    if snapshot is None or (name, _key_marker(key)) in _snapshot_written:
+        return False, None
+    return snapshot.lookup(key)
+
+# Worker pool created on first use and reused by every invocation in this container
+_executor = None
+_executor_lock = threading.Lock()
+
+# Function to get the shared worker pool, creating it on first use
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=PARALLEL_READ_WORKERS, thread_name_prefix='db-read')
+    return _executor
+
+# Function to run independent calls (zero-argument callables) concurrently and return their results in order
+def run_in_parallel(*calls):
+    if len(calls) <= 1:
+        return [call() for call in calls]  # Nothing to overlap, so skip the thread hand-off
+    futures = [_get_executor().submit(bind_context(call)) for call in calls]  # Calls keep the invocation's metrics
+    return [future.result() for future in futures]  # Re-raises the first failing call's exception
+
+# Function to count the items a DynamoDB response carries (Items, Item, or BatchGetItem Responses)
+def _response_item_count(response):
+    if 'Items' in response:
+        return len(response['Items'])
+    if 'Responses' in response:
+        return sum(len(items) for items in response['Responses'].values())
+    return 1 if response.get('Item') else 0
+
+# Function to make one DynamoDB call with ReturnConsumedCapacity, recording its latency, item count and capacity.
+# Write calls pass the number of items they write; reads are counted from the response.
+def _call(operation, table, method, params, index=None, items=None):
+    params['ReturnConsumedCapacity'] = 'TOTAL'
+    started = time.perf_counter()
+    try:
+        response = method(**params)
+    except ClientError as error:
+        record_call(operation, table, (time.perf_counter() - started) * 1000, index=index,
+                    error=error.response.get('Error', {}).get('Code', 'ClientError'))
+        raise
+    latency_ms = (time.perf_counter() - started) * 1000
+    record_call(operation, table, latency_ms, _response_item_count(response) if items is None else items,
+                response.get('ConsumedCapacity'), index)
+    return response
+
+# Function to add a ProjectionExpression for the given attributes to request params. Every name is aliased
+# (#p0, #p1, ...) so reserved words such as name or status need no special handling.
+def _with_projection(params, attributes):
+    if not attributes:
+        return params
+    names = dict(params.get('ExpressionAttributeNames') or {})
+    aliases = []
+    for position, attribute in enumerate(dict.fromkeys(attributes)):
+        names[f'#p{position}'] = attribute
+        aliases.append(f'#p{position}')
+    params['ProjectionExpression'] = ', '.join(aliases)
+    params['ExpressionAttributeNames'] = names
+    return params
+
+# Function to trim a full item (e.g. one served from the cache) down to the requested attributes
+def _project(item, attributes):
+    if item is None or not attributes:
+        return item
+    return {name: item[name] for name in attributes if name in item}
 
 # Function to save an item to DynamoDB
 def save_item(item, table_name):
-    table = dynamodb.Table(table_name)
+    table = get_table(table_name)
+    key_attributes = _written_key_attributes(table_name)
     try:
-        table.put_item(Item=item)  # Save item to DynamoDB
+        _call('PutItem', table.name, table.put_item, {'Item': item}, items=1)  # Save item to DynamoDB
+        if key_attributes:
+            _cache_invalidate(table_name, {name: item[name] for name in key_attributes if name in item})
         return True
     except ClientError as error:
         print(f"Error: {error}")
         return False
 
-# Function to get an item from DynamoDB
-def get_item(table_name, key):
-    table = dynamodb.Table(table_name)
+# Function to get an item from DynamoDB, optionally only some of its attributes and/or with a strongly consistent read
+def get_item(table_name, key, attributes=None, consistent_read=False):
+    if _snapshots and not consistent_read:
+        hit, item = _snapshot_get(table_name, key)
+        if hit:
+            return _project(item, attributes)  # Served from the memory-mapped snapshot, no network hop
+
+    cached = resolve_table_name(table_name) in _cache_settings
+    if cached and not consistent_read:
+        hit, item = _cache_get(table_name, key)
+        if hit:
+            return _project(item, attributes)  # Served from the warm-container cache (None is a cached miss)
+
+    table = get_table(table_name)
+    params = _with_projection({'Key': key, 'ConsistentRead': consistent_read}, attributes)
     try:
-        response = table.get_item(Key=key)
-        return response.get('Item')  # Return the item if found, otherwise None
+        response = _call('GetItem', table.name, table.get_item, params)
+        item = response.get('Item')
+        if cached and not attributes:
+            _cache_put(table_name, key, item)  # Only whole items are cached, so any projection can be served later
+        return item  # Return the item if found, otherwise None
     except ClientError as error:
         print(f"Error: {error}")
         raise Exception("Failed to fetch data from DynamoDB")
 
-# Function to query orders by user ID
-def query_orders(user_id, table_name):
-    table = dynamodb.Table(table_name)
+# Function to check whether an item exists by reading only its key attributes
+def item_exists(table_name, key, consistent_read=False):
+    return get_item(table_name, key, attributes=list(key), consistent_read=consistent_read) is not None
+
+# Function to sleep before retry number `attempt`, with exponential growth and full jitter so parallel callers spread out
+def _backoff(attempt, base=BATCH_BASE_BACKOFF):
+    time.sleep(random.uniform(0, base * (2 ** (attempt - 1))))
+
+# Function to get many items from DynamoDB in as few round trips as possible, optionally only some attributes
+# (key attributes are always included so results can be matched to keys) and/or with strongly consistent reads
+def batch_get_items(table_name, keys, attributes=None, consistent_read=False):
+    # Drop repeated keys (e.g. the same productId on two cart lines) so each item is read once
+    unique_keys = []
+    seen = set()
+    for key in keys:
+        marker = _key_marker(key)
+        if marker not in seen:
+            seen.add(marker)
+            unique_keys.append(key)
+
+    # Serve whatever the snapshot and the warm-container cache already hold and only fetch the rest
+    if attributes and unique_keys:
+        attributes = list(dict.fromkeys([*unique_keys[0], *attributes]))
+    items = []
+    if _snapshots and not consistent_read:
+        remaining_keys = []
+        for key in unique_keys:
+            hit, item = _snapshot_get(table_name, key)
+            if hit:
+                items.append(_project(item, attributes))
+            else:
+                remaining_keys.append(key)
+        unique_keys = remaining_keys
+    cached = resolve_table_name(table_name) in _cache_settings
+    if cached and not consistent_read:
+        uncached_keys = []
+        for key in unique_keys:
+            hit, item = _cache_get(table_name, key)
+            if not hit:
+                uncached_keys.append(key)
+            elif item is not None:
+                items.append(_project(item, attributes))
+        unique_keys = uncached_keys
+
+    name = resolve_table_name(table_name)
+    fetched = []
     try:
-        response = table.query(
-            KeyConditionExpression='userId = :userId',
-            ExpressionAttributeValues={':userId': user_id}
-        )
-        return response.get('Items', [])  # Return list of orders, empty if none found
+        for start in range(0, len(unique_keys), BATCH_GET_MAX_KEYS):
+            request = _with_projection({'Keys': unique_keys[start:start + BATCH_GET_MAX_KEYS]}, attributes)
+            if consistent_read:
+                request['ConsistentRead'] = True
+            request_items = {name: request}
+            attempt = 0
+            while request_items:
+                response = _call('BatchGetItem', name, get_resource().batch_get_item, {'RequestItems': request_items})
+                fetched.extend(response.get('Responses', {}).get(name, []))
+                request_items = response.get('UnprocessedKeys') or {}
+                if not request_items:
+                    break
+                # Back off exponentially before retrying the keys DynamoDB could not serve
+                attempt += 1
+                if attempt > BATCH_MAX_RETRIES:
+                    raise Exception("Exceeded retries for unprocessed keys in batch get")
+                _backoff(attempt)
     except ClientError as error:
-        print(f"Error fetching orders: {error}")
-        raise Exception("Failed to fetch orders from DynamoDB")
+        print(f"Error in batch get: {error}")
+        raise Exception("Failed to fetch data from DynamoDB")
+
+    if cached and not attributes:
+        # Cache every fetched item, and remember keys that came back empty as misses
+        key_attributes = _cache_settings[resolve_table_name(table_name)]['key_attributes']
+        found = set()
+        for item in fetched:
+            key = {name: item[name] for name in key_attributes}
+            found.add(_key_marker(key))
+            _cache_put(table_name, key, item)
+        for key in unique_keys:
+            if _key_marker(key) not in found:
+                _cache_put(table_name, key, None)
+
+    items.extend(fetched)
+    return items  # Return every item found; keys that do not exist are simply absent
+
+# Function to put and/or delete many items in chunked BatchWriteItem calls, retrying UnprocessedItems with backoff
+def batch_write_items(table_name, put_items=(), delete_keys=(), max_retries=BATCH_MAX_RETRIES):
+    name = resolve_table_name(table_name)
+    requests = [{'PutRequest': {'Item': item}} for item in put_items]
+    requests += [{'DeleteRequest': {'Key': key}} for key in delete_keys]
+
+    try:
+        for start in range(0, len(requests), BATCH_WRITE_MAX_ITEMS):
+            request_items = {name: requests[start:start + BATCH_WRITE_MAX_ITEMS]}
+            attempt = 0
+            while request_items:
+                response = _call('BatchWriteItem', name, get_resource().batch_write_item, {'RequestItems': request_items},
+                                 items=len(request_items[name]))
+                request_items = response.get('UnprocessedItems') or {}
+                if not request_items:
+                    break
+                # Unprocessed items mean the table is throttling us, so back off before resending them
+                attempt += 1
+                if attempt > max_retries:
+                    raise Exception("Exceeded retries for unprocessed items in batch write")
+                _backoff(attempt)
+    except ClientError as error:
+        print(f"Error in batch write: {error}")
+        raise Exception("Failed to write data to DynamoDB")
+
+    # Writes in this container make any cached (or snapshotted) copies stale
+    key_attributes = _written_key_attributes(name)
+    if key_attributes:
+        for key in list(delete_keys) + [{attr: item[attr] for attr in key_attributes} for item in put_items]:
+            _cache_invalidate(name, key)
+    return len(requests)
+
+# Function to convert a transaction action with plain Python values into the low-level client's typed format
+def _serialize_transact_action(action):
+    (kind, params), = action.items()
+    params = dict(params, TableName=resolve_table_name(params['TableName']))
+    for field in ('Key', 'Item', 'ExpressionAttributeValues'):
+        if field in params:
+            params[field] = {name: type_serializer.serialize(value) for name, value in params[field].items()}
+    return {kind: params}
+
+# Function to apply up to TRANSACT_MAX_ITEMS Put/Update/Delete/ConditionCheck actions atomically in one round trip
+def transact_write_items(actions):
+    if len(actions) > TRANSACT_MAX_ITEMS:
+        raise ValueError(f"A transaction holds at most {TRANSACT_MAX_ITEMS} actions, got {len(actions)}")
+    tables = ','.join(sorted({resolve_table_name(params['TableName']) for action in actions for params in action.values()}))
+    try:
+        _call('TransactWriteItems', tables, get_client().transact_write_items,
+              {'TransactItems': [_serialize_transact_action(action) for action in actions]}, items=len(actions))
+    except ClientError as error:
+        print(f"Error in transaction: {error}")
+        raise error
+
+    # Writes in this container make any cached (or snapshotted) copies stale
+    for action in actions:
+        (kind, params), = action.items()
+        name = resolve_table_name(params['TableName'])
+        key_attributes = _written_key_attributes(name)
+        if kind != 'ConditionCheck' and key_attributes:
+            key = params.get('Key') or {attr: params['Item'][attr] for attr in key_attributes}
+            _cache_invalidate(name, key)
+    return True
+
+# Function to get the per-action cancellation codes (e.g. 'ConditionalCheckFailed') of a canceled transaction
+def transaction_cancellation_codes(error):
+    if error.response.get('Error', {}).get('Code') != 'TransactionCanceledException':
+        return None
+    return [reason.get('Code') for reason in error.response.get('CancellationReasons', [])]
+
+# Function to encode a LastEvaluatedKey as an opaque, URL-safe pagination cursor
+def encode_cursor(last_evaluated_key):
+    if not last_evaluated_key:
+        return None
+    typed_key = {name: type_serializer.serialize(value) for name, value in last_evaluated_key.items()}
+    raw = json.dumps(typed_key, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+# Function to decode a pagination cursor back into an ExclusiveStartKey
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        typed_key = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return {name: type_deserializer.deserialize(value) for name, value in typed_key.items()}
+    except (ValueError, TypeError, AttributeError, binascii.Error) as error:
+        raise ValueError(f"Invalid cursor: {error}")
+
+# Generator that runs a query one page at a time, following LastEvaluatedKey until the end
+def paginate_query(table_name, query_params, page_size=None, start_key=None, attributes=None, consistent_read=False):
+    table = get_table(table_name)
+    params = _with_projection(dict(query_params), attributes)
+    if consistent_read:
+        params['ConsistentRead'] = True  # Base tables and local indexes only; global secondary indexes reject it
+    if page_size:
+        params['Limit'] = page_size
+    if start_key:
+        params['ExclusiveStartKey'] = start_key
+
+    while True:
+        try:
+            response = _call('Query', table.name, table.query, dict(params), index=params.get('IndexName'))
+        except ClientError as error:
+            print(f"Error querying {table_name}: {error}")
+            raise Exception(f"Failed to query {table_name} from DynamoDB")
+
+        last_evaluated_key = response.get('LastEvaluatedKey')
+        yield response.get('Items', []), last_evaluated_key  # Hand back one page before fetching the next
+
+        if not last_evaluated_key:
+            return
+        params['ExclusiveStartKey'] = last_evaluated_key
 
-# Function to query orders by order ID (with a Global Secondary Index)
-def query_order_track(order_id, table_name):
-    table = dynamodb.Table(table_name)
+# Generator that yields a user's orders one at a time across every page
+def iter_orders(user_id, table_name, page_size=None, attributes=None, consistent_read=False):
+    query_params = {
+        'KeyConditionExpression': 'userId = :userId',
+        'ExpressionAttributeValues': {':userId': user_id}
+    }
+    for items, _ in paginate_query(table_name, query_params, page_size=page_size, attributes=attributes,
+                                   consistent_read=consistent_read):
+        yield from items
+
+# Function to query orders by user ID
+def query_orders(user_id, table_name, attributes=None, consistent_read=False):
+    # Return every order across all pages, empty if none found
+    return list(iter_orders(user_id, table_name, attributes=attributes, consistent_read=consistent_read))
+
+# Function to fetch a single page of a user's orders, returning the orders and the cursor for the next page
+def query_orders_page(user_id, table_name, limit=ORDER_PAGE_DEFAULT_LIMIT, cursor=None, attributes=None):
+    query_params = {
+        'KeyConditionExpression': 'userId = :userId',
+        'ExpressionAttributeValues': {':userId': user_id}
+    }
+    start_key = decode_cursor(cursor) if cursor else None
+    if start_key and start_key.get('userId') != user_id:
+        raise ValueError("Cursor does not belong to this user")
+
+    # A single bounded Query per request keeps latency and memory flat however many orders exist
+    items, last_evaluated_key = next(paginate_query(table_name, query_params, page_size=limit, start_key=start_key,
+                                                    attributes=attributes))
+    return items, encode_cursor(last_evaluated_key)
+
+# Function to query every line of a user's cart (userId HASH, productId RANGE) in one paginated Query
+def query_cart(user_id, table_name, attributes=None, consistent_read=False):
+    query_params = {
+        'KeyConditionExpression': 'userId = :userId',
+        'ExpressionAttributeValues': {':userId': user_id}
+    }
+    pages = paginate_query(table_name, query_params, attributes=attributes, consistent_read=consistent_read)
+    return [item for items, _ in pages for item in items]  # Empty if the cart is empty
+
+# Generator that yields every item of a table (or of one segment of a parallel scan) page by page.
+# Scans read the whole table, so they are for offline work such as snapshots, never for request paths.
+def scan_items(table_name, attributes=None, segment=None, total_segments=None, page_size=None):
+    table = get_table(table_name)
+    params = _with_projection({}, attributes)
+    if total_segments:
+        params['Segment'] = segment
+        params['TotalSegments'] = total_segments
+    if page_size:
+        params['Limit'] = page_size
+
+    while True:
+        try:
+            response = _call('Scan', table.name, table.scan, dict(params))
+        except ClientError as error:
+            print(f"Error scanning {table_name}: {error}")
+            raise Exception(f"Failed to scan {table_name} from DynamoDB")
+
+        yield from response.get('Items', [])
+
+        if not response.get('LastEvaluatedKey'):
+            return
+        params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+# Function to query orders by order ID (with a Global Secondary Index, so reads are always eventually consistent)
+def query_order_track(order_id, table_name, attributes=None):
+    table = get_table(table_name)
     try:
-        response = table.query(
-            IndexName='OrderIndex',  # Assuming OrderIndex exists
-            KeyConditionExpression='orderId = :orderId',
-            ExpressionAttributeValues={':orderId': order_id}
-        )
+        response = _call('Query', table.name, table.query, _with_projection({
+            'IndexName': 'OrderIndex',  # Assuming OrderIndex exists
+            'KeyConditionExpression': 'orderId = :orderId',
+            'ExpressionAttributeValues': {':orderId': order_id}
+        }, attributes), index='OrderIndex')
         return response.get('Items', [])  # Return list of orders, empty if none found
     except ClientError as error:
         print(f"Error fetching orders: {error}")
         raise Exception("Failed to fetch orders from DynamoDB")
 
-# Function to delete an item from DynamoDB
-def delete_item(table_name, key):
-    table = dynamodb.Table(table_name)
+# Function to delete an item from DynamoDB, optionally only if a condition holds (e.g. attribute_exists(...) to find
+# out in the same call whether there was anything to delete; a failed condition raises ConditionalCheckFailedException)
+def delete_item(table_name, key, condition_expression=None):
+    table = get_table(table_name)
+    params = {'Key': key}
+    if condition_expression:
+        params['ConditionExpression'] = condition_expression
     try:
-        table.delete_item(Key=key)
+        _call('DeleteItem', table.name, table.delete_item, params, items=1)
+        _cache_invalidate(table_name, key)
         return True
     except ClientError as error:
         print(f"Error deleting item: {error}")
@@ -64,24 +559,71 @@ def delete_item(table_name, key):
 
 # Function to update an item in DynamoDB
 def update_item(table_name, key, update_expression_parts, expression_attribute_values, expression_attribute_names):
-    table = dynamodb.Table(table_name)
+    table = get_table(table_name)
     update_expression = 'SET ' + ', '.join(update_expression_parts)
     try:
-        response = table.update_item(
-            Key=key,
-            UpdateExpression=update_expression,
-            ExpressionAttributeNames=expression_attribute_names,
-            ExpressionAttributeValues=expression_attribute_values,
-            ReturnValues='ALL_NEW'
-        )
+        response = _call('UpdateItem', table.name, table.update_item, {
+            'Key': key,
+            'UpdateExpression': update_expression,
+            'ExpressionAttributeNames': expression_attribute_names,
+            'ExpressionAttributeValues': expression_attribute_values,
+            'ReturnValues': 'ALL_NEW'
+        }, items=1)
+        _cache_invalidate(table_name, key)
         return response.get('Attributes')  # Return the updated attributes
     except ClientError as error:
         print(f"Error updating item: {error}")
         raise error
 
+# Function to atomically add an amount to a numeric attribute with ADD, creating the item (or the attribute, starting
+# from 0) when it does not exist yet; returns the new value. Concurrent increments never overwrite each other.
+def increment_item(table_name, key, attribute, amount):
+    table = get_table(table_name)
+    try:
+        response = _call('UpdateItem', table.name, table.update_item, {
+            'Key': key,
+            'UpdateExpression': 'ADD #attribute :amount',
+            'ExpressionAttributeNames': {'#attribute': attribute},
+            'ExpressionAttributeValues': {':amount': amount},
+            'ReturnValues': 'UPDATED_NEW'
+        }, items=1)
+        _cache_invalidate(table_name, key)
+        return response.get('Attributes', {}).get(attribute)
+    except ClientError as error:
+        print(f"Error incrementing item: {error}")
+        raise error
+
+# Function to put an item only if a condition holds. Returns (True, None) when written, or (False, existing item)
+# when the condition failed; the existing item comes back with the failure, so no second read is needed.
+def put_item_if(table_name, item, condition_expression, expression_attribute_names=None,
+                expression_attribute_values=None):
+    table = get_table(table_name)
+    params = {
+        'Item': item,
+        'ConditionExpression': condition_expression,
+        'ReturnValuesOnConditionCheckFailure': 'ALL_OLD'
+    }
+    if expression_attribute_names:
+        params['ExpressionAttributeNames'] = expression_attribute_names
+    if expression_attribute_values:
+        params['ExpressionAttributeValues'] = expression_attribute_values
+    key_attributes = _written_key_attributes(table_name)
+    try:
+        _call('PutItem', table.name, table.put_item, params, items=1)
+        if key_attributes:
+            _cache_invalidate(table_name, {name: item[name] for name in key_attributes if name in item})
+        return True, None
+    except ClientError as error:
+        if error.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+            print(f"Error: {error}")
+            raise error
+        # The error carries the item in the low-level wire format
+        existing = error.response.get('Item') or {}
+        return False, {name: type_deserializer.deserialize(value) for name, value in existing.items()}
+
 # Function to query products based on various parameters like keywords, category, price range, etc.
-def query_products(params):
-    table = dynamodb.Table('Product')
+def query_products(params, attributes=None):
+    table = get_table('Product')
     query_params = {
         'KeyConditionExpression': 'keywords = :keywords',
         'ExpressionAttributeValues': {':keywords': params['keywords']},
@@ -103,8 +645,239 @@ def query_products(params):
         query_params['ExpressionAttributeValues'][':maxPrice'] = params.get('maxPrice', 999999)
     
     try:
-        response = table.query(**query_params)
+        response = _call('Query', table.name, table.query, _with_projection(query_params, attributes))
         return response.get('Items', [])  # Return matching items
     except ClientError as error:
         print(f"Error querying products: {error}")
         raise error
+
+# Function to split a free-text keywords string into normalized, de-duplicated search tokens
+def tokenize_keywords(text):
+    tokens = KEYWORD_TOKEN_PATTERN.findall((text or '').lower())
+    return list(dict.fromkeys(token for token in tokens if len(token) >= KEYWORD_MIN_TOKEN_LENGTH))
+
+# Function to build the sort key of a keyword index item; category and subcategory lead so they can be key-matched
+def keyword_index_sort_key(category, subcategory, product_id=''):
+    return f"{category or ''}#{subcategory or ''}#{product_id}"
+
+# Function to build the keyword index items for a product, one per token
+def build_keyword_index_items(product):
+    product_key = keyword_index_sort_key(product.get('category'), product.get('subcategory'), product['productId'])
+    return [{**product, 'token': token, 'productKey': product_key} for token in tokenize_keywords(product.get('keywords'))]
+
+# Function to list the keys of the index items a previous version of a product has and the new version does not
+# (dropped keywords, or every token when the category or subcategory changed and with it the productKey)
+def stale_keyword_index_keys(previous, product):
+    if not previous:
+        return []
+    current = {(item['token'], item['productKey']) for item in build_keyword_index_items(product)}
+    return [{'token': item['token'], 'productKey': item['productKey']}
+            for item in build_keyword_index_items(previous) if (item['token'], item['productKey']) not in current]
+
+# Function to build the price index key attributes of a product (none without a category, so the indexes stay sparse)
+def price_index_attributes(product):
+    attributes = {}
+    if product.get('category'):
+        attributes['categoryIndexKey'] = product['category']
+        if product.get('subcategory'):
+            attributes['subcategoryIndexKey'] = f"{product['category']}#{product['subcategory']}"
+    return attributes
+
+# Function to write one keyword index item per token of a product (tokens are unique, so no key repeats in a batch).
+# previous is the product as stored before this write (KEYWORD_INDEX_SOURCE_ATTRIBUTES suffice); its index items
+# that no longer apply are deleted in the same batch, so searches stop finding the product under old keywords.
+def save_keyword_index(product, previous=None):
+    try:
+        batch_write_items(KEYWORD_INDEX_TABLE, put_items=build_keyword_index_items(product),
+                          delete_keys=stale_keyword_index_keys(previous, product))
+        return True
+    except Exception as error:
+        print(f"Error indexing product keywords: {error}")
+        return False
+
+# Generator that runs a low-level client query page by page (clients are thread-safe), yielding (deserialized items,
+# items read, whether more pages follow). With first_page_size, pages start at that many items read and double, so a
+# caller can stop a query early at little cost; without it every page is a full (1 MB) page.
+def _client_query_pages(query_params, first_page_size=None):
+    params = dict(query_params)
+    params['ExpressionAttributeValues'] = {
+        name: type_serializer.serialize(value) for name, value in params['ExpressionAttributeValues'].items()
+    }
+    page_size = first_page_size
+    while True:
+        if page_size:
+            params['Limit'] = page_size
+            page_size *= 2
+        response = _call('Query', params['TableName'], get_client().query, dict(params), index=params.get('IndexName'))
+        items = [{name: type_deserializer.deserialize(value) for name, value in item.items()}
+                 for item in response.get('Items', [])]
+        more = 'LastEvaluatedKey' in response
+        yield items, response.get('ScannedCount', len(items)), more
+        if not more:
+            return
+        params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+# Function to run a low-level client query to completion and return deserialized items
+def _client_query_all(query_params):
+    return [item for items, _, _ in _client_query_pages(query_params) for item in items]
+
+# Function to build the keyword index query for a single token, narrowing by category on the sort key when possible
+def _keyword_token_query(token, params, attributes=None):
+    query_params = {
+        'TableName': KEYWORD_INDEX_TABLE,
+        'KeyConditionExpression': '#token = :token',
+        'ExpressionAttributeNames': {'#token': 'token'},
+        'ExpressionAttributeValues': {':token': token}
+    }
+    filters = []
+
+    if params.get('category'):
+        # category (and subcategory) prefix the sort key, so they narrow the read instead of filtering it
+        prefix = keyword_index_sort_key(params['category'], params.get('subcategory')) if params.get('subcategory') else f"{params['category']}#"
+        query_params['KeyConditionExpression'] += ' AND begins_with(productKey, :prefix)'
+        query_params['ExpressionAttributeValues'][':prefix'] = prefix
+    elif params.get('subcategory'):
+        filters.append('subcategory = :subcategory')
+        query_params['ExpressionAttributeValues'][':subcategory'] = params['subcategory']
+
+    if params.get('minPrice') is not None or params.get('maxPrice') is not None:
+        filters.append('price BETWEEN :minPrice AND :maxPrice')
+        query_params['ExpressionAttributeValues'][':minPrice'] = Decimal(str(params.get('minPrice') or 0))
+        query_params['ExpressionAttributeValues'][':maxPrice'] = Decimal(str(params.get('maxPrice') or 999999))
+
+    if filters:
+        query_params['FilterExpression'] = ' AND '.join(filters)
+    return _with_projection(query_params, attributes)
+
+# Function to build the price index query of a search: the category (or category#subcategory) partition,
+# read only between the price bounds
+def _price_range_query(params, attributes=None):
+    if params.get('subcategory'):
+        index_name, partition_key = SUBCATEGORY_PRICE_INDEX, 'subcategoryIndexKey'
+        partition = f"{params['category']}#{params['subcategory']}"
+    else:
+        index_name, partition_key, partition = CATEGORY_PRICE_INDEX, 'categoryIndexKey', params['category']
+
+    values = {':partition': partition}
+    if params.get('minPrice') is not None and params.get('maxPrice') is not None:
+        price_condition = 'price BETWEEN :minPrice AND :maxPrice'
+    elif params.get('minPrice') is not None:
+        price_condition = 'price >= :minPrice'
+    else:
+        price_condition = 'price <= :maxPrice'
+    for bound in ('minPrice', 'maxPrice'):
+        if params.get(bound) is not None:
+            values[f':{bound}'] = Decimal(str(params[bound]))
+
+    return _with_projection({
+        'TableName': PRODUCTS_TABLE,
+        'IndexName': index_name,
+        'KeyConditionExpression': f'{partition_key} = :partition AND {price_condition}',
+        'ExpressionAttributeValues': values
+    }, attributes)
+
+# Function to order search hits best match first: most matched tokens, then name. 'all' keeps only complete matches.
+def _rank_products(products, matches, token_count, match):
+    product_ids = [product_id for product_id in products if match == 'any' or matches[product_id] == token_count]
+    product_ids.sort(key=lambda product_id: (-matches[product_id], str(products[product_id].get('name', ''))))
+    return [products[product_id] for product_id in product_ids]
+
+# Function to rank the items of a category price range, matching the keyword tokens on each item
+def _rank_price_range(items, tokens, match):
+    products = {}
+    matches = {}
+    for item in items:
+        matched = len(set(tokens).intersection(tokenize_keywords(item.get('keywords'))))
+        if matched:
+            product = {name: value for name, value in item.items() if name not in PRICE_INDEX_ATTRIBUTES}
+            products[product['productId']] = product
+            matches[product['productId']] = matched
+    return _rank_products(products, matches, len(tokens), match)
+
+# Function to search a category price range through whichever index reads fewer items: the price range on the
+# price index, or the tokens' postings on the keyword index (price filtered). Neither size is known up front, so both
+# are read a page at a time (pages doubling), always advancing the side that has read less, until one is complete;
+# the search then costs at most about twice the cheaper path. The price range goes first, so a range that fits in
+# one probe page is a single query. A narrow keyword in a wide price range is answered from its postings, a common
+# keyword in a narrow range from the price index.
+def _search_price_bounded(params, tokens, match, attributes=None):
+    price_pages = _client_query_pages(_price_range_query(params, attributes), SEARCH_PROBE_ITEMS)
+    keyword_pages = {token: _client_query_pages(_keyword_token_query(token, params, attributes), SEARCH_PROBE_ITEMS)
+                     for token in tokens}
+    price_items, keyword_items = [], {token: [] for token in tokens}
+    read = {'price': 0, 'keywords': 0}
+    price_more, keyword_more = True, set(tokens)
+
+    def advance_price():
+        nonlocal price_more
+        items, item_count, price_more = next(price_pages)
+        price_items.extend(items)
+        read['price'] += item_count
+
+    def advance_keywords():
+        pending = sorted(keyword_more)
+        for token, (items, item_count, more) in zip(pending, run_in_parallel(
+                *[lambda token=token: next(keyword_pages[token]) for token in pending])):
+            keyword_items[token].extend(items)
+            read['keywords'] += item_count
+            if not more:
+                keyword_more.discard(token)
+
+    advance_price()
+    while price_more and keyword_more:
+        if read['price'] <= read['keywords']:
+            advance_price()
+        else:
+            advance_keywords()
+
+    if not price_more:
+        return _rank_price_range(price_items, tokens, match)
+    return _merge_keyword_results(list(keyword_items.values()), len(tokens), match)
+
+# Function to merge the per-token keyword index hits and rank them
+def _merge_keyword_results(results, token_count, match):
+    # Count how many search tokens each product matched. A product counts once per token even if the token has
+    # several index items for it (e.g. stale ones left under an old category).
+    products = {}
+    matches = {}
+    for items in results:
+        matched = set()
+        for item in items:
+            product_id = item['productId']
+            if product_id not in products:
+                products[product_id] = {name: value for name, value in item.items() if name not in ('token', 'productKey')}
+            matched.add(product_id)
+        for product_id in matched:
+            matches[product_id] = matches.get(product_id, 0) + 1
+
+    # 'all' keeps only products matching every token; 'any' keeps the union. Best matches come first either way
+    return _rank_products(products, matches, token_count, match)
+
+# Function to search products, querying every keyword token of the inverted index in parallel. When a category and
+# a price bound are given, the price index is raced against the keyword index and the cheaper one answers (the
+# keyword index alone stays the fallback). attributes limits the product attributes read (productId, name and
+# keywords are always read).
+def search_products(params, match='all', attributes=None):
+    tokens = tokenize_keywords(params.get('keywords'))[:KEYWORD_MAX_SEARCH_TOKENS]
+    if not tokens:
+        return []
+    if attributes:
+        attributes = list(dict.fromkeys(['productId', 'name', 'keywords', *attributes]))
+
+    if PRICE_INDEX_ENABLED and params.get('category') and (params.get('minPrice') is not None or params.get('maxPrice') is not None):
+        try:
+            return _search_price_bounded(params, tokens, match, attributes)
+        except ClientError as error:
+            if error.response.get('Error', {}).get('Code') not in ('ValidationException', 'ResourceNotFoundException'):
+                raise error
+            print(f"Price index unavailable, searching the keyword index instead: {error}")
+
+    try:
+        results = run_in_parallel(*[
+            lambda token=token: _client_query_all(_keyword_token_query(token, params, attributes)) for token in tokens
+        ])
+    except ClientError as error:
+        print(f"Error searching products: {error}")
+        raise error
+
+    return _merge_keyword_results(results, len(tokens), match)
@@ -0,0 +1,126 @@
+import os
+import time
+import hashlib
+import functools
+from helper.db_helper import put_item_if, save_item, delete_item
+from helper.response import build_response
+
+# Idempotency records: one item per (handler, client key), removed by DynamoDB TTL on expiresAt
+IDEMPOTENCY_TABLE = 'IdempotencyKeys'
+IDEMPOTENCY_HEADER = 'idempotency-key'
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+# How long a completed response is replayed for
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', str(24 * 60 * 60)))
+# How long an in-flight record blocks retries; past this the first attempt is presumed dead (keep >= the function timeout)
+IDEMPOTENCY_LOCK_SECONDS = int(os.environ.get('IDEMPOTENCY_LOCK_SECONDS', '60'))
+
+IN_PROGRESS = 'IN_PROGRESS'
+COMPLETED = 'COMPLETED'
+
+# The key is free when there is no record, its TTL has passed (TTL deletion lags) or its in-flight lock has expired
+_CLAIM_CONDITION = ('attribute_not_exists(idempotencyKey) OR expiresAt < :now '
+                    'OR (#status = :in_progress AND lockedUntil < :now)')
+
+
+# Function to read the Idempotency-Key header (header names are case-insensitive)
+def idempotency_key(event):
+    headers = (event or {}).get('headers') or {}
+    for name, value in headers.items():
+        if name.lower() == IDEMPOTENCY_HEADER:
+            return value
+    return None
+
+
+# Function to fingerprint the request, so a key reused for a different request is rejected instead of replayed
+def request_fingerprint(event):
+    query = sorted(((event or {}).get('queryStringParameters') or {}).items())
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(query).encode('utf-8'))
+    digest.update(((event or {}).get('body') or '').encode('utf-8'))
+    return digest.hexdigest()
+
+
+# Function to turn a stored record into the response returned to a retry
+def _replay(record, event):
+    if record.get('status') == COMPLETED:
+        response = dict(record['response'])
+        response['statusCode'] = int(response['statusCode'])
+        response['headers'] = {**(response.get('headers') or {}), 'Idempotent-Replayed': 'true'}
+        return response
+    return build_response(409, {'message': 'A request with this Idempotency-Key is still being processed'}, event,
+                          headers={'Retry-After': '1'})
+
+
+# Function to drop an in-flight record so the key can be used again
+def _release(record_key):
+    try:
+        delete_item(IDEMPOTENCY_TABLE, record_key)
+    except Exception as error:
+        print(f"Error releasing idempotency key: {error}")  # The lock expires on its own
+
+
+# Decorator that makes a handler safe to retry: requests carrying an Idempotency-Key run once, and every retry
+# with the same key gets the stored response back (or a 409 while the first attempt is still running).
+# Requests without the header run unchanged.
+def idempotent(handler):
+    handler_name = handler.__module__.rsplit('.', 1)[-1].replace('_', '-')
+
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        key = idempotency_key(event)
+        if key is None:
+            return handler(event, context)
+        if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            return build_response(400, {
+                'message': f'Idempotency-Key must be 1 to {IDEMPOTENCY_KEY_MAX_LENGTH} characters'
+            }, event)
+
+        record_key = {'idempotencyKey': f'{handler_name}#{key}'}
+        fingerprint = request_fingerprint(event)
+        now = int(time.time())
+
+        # Claim the key with one conditional put; if it is taken, the failed put hands back the stored record
+        try:
+            claimed, record = put_item_if(IDEMPOTENCY_TABLE, {
+                **record_key,
+                'status': IN_PROGRESS,
+                'requestHash': fingerprint,
+                'lockedUntil': now + IDEMPOTENCY_LOCK_SECONDS,
+                'expiresAt': now + IDEMPOTENCY_TTL_SECONDS
+            }, _CLAIM_CONDITION, {'#status': 'status'}, {':now': now, ':in_progress': IN_PROGRESS})
+        except Exception as error:
+            # Running unprotected could duplicate the write the client is guarding against, so fail instead
+            print(f"Error claiming idempotency key: {error}")
+            return build_response(500, {'message': 'Internal server error'}, event)
+
+        if not claimed:
+            if record.get('requestHash') != fingerprint:
+                return build_response(422, {
+                    'message': 'Idempotency-Key was already used for a different request'
+                }, event)
+            return _replay(record, event)
+
+        try:
+            response = handler(event, context)
+        except Exception:
+            _release(record_key)
+            raise
+
+        if response.get('statusCode', 500) >= 500:
+            _release(record_key)  # Server errors are not final; let the client retry for real
+            return response
+
+        saved = save_item({
+            **record_key,
+            'status': COMPLETED,
+            'requestHash': fingerprint,
+            'response': {name: response[name] for name in ('statusCode', 'headers', 'body', 'isBase64Encoded')
+                         if name in response},
+            'expiresAt': int(time.time()) + IDEMPOTENCY_TTL_SECONDS
+        }, IDEMPOTENCY_TABLE)
+        if not saved:
+            _release(record_key)  # Better a repeatable request than one stuck in progress until the lock expires
+        return response
+
+    return wrapper
+
@@ -0,0 +1,159 @@
+import os
+import sys
+import json
+import time
+import functools
+import contextvars
+
+# CloudWatch namespace the metric lines are published under
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'api-python')
+# Set DB_METRICS_ENABLED=false to stop emitting metric lines (calls are still made the same way)
+METRICS_ENABLED = os.environ.get('DB_METRICS_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+# Embedded Metric Format accepts at most 100 values per metric in one line
+EMF_MAX_VALUES = 100
+
+# Operations whose consumed capacity is read capacity; everything else consumes write capacity
+READ_OPERATIONS = frozenset(['GetItem', 'BatchGetItem', 'Query', 'Scan'])
+
+# DynamoDB calls recorded during the current invocation (None outside an instrumented handler).
+# A context variable rather than a global so calls made on worker threads are attributed to the right invocation.
+_invocation = contextvars.ContextVar('db_metrics_invocation', default=None)
+
+
+# Default sink: one Embedded Metric Format document per line on stdout, which CloudWatch Logs turns into metrics
+def stdout_sink(document):
+    sys.stdout.write(json.dumps(document, separators=(',', ':'), default=str) + '\n')
+
+
+_sink = stdout_sink
+
+
+# Function to replace where metric documents go (e.g. list.append for local testing); None restores stdout
+def set_sink(sink):
+    global _sink
+    previous = _sink
+    _sink = sink or stdout_sink
+    return previous
+
+
+# Function to split a ConsumedCapacity entry into (read units, write units)
+def _capacity_units(operation, consumed):
+    if 'ReadCapacityUnits' in consumed or 'WriteCapacityUnits' in consumed:
+        return float(consumed.get('ReadCapacityUnits', 0)), float(consumed.get('WriteCapacityUnits', 0))
+    units = float(consumed.get('CapacityUnits', 0))
+    return (units, 0.0) if operation in READ_OPERATIONS else (0.0, units)
+
+
+# Function to record one DynamoDB call of the current invocation (a no-op outside an instrumented handler)
+def record_call(operation, table, latency_ms, items=0, consumed_capacity=None, index=None, error=None):
+    calls = _invocation.get()
+    if calls is None:
+        return
+    if isinstance(consumed_capacity, dict):
+        consumed_capacity = [consumed_capacity]  # Single-item calls return one entry, batch calls a list per table
+    rcu = wcu = 0.0
+    for consumed in consumed_capacity or ():
+        read_units, write_units = _capacity_units(operation, consumed)
+        rcu += read_units
+        wcu += write_units
+    calls.append({
+        'operation': operation, 'table': table, 'index': index, 'latency_ms': latency_ms,
+        'items': items, 'rcu': rcu, 'wcu': wcu, 'error': error
+    })  # list.append is atomic, so parallel reads can record without a lock
+
+
+# Function to roll the recorded calls up into Embedded Metric Format documents: one per operation/table/index
+# (latencies as value arrays so CloudWatch can compute percentiles), plus an invocation total
+def build_documents(handler_name, calls, duration_ms):
+    timestamp = int(time.time() * 1000)
+    groups = {}
+    for call in calls:
+        groups.setdefault((call['operation'], call['table'], call['index']), []).append(call)
+
+    documents = []
+    for (operation, table, index), group in groups.items():
+        dimensions = ['Handler', 'Operation', 'Table'] + (['Index'] if index else [])
+        for start in range(0, len(group), EMF_MAX_VALUES):
+            chunk = group[start:start + EMF_MAX_VALUES]
+            document = {
+                '_aws': {'Timestamp': timestamp, 'CloudWatchMetrics': [{
+                    'Namespace': METRICS_NAMESPACE,
+                    'Dimensions': [dimensions],
+                    'Metrics': [
+                        {'Name': 'DynamoDBLatency', 'Unit': 'Milliseconds'},
+                        {'Name': 'DynamoDBCalls', 'Unit': 'Count'},
+                        {'Name': 'DynamoDBErrors', 'Unit': 'Count'},
+                        {'Name': 'ItemCount', 'Unit': 'Count'},
+                        {'Name': 'ConsumedRCU', 'Unit': 'Count'},
+                        {'Name': 'ConsumedWCU', 'Unit': 'Count'},
+                    ]
+                }]},
+                'Handler': handler_name,
+                'Operation': operation,
+                'Table': table,
+                'DynamoDBLatency': [round(call['latency_ms'], 3) for call in chunk],
+                'DynamoDBCalls': len(chunk),
+                'DynamoDBErrors': sum(1 for call in chunk if call['error']),
+                'ItemCount': sum(call['items'] for call in chunk),
+                'ConsumedRCU': sum(call['rcu'] for call in chunk),
+                'ConsumedWCU': sum(call['wcu'] for call in chunk),
+            }
+            if index:
+                document['Index'] = index
+            errors = sorted({call['error'] for call in chunk if call['error']})
+            if errors:
+                document['ErrorCodes'] = errors  # Logged property, not a metric
+            documents.append(document)
+
+    documents.append({
+        '_aws': {'Timestamp': timestamp, 'CloudWatchMetrics': [{
+            'Namespace': METRICS_NAMESPACE,
+            'Dimensions': [['Handler']],
+            'Metrics': [
+                {'Name': 'HandlerDuration', 'Unit': 'Milliseconds'},
+                {'Name': 'DynamoDBCalls', 'Unit': 'Count'},
+                {'Name': 'DynamoDBTime', 'Unit': 'Milliseconds'},
+                {'Name': 'ConsumedRCU', 'Unit': 'Count'},
+                {'Name': 'ConsumedWCU', 'Unit': 'Count'},
+            ]
+        }]},
+        'Handler': handler_name,
+        'HandlerDuration': round(duration_ms, 3),
+        'DynamoDBCalls': len(calls),
+        'DynamoDBTime': round(sum(call['latency_ms'] for call in calls), 3),  # Summed, so parallel calls can exceed the duration
+        'ConsumedRCU': sum(call['rcu'] for call in calls),
+        'ConsumedWCU': sum(call['wcu'] for call in calls),
+    })
+    return documents
+
+
+# Decorator for a lambda_handler: collects the DynamoDB calls it makes and emits the rolled-up metrics when it returns.
+# Metrics are keyed by the handler module (e.g. add-to-cart), so they stay per route behind the single-function router.
+def instrument_handler(handler):
+    handler_name = handler.__module__.rsplit('.', 1)[-1].replace('_', '-')
+
+    @functools.wraps(handler)
+    def wrapper(event, context):
+        if not METRICS_ENABLED:
+            return handler(event, context)
+        calls = []
+        token = _invocation.set(calls)
+        started = time.perf_counter()
+        try:
+            return handler(event, context)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            _invocation.reset(token)
+            try:
+                for document in build_documents(handler_name, calls, duration_ms):
+                    _sink(document)
+            except Exception as error:
+                print(f"Error emitting metrics: {error}")  # Metrics must never fail the request
+
+    return wrapper
+
+
+# Function to wrap a callable so it runs with the caller's invocation context on another thread
+def bind_context(call):
+    context = contextvars.copy_context()  # One copy per callable: a context cannot be entered by two threads at once
+    return functools.partial(context.run, call)
@@ -0,0 +1,250 @@
+import os
+import sys
+import json
+import time
+import uuid
+import queue
+import argparse
+import threading
+from datetime import datetime
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+from helper.connection import get_s3_client
+from helper.db_helper import paginate_query
+from helper.response import to_json
+from helper.metrics import bind_context
+
+ORDERS_TABLE = 'Orders'
+# Orders per Query page (DynamoDB also stops a page at 1 MB)
+EXPORT_PAGE_SIZE = 500
+# Parallel segments of one user's Orders partition; pages in flight are bounded so memory stays flat
+EXPORT_MAX_SEGMENTS = 16
+EXPORT_PAGES_PER_SEGMENT = 2
+# Where exports go: an S3 bucket when ORDER_EXPORT_BUCKET is set, otherwise a local directory (/tmp in Lambda)
+EXPORT_BUCKET = os.environ.get('ORDER_EXPORT_BUCKET') or None
+EXPORT_PREFIX = 'exports/orders/'
+EXPORT_DIR = os.environ.get('ORDER_EXPORT_DIR', '/tmp/order-exports')
+# S3 multipart part size (S3 requires at least 5 MiB for every part but the last) and download link lifetime
+EXPORT_PART_SIZE = 8 * 1024 * 1024
+EXPORT_URL_EXPIRES_SECONDS = 3600
+
+# Order ids are order-<uuid4>, so the hex digits after the prefix spread evenly over segment boundaries
+ORDER_ID_PREFIX = 'order-'
+
+# Marks the end of one segment in the page queue
+_DONE = object()
+
+
+# Sink that writes the export to a local file
+class LocalSink:
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, text):
+        self._file.write(text)
+
+    def close(self):
+        self._file.close()
+        return {'location': self.path}
+
+    def abort(self):
+        self._file.close()
+        os.remove(self.path)
+
+
+# Sink that streams the export to S3 as a multipart upload, holding at most one part in memory
+class S3Sink:
+    def __init__(self, bucket, key, part_size=EXPORT_PART_SIZE):
+        self.bucket = bucket
+        self.key = key
+        self.part_size = part_size
+        self._buffer = bytearray()
+        self._upload_id = None
+        self._parts = []
+
+    def write(self, text):
+        self._buffer += text.encode('utf-8')
+        if len(self._buffer) >= self.part_size:
+            self._upload_part()
+
+    def _upload_part(self):
+        client = get_s3_client()
+        if self._upload_id is None:
+            # Started on the first full part, so small exports are a single put_object
+            self._upload_id = client.create_multipart_upload(Bucket=self.bucket, Key=self.key,
+                                                             ContentType='application/x-ndjson')['UploadId']
+        part_number = len(self._parts) + 1
+        response = client.upload_part(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+                                      PartNumber=part_number, Body=bytes(self._buffer))
+        self._parts.append({'PartNumber': part_number, 'ETag': response['ETag']})
+        self._buffer = bytearray()
+
+    def close(self):
+        client = get_s3_client()
+        if self._upload_id is None:
+            client.put_object(Bucket=self.bucket, Key=self.key, Body=bytes(self._buffer),
+                              ContentType='application/x-ndjson')
+        else:
+            if self._buffer:
+                self._upload_part()
+            client.complete_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+                                             MultipartUpload={'Parts': self._parts})
+        url = client.generate_presigned_url('get_object', Params={'Bucket': self.bucket, 'Key': self.key},
+                                            ExpiresIn=EXPORT_URL_EXPIRES_SECONDS)
+        return {'location': f's3://{self.bucket}/{self.key}', 'url': url}
+
+    def abort(self):
+        if self._upload_id is not None:
+            get_s3_client().abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id)
+
+
+# Function to open the configured sink for a new export of a user's orders
+def open_sink(user_id, bucket=None, directory=None):
+    name = f"orders-{quote(user_id, safe='')}-{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.ndjson"
+    bucket = bucket or EXPORT_BUCKET
+    if bucket and not directory:
+        return S3Sink(bucket, EXPORT_PREFIX + name)
+    return LocalSink(os.path.join(directory or EXPORT_DIR, name))
+
+
+# Function to split the orderId sort key range into contiguous segments; returns (low, high) bounds, None = open
+def segment_bounds(segments):
+    boundaries = [f'{ORDER_ID_PREFIX}{(number * 256) // segments:02x}' for number in range(1, segments)]
+    lows = [None] + boundaries
+    highs = boundaries + [None]
+    return list(zip(lows, highs))
+
+
+# Function to build the Query for one segment: orderId in [low, high), optionally orderDate in [date_from, date_to)
+def segment_query(user_id, low=None, high=None, date_from=None, date_to=None):
+    values = {':userId': user_id}
+    key_condition = 'userId = :userId'
+    filters = []
+    if low is not None and high is not None:
+        # Key conditions allow one comparison on the sort key; BETWEEN is inclusive, so the filter drops an order
+        # sitting exactly on the upper bound (it belongs to the next segment)
+        key_condition += ' AND orderId BETWEEN :low AND :high'
+        filters.append('orderId < :high')
+    elif low is not None:
+        key_condition += ' AND orderId >= :low'
+    elif high is not None:
+        key_condition += ' AND orderId < :high'
+    if low is not None:
+        values[':low'] = low
+    if high is not None:
+        values[':high'] = high
+
+    # orderDate is not part of the key, so a date range is a filter (ISO strings compare chronologically)
+    if date_from:
+        filters.append('orderDate >= :dateFrom')
+        values[':dateFrom'] = date_from
+    if date_to:
+        filters.append('orderDate < :dateTo')
+        values[':dateTo'] = date_to
+
+    params = {'KeyConditionExpression': key_condition, 'ExpressionAttributeValues': values}
+    if filters:
+        params['FilterExpression'] = ' AND '.join(filters)
+    return params
+
+
+# Generator that yields one segment's orders a page at a time
+def iter_order_pages(user_id, low=None, high=None, date_from=None, date_to=None, page_size=EXPORT_PAGE_SIZE):
+    for items, _ in paginate_query(ORDERS_TABLE, segment_query(user_id, low, high, date_from, date_to),
+                                   page_size=page_size):
+        if items:
+            yield items
+
+
+# Function to run one segment on a worker thread, handing its pages to the writer through the bounded queue
+def _produce(pages, output, stop):
+    try:
+        for items in pages:
+            if stop.is_set():
+                return
+            output.put(items)  # Blocks while the writer is behind, which keeps memory bounded
+    except Exception as error:
+        output.put(error)
+    finally:
+        output.put(_DONE)
+
+
+# Generator that yields pages from several segments as they arrive; a failing segment re-raises its error
+def _iter_parallel_pages(segment_pages):
+    output = queue.Queue(maxsize=len(segment_pages) * EXPORT_PAGES_PER_SEGMENT)
+    stop = threading.Event()
+    remaining = len(segment_pages)
+    with ThreadPoolExecutor(max_workers=len(segment_pages), thread_name_prefix='export') as executor:
+        for pages in segment_pages:
+            executor.submit(bind_context(_produce), pages, output, stop)
+        try:
+            while remaining:
+                entry = output.get()
+                if entry is _DONE:
+                    remaining -= 1
+                elif isinstance(entry, Exception):
+                    raise entry
+                else:
+                    yield entry
+        finally:
+            # On an error (or an abandoned generator) stop the other segments and drain the queue so none stays blocked
+            stop.set()
+            while remaining:
+                if output.get() is _DONE:
+                    remaining -= 1
+
+
+# Function to export every order of a user as newline-delimited JSON to a sink, page by page; returns a report
+# with the sink's handle. Memory stays flat however many orders the user has: only the pages in flight are held.
+# With several segments, orders are written in the order their pages arrive.
+def export_orders(user_id, sink, segments=1, date_from=None, date_to=None, page_size=EXPORT_PAGE_SIZE):
+    started = time.perf_counter()
+    segment_pages = [iter_order_pages(user_id, low, high, date_from, date_to, page_size)
+                     for low, high in segment_bounds(segments)]
+    pages = segment_pages[0] if len(segment_pages) == 1 else _iter_parallel_pages(segment_pages)
+
+    report = {'userId': user_id, 'orders': 0, 'bytes': 0, 'segments': segments}
+    try:
+        for items in pages:
+            text = ''.join(to_json(order) + '\n' for order in items)
+            sink.write(text)
+            report['orders'] += len(items)
+            report['bytes'] += len(text.encode('utf-8'))
+        report['export'] = sink.close()
+    except Exception:
+        try:
+            sink.abort()
+        except Exception as error:
+            print(f"Error aborting export: {error}")
+        raise
+
+    report['seconds'] = round(time.perf_counter() - started, 3)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a user's orders as newline-delimited JSON.")
+    parser.add_argument('user_id')
+    parser.add_argument('--output-dir', help=f'local directory to write to (default {EXPORT_DIR}, or S3 with --bucket)')
+    parser.add_argument('--bucket', help='S3 bucket to upload the export to (default ORDER_EXPORT_BUCKET)')
+    parser.add_argument('--segments', type=int, default=1, help=f'parallel sort key segments (1-{EXPORT_MAX_SEGMENTS})')
+    parser.add_argument('--from', dest='date_from', help='only orders on or after this ISO date')
+    parser.add_argument('--to', dest='date_to', help='only orders before this ISO date')
+    parser.add_argument('--endpoint-url', help='DynamoDB endpoint, e.g. http://localhost:8000 for DynamoDB Local')
+    args = parser.parse_args(argv)
+
+    if not 1 <= args.segments <= EXPORT_MAX_SEGMENTS:
+        parser.error(f'--segments must be between 1 and {EXPORT_MAX_SEGMENTS}')
+    if args.endpoint_url:
+        os.environ['DYNAMODB_ENDPOINT_URL'] = args.endpoint_url  # Read when the connection layer first connects
+
+    sink = open_sink(args.user_id, bucket=args.bucket, directory=args.output_dir)
+    report = export_orders(args.user_id, sink, args.segments, args.date_from, args.date_to)
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+import threading
+from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor
+from helper.validation import validate_product
+from helper.db_helper import batch_write_items, build_keyword_index_items, price_index_attributes, KEYWORD_INDEX_TABLE
+from helper.db_helper import batch_get_items, stale_keyword_index_keys, KEYWORD_INDEX_SOURCE_ATTRIBUTES
+from helper.metrics import bind_context
+
+# Rows validated and written together by one worker
+IMPORT_CHUNK_SIZE = 500
+IMPORT_WORKERS = 8
+# Imports run for minutes, so allow more throttling retries than request-path batch calls
+IMPORT_MAX_RETRIES = 10
+# Only the first rejected rows are kept in the report; the rest are counted (and passed to on_reject)
+MAX_REPORTED_REJECTS = 100
+
+PRODUCTS_TABLE = 'Product'
+
+
+# Function to build the DynamoDB item for a validated product (same shape create-product writes)
+def build_product_item(product):
+    product_item = {
+        'productId': product.productId,
+        'name': product.name,
+        'category': product.category or None,
+        'subcategory': product.subcategory or None,
+        'price': Decimal(str(product.price)),  # Use Decimal for precise floating point handling
+        'keywords': product.keywords,
+    }
+    if product.stock is not None:
+        product_item['stock'] = product.stock  # Only products with a stock attribute are decremented at checkout
+    return product_item
+
+
+# Generator that reads products from a text stream one row at a time, yielding (line number, row)
+def iter_product_rows(stream, file_format):
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, {name: value for name, value in row.items() if value != ''}  # Empty cells mean "not set"
+    elif file_format == 'ndjson':
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line)
+            except ValueError as error:
+                yield line_number, ValueError(f"Invalid JSON: {error}")  # Rejected by the worker like any bad row
+    else:
+        raise ValueError(f"Unsupported import format: {file_format}")
+
+
+# Function to guess the import format from a file name
+def detect_format(file_name):
+    return 'csv' if file_name.lower().endswith('.csv') else 'ndjson'
+
+
+# Function to validate one chunk of rows and write the valid ones (products and keyword index items)
+def _import_chunk(chunk):
+    products = {}
+    rejected = []
+    for line_number, row in chunk:
+        if isinstance(row, Exception):
+            rejected.append({'line': line_number, 'error': str(row)})
+            continue
+        try:
+            product_item = build_product_item(validate_product(row))
+            products[product_item['productId']] = product_item  # A later row for the same id wins within a chunk
+        except (ValueError, TypeError, AttributeError) as error:
+            rejected.append({'line': line_number, 'error': str(error)})
+
+    # Re-imported products may have changed keywords or category: read the stored versions (one projected batch
+    # read) so the index items they leave behind are deleted along with the new ones being written
+    previous = {item['productId']: item for item in batch_get_items(
+        PRODUCTS_TABLE, [{'productId': product_id} for product_id in products],
+        attributes=KEYWORD_INDEX_SOURCE_ATTRIBUTES, consistent_read=True)} if products else {}
+    stale_keys = [key for product_id, product in products.items()
+                  for key in stale_keyword_index_keys(previous.get(product_id), product)]
+
+    index_items = [index_item for product in products.values() for index_item in build_keyword_index_items(product)]
+    product_items = [{**product, **price_index_attributes(product)} for product in products.values()]
+    batch_write_items(PRODUCTS_TABLE, put_items=product_items, max_retries=IMPORT_MAX_RETRIES)
+    batch_write_items(KEYWORD_INDEX_TABLE, put_items=index_items, delete_keys=stale_keys, max_retries=IMPORT_MAX_RETRIES)
+    return len(products), rejected
+
+
+# Function to import products from (line number, row) pairs using parallel workers; returns a report
+def import_products(rows, workers=IMPORT_WORKERS, chunk_size=IMPORT_CHUNK_SIZE, on_reject=None):
+    report = {'rows': 0, 'imported': 0, 'rejected': 0, 'rejects': [], 'failedChunks': 0}
+    report_lock = threading.Lock()
+    # Bound the chunks in flight so memory stays flat however large the file is
+    in_flight = threading.BoundedSemaphore(workers * 2)
+    started = time.perf_counter()
+
+    def record(future):
+        in_flight.release()
+        with report_lock:
+            try:
+                imported, rejected = future.result()
+            except Exception as error:
+                print(f"Error importing chunk: {error}")
+                report['failedChunks'] += 1
+                return
+            report['imported'] += imported
+            report['rejected'] += len(rejected)
+            for reject in rejected:
+                if len(report['rejects']) < MAX_REPORTED_REJECTS:
+                    report['rejects'].append(reject)
+                if on_reject:
+                    on_reject(reject)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='import') as executor:
+        chunk = []
+        for line_number, row in rows:
+            report['rows'] += 1
+            chunk.append((line_number, row))
+            if len(chunk) >= chunk_size:
+                in_flight.acquire()
+                executor.submit(bind_context(_import_chunk), chunk).add_done_callback(record)
+                chunk = []
+        if chunk:
+            in_flight.acquire()
+            executor.submit(bind_context(_import_chunk), chunk).add_done_callback(record)
+
+    elapsed = time.perf_counter() - started
+    report['seconds'] = round(elapsed, 3)
+    report['rowsPerSecond'] = round(report['imported'] / elapsed, 1) if elapsed else None
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bulk import products from a CSV or NDJSON file.')
+    parser.add_argument('path', help="file to import, or '-' for stdin")
+    parser.add_argument('--format', choices=['csv', 'ndjson'], help='defaults to the file extension (.csv, else ndjson)')
+    parser.add_argument('--workers', type=int, default=IMPORT_WORKERS)
+    parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE)
+    parser.add_argument('--rejects', help='write every rejected row to this NDJSON file')
+    parser.add_argument('--endpoint-url', help='DynamoDB endpoint, e.g. http://localhost:8000 for DynamoDB Local')
+    args = parser.parse_args(argv)
+
+    if args.endpoint_url:
+        os.environ['DYNAMODB_ENDPOINT_URL'] = args.endpoint_url  # Read when the connection layer first connects
+
+    file_format = args.format or detect_format(args.path)
+    rejects_file = open(args.rejects, 'w') if args.rejects else None
+    on_reject = (lambda reject: rejects_file.write(json.dumps(reject) + '\n')) if rejects_file else None
+    stream = sys.stdin if args.path == '-' else open(args.path, newline='', encoding='utf-8')
+    try:
+        report = import_products(iter_product_rows(stream, file_format), args.workers, args.chunk_size, on_reject)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if rejects_file:
+            rejects_file.close()
+
+    print(json.dumps(report, indent=2))
+    return 0 if not report['failedChunks'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+import gzip
+import json
+import base64
+import hashlib
+from decimal import Decimal
+from datetime import date, datetime
+
+# Bodies smaller than this are sent as-is; compressing them costs more CPU than it saves in egress
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 5
+
+
+# Function to convert the non-JSON types DynamoDB and the handlers produce; only called for those values
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)  # DynamoDB string/number sets
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(value).decode('ascii')  # DynamoDB binary attributes
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+# One shared encoder: compact separators and a default hook keep everything on the C encoder fast path
+_encoder = json.JSONEncoder(default=_json_default, separators=(',', ':'), ensure_ascii=False)
+
+
+# Same encoder with sorted keys, for bodies that get an ETag: the same content always hashes the same,
+# whatever order DynamoDB returned the attributes in
+_canonical_encoder = json.JSONEncoder(default=_json_default, separators=(',', ':'), ensure_ascii=False, sort_keys=True)
+
+
+# Function to serialize a handler payload (items with Decimals, sets, datetimes) to a JSON string
+def to_json(data):
+    return _encoder.encode(data)
+
+
+# Function to compute an ETag from a serialized body. It is weak because the same content may be sent
+# plain or gzip-encoded, which are different byte streams but the same resource state.
+def compute_etag(payload):
+    return 'W/"' + hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest() + '"'
+
+
+# Function to check whether the client's If-None-Match header already names this ETag (weak comparison, or *)
+def if_none_match(event, etag):
+    headers = (event or {}).get('headers') or {}
+    for name, value in headers.items():
+        if name.lower() == 'if-none-match' and value:
+            candidates = [candidate.strip() for candidate in value.split(',')]
+            opaque_tag = etag.removeprefix('W/')
+            return '*' in candidates or any(candidate.removeprefix('W/') == opaque_tag for candidate in candidates)
+    return False
+
+
+# Function to read the q-value of one Accept-Encoding element ("gzip;q=0.5"); 1 when absent, 0 when malformed
+def _coding_quality(parameters):
+    for parameter in parameters:
+        name, _, value = parameter.partition('=')
+        if name.strip().lower() == 'q':
+            try:
+                return float(value.strip())
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+# Function to check whether the client accepts a gzip-encoded response: gzip (or x-gzip) listed with a non-zero
+# q-value, or failing that a non-zero "*". "gzip;q=0" refuses it even when "*" is allowed.
+def accepts_gzip(event):
+    headers = (event or {}).get('headers') or {}
+    for name, value in headers.items():
+        if name.lower() == 'accept-encoding' and value:
+            qualities = {}
+            for element in value.split(','):
+                coding, *parameters = element.split(';')
+                qualities[coding.strip().lower()] = _coding_quality(parameters)
+            quality = qualities.get('gzip', qualities.get('x-gzip', qualities.get('*', 0.0)))
+            return quality > 0
+    return False
+
+
+# Function to build the API Gateway response envelope, gzip-compressing large bodies when the client allows it
+def build_response(status_code, body, event=None, headers=None):
+    return _envelope(status_code, to_json(body), event, headers)
+
+
+# Function to build a response for a pollable read: 200 with an ETag, or an empty 304 when the client's
+# If-None-Match already matches, so unchanged polls skip the body, compression and egress
+def build_conditional_response(status_code, body, event=None, headers=None):
+    payload = _canonical_encoder.encode(body)
+    etag = compute_etag(payload)
+    conditional_headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}  # Clients revalidate on every poll
+    if headers:
+        conditional_headers.update(headers)
+    if if_none_match(event, etag):
+        return {'statusCode': 304, 'headers': conditional_headers, 'body': '', 'isBase64Encoded': False}
+    return _envelope(status_code, payload, event, conditional_headers)
+
+
+# Function to wrap an already serialized payload in the response envelope
+def _envelope(status_code, payload, event, headers):
+    response_headers = {'Content-Type': 'application/json'}
+    if headers:
+        response_headers.update(headers)
+
+    if len(payload) >= GZIP_MIN_BYTES:
+        response_headers['Vary'] = 'Accept-Encoding'  # Caches must key large responses on the client's encodings
+    if len(payload) >= GZIP_MIN_BYTES and accepts_gzip(event):
+        compressed = gzip.compress(payload.encode('utf-8'), compresslevel=GZIP_LEVEL)
+        response_headers['Content-Encoding'] = 'gzip'
+        return {
+            'statusCode': status_code,
+            'headers': response_headers,
+            'body': base64.b64encode(compressed).decode('ascii'),
+            'isBase64Encoded': True  # API Gateway decodes this back to the binary gzip stream
+        }
+
+    return {
+        'statusCode': status_code,
+        'headers': response_headers,
+        'body': payload,
+        'isBase64Encoded': False
+    }
@@ -0,0 +1,131 @@
+import os
+import re
+import importlib
+import threading
+from helper.response import build_response
+
+# Every HTTP route of the API: (method, path template, handler module under handler/, route group).
+# Groups let a deployment split the API into a few functions instead of one (see ROUTE_GROUPS below).
+ROUTES = [
+    ('POST', '/api/register', 'register-user', 'account'),
+    ('GET', '/api/profile', 'get-user-profile', 'account'),
+    ('PUT', '/api/profile', 'update-profile', 'account'),
+    ('GET', '/api/products', 'search-products', 'catalog'),
+    ('POST', '/api/products', 'create-product', 'catalog'),
+    ('GET', '/api/products/suggest', 'suggest-products', 'catalog'),
+    ('GET', '/api/products/{productId}', 'get-product', 'catalog'),
+    ('GET', '/api/cart', 'get-cart', 'cart'),
+    ('POST', '/api/cart/add', 'add-to-cart', 'cart'),
+    ('DELETE', '/api/cart/remove', 'remove-from-cart', 'cart'),
+    ('DELETE', '/api/cart', 'clear-cart', 'cart'),
+    ('POST', '/api/checkout', 'checkout', 'orders'),
+    ('GET', '/api/orders', 'get-order-history', 'orders'),
+    ('GET', '/api/orders/summary', 'get-order-summary', 'orders'),
+    ('GET', '/api/orders/export', 'export-orders', 'orders'),
+    ('GET', '/api/orders/{orderID}/status', 'order-tracking', 'orders'),
+]
+
+# Comma-separated route groups this function serves; empty means every route (single-function deployment)
+ROUTE_GROUPS = [group.strip() for group in os.environ.get('ROUTE_GROUPS', '').split(',') if group.strip()]
+# Comma-separated handlers to import at init instead of on first request (e.g. with provisioned concurrency)
+ROUTER_PRELOAD = [name.strip() for name in os.environ.get('ROUTER_PRELOAD', '').split(',') if name.strip()]
+
+# Route tables built on first use: exact (method, path) matches, and templates with {parameters} as regexes
+_static_routes = None
+_template_routes = None
+# lambda_handler functions imported so far, by handler module name
+_handlers = {}
+_handlers_lock = threading.Lock()
+
+
+# Function to turn a path template such as /api/orders/{orderID}/status into a regex with named groups
+def _compile_template(template):
+    parts = re.split(r'\{(\w+)\+?\}', template)
+    pattern = ''.join(re.escape(part) if position % 2 == 0 else f'(?P<{part}>[^/]+)' for position, part in enumerate(parts))
+    return re.compile(f'^{pattern}$')
+
+
+# Function to build the route tables for the groups this function serves
+def _route_tables():
+    global _static_routes, _template_routes
+    if _static_routes is None:
+        static_routes = {}
+        template_routes = []
+        for method, template, handler_name, group in ROUTES:
+            if ROUTE_GROUPS and group not in ROUTE_GROUPS:
+                continue
+            if '{' in template:
+                template_routes.append((method, template, _compile_template(template), handler_name))
+            else:
+                static_routes[(method, template)] = handler_name
+        _static_routes, _template_routes = static_routes, template_routes
+    return _static_routes, _template_routes
+
+
+# Function to import a handler module on first use and return its lambda_handler
+def load_handler(handler_name):
+    handler = _handlers.get(handler_name)
+    if handler is None:
+        with _handlers_lock:
+            handler = _handlers.get(handler_name)
+            if handler is None:
+                # handler/ is a namespace package, so hyphenated module names import like any other
+                handler = _handlers[handler_name] = importlib.import_module(f'handler.{handler_name}').lambda_handler
+    return handler
+
+
+# Function to import the handlers listed in ROUTER_PRELOAD (or the given names) ahead of their first request
+def preload(handler_names=None):
+    for handler_name in handler_names if handler_names is not None else ROUTER_PRELOAD:
+        load_handler(handler_name)
+
+
+# Function to find the handler for a request; returns (handler name, path parameters, methods allowed on the path)
+def resolve(method, path):
+    static_routes, template_routes = _route_tables()
+    handler_name = static_routes.get((method, path))
+    if handler_name:
+        return handler_name, {}, [method]
+
+    allowed = [route_method for route_method, route_path in static_routes if route_path == path]
+    for route_method, _, pattern, route_handler in template_routes:
+        match = pattern.match(path)
+        if not match:
+            continue
+        if route_method == method:
+            return route_handler, match.groupdict(), [method]
+        allowed.append(route_method)
+    return None, {}, allowed
+
+
+# Function to read the method and path of an API Gateway HTTP API (v2) or REST API (v1) event
+def request_method_and_path(event):
+    http = (event.get('requestContext') or {}).get('http')
+    if http:
+        method, path = http.get('method'), event.get('rawPath') or http.get('path')
+    else:
+        method, path = event.get('httpMethod'), event.get('path')
+    path = path or '/'
+    if len(path) > 1 and path.endswith('/'):
+        path = path.rstrip('/')
+
+    # Named stages prefix the raw path with the stage name (the $default stage does not)
+    stage = (event.get('requestContext') or {}).get('stage')
+    if stage and stage != '$default' and path.startswith(f'/{stage}/'):
+        path = path[len(stage) + 1:]
+    return (method or 'GET').upper(), path
+
+
+# Function to dispatch an API Gateway event to the lambda_handler of its route
+def dispatch(event, context):
+    method, path = request_method_and_path(event)
+    handler_name, path_parameters, allowed = resolve(method, path)
+    if handler_name is None:
+        if allowed:
+            return build_response(405, {'message': f'Method {method} not allowed'}, event,
+                                  headers={'Allow': ', '.join(sorted(set(allowed)))})
+        return build_response(404, {'message': f'No route for {method} {path}'}, event)
+
+    if path_parameters:
+        event = dict(event, pathParameters={**(event.get('pathParameters') or {}), **path_parameters})
+    return load_handler(handler_name)(event, context)
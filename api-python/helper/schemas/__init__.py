@@ -0,0 +1,2 @@
+# One module per schema so a handler only builds (and pays for) the schemas it actually validates.
+# Import them through helper.validation, which loads each module on first use.
@@ -0,0 +1,9 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class CartItem(BaseModel):
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+    userId: str
+    productId: str
+    quantity: int = Field(default=1, gt=0)  # Default quantity to 1 if not provided; must be greater than 0
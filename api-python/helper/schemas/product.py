@@ -0,0 +1,16 @@
+from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+
+
+# Product Validation Schema
+class ProductSchema(BaseModel):
+    # Numbers sent for string fields are accepted as strings, as they were before
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+    productId: str  # Product ID is required and should be a string
+    name: str  # Name is required
+    category: Optional[str] = None  # Category is optional and can be None or empty
+    subcategory: Optional[str] = None  # Subcategory is optional and can be None or empty
+    price: float = Field(gt=0)  # Price is required and must be > 0
+    keywords: str  # Keywords are required and should be a string
+    stock: Optional[int] = Field(default=None, ge=0)  # Units in stock; leave out to not track inventory for the product
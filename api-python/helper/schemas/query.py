@@ -0,0 +1,20 @@
+from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+
+# Query Parameters Validation Schema
+class QuerySchema(BaseModel):
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+    keywords: str  # Keywords are required and should be a string
+    category: Optional[str] = None  # Category is optional and can be None or empty
+    subcategory: Optional[str] = None  # Subcategory is optional and can be None or empty
+    minPrice: Optional[float] = Field(default=None, gt=0)  # Minimum price is optional and must be > 0
+    maxPrice: Optional[float] = Field(default=None, gt=0)  # Maximum price is optional and must be > 0
+
+    # Validate price range once both bounds are parsed
+    @model_validator(mode='after')
+    def validate_price_range(self):
+        if self.minPrice is not None and self.maxPrice is not None and self.minPrice > self.maxPrice:
+            raise ValueError("minPrice cannot be greater than maxPrice")
+        return self
@@ -0,0 +1,11 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+
+# User Validation Schema
+class UserSchema(BaseModel):
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+    name: str  # Name is required
+    email: str  # Email is required
+    password: str = Field(min_length=6)  # Password is required and must be at least 6 characters long
+    shippingAddress: str = Field(min_length=5)  # Shipping address is required and must be at least 5 characters long
@@ -0,0 +1,325 @@
+import os
+import sys
+import json
+import time
+import heapq
+import bisect
+import itertools
+import codecs
+import argparse
+import threading
+from helper.connection import get_s3_client
+from helper.db_helper import scan_items, run_in_parallel, tokenize_keywords, PRODUCTS_TABLE
+from helper.db_helper import KEYWORD_TOKEN_PATTERN, KEYWORD_MIN_TOKEN_LENGTH
+from helper.response import to_json
+
+# Suggestion list sizes
+SUGGEST_DEFAULT_LIMIT = 10
+SUGGEST_MAX_LIMIT = 25
+# Upper bound on products ranked per query, so a one-letter prefix costs about as much as a long one
+SUGGEST_MAX_CANDIDATES = 200
+# Prefixes matching more tokens than this (short ones, like "c") keep their merged best candidates until the next add
+SUGGEST_MEMO_MIN_TOKENS = 32
+# Catalog snapshot the index is built from: a local path or s3://bucket/key of an NDJSON file written by
+# write_snapshot (on a schedule by the build-suggest-snapshot handler). Without one, the index is built from a
+# parallel Scan of the Product table, which is only meant for local development.
+SUGGEST_SNAPSHOT = os.environ.get('SUGGEST_SNAPSHOT') or None
+SUGGEST_SCAN_SEGMENTS = 4
+# Age after which the index is rebuilt in the background (requests keep using the current one meanwhile)
+SUGGEST_REFRESH_SECONDS = float(os.environ.get('SUGGEST_REFRESH_SECONDS', '300'))
+# Time between background attempts to load the index while a container has none (e.g. no snapshot written yet)
+SUGGEST_RETRY_SECONDS = 30
+
+# Product attributes the index needs
+SUGGEST_ATTRIBUTES = ['productId', 'name', 'keywords']
+
+
+# Function to build the key products are ranked by in the index: shortest name first, then by name and productId
+def _rank_key(product):
+    name = product.get('name') or ''
+    return len(name), name.lower(), product['productId']
+
+
+# Prefix index over the tokens of product names and keywords: a sorted token array (bisect finds the first token
+# with a prefix, the matching ones follow it) and a posting list of product ordinals per token. Every posting list is
+# kept in rank order (shortest name first), so merging the lists of a broad prefix yields the best-ranked candidates
+# first, however the matching tokens sort.
+class PrefixIndex:
+    def __init__(self):
+        self._tokens = []  # Sorted distinct tokens
+        self._postings = {}  # Token -> ordinals of the products that contain it, in rank order
+        self._products = []  # Ordinal -> (productId, name, lowercase name)
+        self._ranks = []  # Ordinal -> rank key (name length, lowercase name, productId)
+        self._product_tokens = []  # Ordinal -> tokens, to unlink a product when it is replaced
+        self._ordinals = {}  # productId -> ordinal
+        self._top = {}  # Broad prefix -> (its best SUGGEST_MAX_CANDIDATES ordinals, whether that is all of them)
+        self._lock = threading.Lock()
+
+    # Function to build an index from many products at once (tokens are sorted once, not inserted one by one).
+    # Products are linked in rank order, so ordinals follow rank and every posting is an append.
+    @classmethod
+    def build(cls, products):
+        index = cls()
+        for product in sorted(products, key=_rank_key):
+            index._link(product)
+        index._tokens = sorted(index._postings)
+        return index
+
+    def __len__(self):
+        return len(self._ordinals)
+
+    # Function to add a product's entry and postings, replacing an earlier version of the same product
+    def _link(self, product):
+        product_id = product['productId']
+        name = product.get('name') or ''
+        tokens = tokenize_keywords(f"{name} {product.get('keywords') or ''}")
+
+        rank = _rank_key(product)
+        ordinal = self._ordinals.get(product_id)
+        if ordinal is not None:
+            for token in self._product_tokens[ordinal]:
+                self._postings[token].remove(ordinal)  # Emptied tokens stay; they simply match nothing
+            self._products[ordinal] = (product_id, name, name.lower())
+            self._ranks[ordinal] = rank
+            self._product_tokens[ordinal] = tokens
+        else:
+            ordinal = self._ordinals[product_id] = len(self._products)
+            self._products.append((product_id, name, name.lower()))
+            self._ranks.append(rank)
+            self._product_tokens.append(tokens)
+
+        new_tokens = []
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = []
+                new_tokens.append(token)
+            # Built indexes link products in rank order, so this appends; added or renamed products are inserted
+            bisect.insort(postings, ordinal, key=self._ranks.__getitem__)
+        return new_tokens
+
+    # Function to add or replace one product in a built index (e.g. right after create-product saved it)
+    def add(self, product):
+        with self._lock:
+            for token in self._link(product):
+                bisect.insort(self._tokens, token)
+            self._top = {}
+
+    # Function to suggest products for what the user has typed so far: every complete word must match a token and
+    # the last (partial) word a token prefix. Names starting with the typed text rank first, then shorter names.
+    def suggest(self, query, limit=SUGGEST_DEFAULT_LIMIT):
+        words = KEYWORD_TOKEN_PATTERN.findall((query or '').lower())
+        if not words:
+            return []
+        *complete_words, prefix = words
+
+        candidates = None
+        for word in complete_words:
+            if len(word) < KEYWORD_MIN_TOKEN_LENGTH:
+                continue  # Too short to be indexed, so it cannot narrow the match
+            postings = set(self._postings.get(word, ()))
+            candidates = postings if candidates is None else candidates & postings
+            if not candidates:
+                return []
+
+        typed = ' '.join(words)
+        ranked = sorted((self._products[ordinal] for ordinal in self._prefix_matches(prefix, candidates)),
+                        key=lambda product: (not product[2].startswith(typed), len(product[1]), product[2]))
+        return [{'productId': product_id, 'name': name} for product_id, name, _ in ranked[:limit]]
+
+    # Function to collect the products with a token starting with prefix (limited to candidates when given). The
+    # SUGGEST_MAX_CANDIDATES kept are the best-ranked (shortest names) among all matches, not the first found.
+    def _prefix_matches(self, prefix, candidates):
+        if candidates is not None and len(candidates) <= SUGGEST_MAX_CANDIDATES:
+            # Few products match the complete words: check their own tokens rather than the prefix's postings
+            return {ordinal for ordinal in candidates
+                    if any(token.startswith(prefix) for token in self._product_tokens[ordinal])}
+
+        # Tokens are [a-z0-9], so every token starting with prefix sorts before prefix + DEL
+        start = bisect.bisect_left(self._tokens, prefix)
+        end = bisect.bisect_left(self._tokens, prefix + '\x7f', start)
+        if end - start > SUGGEST_MEMO_MIN_TOKENS:
+            top, complete = self._top_matches(prefix, start, end)
+            matches = {ordinal for ordinal in top if candidates is None or ordinal in candidates}
+            if candidates is None or complete or len(matches) >= SUGGEST_MAX_CANDIDATES:
+                return matches
+
+        if candidates is not None:
+            # Intersect each matching posting list with the candidates (set operations, no per-posting Python loop),
+            # then keep the best-ranked
+            matches = set()
+            for token in self._tokens[start:end]:
+                matches.update(candidates.intersection(self._postings[token]))
+            if len(matches) > SUGGEST_MAX_CANDIDATES:
+                matches = set(heapq.nsmallest(SUGGEST_MAX_CANDIDATES, matches, key=self._ranks.__getitem__))
+            return matches
+
+        return set(itertools.islice(self._merge_postings(start, end), SUGGEST_MAX_CANDIDATES))
+
+    # Function to get the best SUGGEST_MAX_CANDIDATES ordinals of a broad prefix, merged once and then memoized
+    def _top_matches(self, prefix, start, end):
+        top = self._top.get(prefix)
+        if top is None:
+            ordinals = list(itertools.islice(self._merge_postings(start, end), SUGGEST_MAX_CANDIDATES + 1))
+            top = self._top[prefix] = (ordinals[:SUGGEST_MAX_CANDIDATES], len(ordinals) <= SUGGEST_MAX_CANDIDATES)
+        return top
+
+    # Generator that merges the posting lists of the tokens in [start, end) in rank order, yielding each product once
+    # (a product under several of the tokens has the same rank in each list, so its repeats are adjacent)
+    def _merge_postings(self, start, end):
+        ranks = self._ranks
+        heap = []
+        for number in range(start, end):
+            postings = self._postings[self._tokens[number]]
+            if postings:
+                heap.append((ranks[postings[0]], number, 0, postings))
+        heapq.heapify(heap)
+
+        previous = None
+        while heap:
+            _, number, position, postings = heap[0]
+            ordinal = postings[position]
+            if ordinal != previous:
+                yield ordinal
+                previous = ordinal
+            position += 1
+            if position < len(postings):
+                heapq.heapreplace(heap, (ranks[postings[position]], number, position, postings))
+            else:
+                heapq.heappop(heap)
+
+
+# Generator that reads the products of an NDJSON snapshot from a local path or s3://bucket/key, one line at a time
+def iter_snapshot(location):
+    if location.startswith('s3://'):
+        bucket, _, key = location[len('s3://'):].partition('/')
+        stream = codecs.getreader('utf-8')(get_s3_client().get_object(Bucket=bucket, Key=key)['Body'])
+    else:
+        stream = open(location, encoding='utf-8')
+    try:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    finally:
+        stream.close()
+
+
+# Function to read the suggestion fields of every product with a parallel Scan
+def scan_catalog(segments=SUGGEST_SCAN_SEGMENTS):
+    pages = run_in_parallel(*[
+        (lambda segment=segment: list(scan_items(PRODUCTS_TABLE, attributes=SUGGEST_ATTRIBUTES, segment=segment,
+                                                 total_segments=segments)))
+        for segment in range(segments)
+    ])
+    return [product for page in pages for product in page]
+
+
+# Function to build a fresh index from the configured snapshot, or from the Product table when there is none
+def load_index(snapshot=None):
+    snapshot = snapshot or SUGGEST_SNAPSHOT
+    return PrefixIndex.build(iter_snapshot(snapshot) if snapshot else scan_catalog())
+
+
+# Function to write a snapshot of the suggestion fields of every product to a local path or s3://bucket/key
+def write_snapshot(location):
+    body = ''.join(to_json({name: product[name] for name in SUGGEST_ATTRIBUTES if name in product}) + '\n'
+                   for product in scan_catalog())
+    if location.startswith('s3://'):
+        bucket, _, key = location[len('s3://'):].partition('/')
+        get_s3_client().put_object(Bucket=bucket, Key=key, Body=body.encode('utf-8'), ContentType='application/x-ndjson')
+    else:
+        with open(location, 'w', encoding='utf-8') as snapshot_file:
+            snapshot_file.write(body)
+    return body.count('\n')
+
+
+# The container's index: loaded while the container initializes and reloaded in the background once it is older
+# than the refresh age. Requests never build it themselves.
+_index = None
+_load_started_at = None  # Monotonic time of the last load attempt
+_refreshing = False
+_pending = []  # Products added while a refresh is running, replayed onto the new index
+_index_lock = threading.Lock()
+
+
+# Function to load the index while the container initializes (suggest-products calls it at import, so in Lambda it
+# runs in the init phase). A failure is logged and get_index keeps retrying in the background.
+def preload_index():
+    global _index, _load_started_at
+    if _index is not None:
+        return _index
+    _load_started_at = time.monotonic()
+    try:
+        index = load_index()
+    except Exception as error:
+        print(f"Error loading suggestion index: {error}")
+        return None
+    with _index_lock:
+        if _index is None:
+            _index = index
+    return _index
+
+
+# Function to rebuild the index off the request path and swap it in
+def _refresh():
+    global _index, _refreshing
+    try:
+        index = load_index()
+        with _index_lock:
+            for product in _pending:
+                index.add(product)
+            _index = index
+    except Exception as error:
+        print(f"Error refreshing suggestion index: {error}")  # Keep serving the previous index
+    finally:
+        with _index_lock:
+            _pending.clear()
+            _refreshing = False
+
+
+# Function to get the container's index (None until one has loaded), starting a background reload when it is stale
+# or, while there is none, when the last attempt is old enough to retry
+def get_index():
+    global _refreshing, _load_started_at
+    wait = SUGGEST_REFRESH_SECONDS if _index is not None else SUGGEST_RETRY_SECONDS
+    if not _refreshing and (_load_started_at is None or time.monotonic() - _load_started_at > wait):
+        with _index_lock:
+            if not _refreshing:
+                _refreshing = True
+                _load_started_at = time.monotonic()
+                threading.Thread(target=_refresh, name='suggest-refresh', daemon=True).start()
+    return _index
+
+
+# Function to suggest products for a typed prefix from the container's index (no DynamoDB call on the request path).
+# Returns None while the container has no index yet.
+def suggest_products(query, limit=SUGGEST_DEFAULT_LIMIT):
+    index = get_index()
+    return index.suggest(query, limit) if index is not None else None
+
+
+# Function to add a product this container just wrote, so its suggestions include it without waiting for a refresh
+def add_product(product):
+    with _index_lock:
+        if _refreshing:
+            _pending.append(product)
+        index = _index
+    if index is not None:
+        index.add(product)  # Other containers pick it up once the snapshot is next written and reloaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write the product suggestion snapshot (NDJSON) from the Product table.')
+    parser.add_argument('location', help='local path or s3://bucket/key to write the snapshot to')
+    parser.add_argument('--endpoint-url', help='DynamoDB endpoint, e.g. http://localhost:8000 for DynamoDB Local')
+    args = parser.parse_args(argv)
+
+    if args.endpoint_url:
+        os.environ['DYNAMODB_ENDPOINT_URL'] = args.endpoint_url  # Read when the connection layer first connects
+
+    print(json.dumps({'location': args.location, 'products': write_snapshot(args.location)}))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,41 @@
+"""Shared fixtures: the tests run the helpers and handlers against the in-process AWS stand-in the benchmarks use.
+
+    pip install -r benchmarks/requirements.txt pytest
+    python -m pytest tests
+"""
+import os
+import sys
+
+import pytest
+
+API_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (API_ROOT, os.path.join(API_ROOT, 'benchmarks')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+# Fixture that starts the moto stand-in with every table and bucket created, and drops warm-container state
+@pytest.fixture
+def aws():
+    from local_dynamodb import LocalAWS
+    from helper import db_helper
+
+    with LocalAWS() as local_aws:
+        yield local_aws
+    db_helper.clear_cache()
+    for table_name in list(db_helper._snapshots):
+        db_helper.disable_snapshot(table_name)
+
+
+# Fixture that imports a handler module by its (hyphenated) file name, as Lambda would
+@pytest.fixture
+def load_handler():
+    from handler_bench import load_handler as load
+    return load
+
+
+# Fixture that wraps a body or query string in an API Gateway HTTP API (v2) event
+@pytest.fixture
+def api_event():
+    from handler_bench import api_event as build
+    return build
@@ -0,0 +1,57 @@
+import json
+from decimal import Decimal
+
+from botocore.exceptions import ClientError
+import pytest
+
+from helper.cart import add_cart_lines
+from helper.db_helper import save_item, query_cart, batch_write_items
+
+USER_ID = 'ada@example.com'
+
+
+def _cart():
+    return {row['productId']: row['quantity'] for row in query_cart(USER_ID, 'Carts', consistent_read=True)}
+
+
+def test_batch_add_increments_every_line(aws):
+    save_item({'userId': USER_ID, 'productId': 'prod-1', 'quantity': 2}, 'Carts')
+
+    lines = add_cart_lines(USER_ID, [{'productId': 'prod-1', 'quantity': 3}, {'productId': 'prod-2', 'quantity': 1}])
+
+    assert lines == [{'productId': 'prod-1', 'quantity': 5}, {'productId': 'prod-2', 'quantity': 1}]
+    assert _cart() == {'prod-1': 5, 'prod-2': 1}
+
+
+def test_batch_add_is_all_or_nothing(aws):
+    save_item({'userId': USER_ID, 'productId': 'prod-1', 'quantity': 2}, 'Carts')
+    save_item({'userId': USER_ID, 'productId': 'prod-3', 'quantity': 'broken'}, 'Carts')  # ADD fails on a string
+
+    with pytest.raises(ClientError):
+        add_cart_lines(USER_ID, [{'productId': 'prod-1', 'quantity': 3}, {'productId': 'prod-2', 'quantity': 1},
+                                 {'productId': 'prod-3', 'quantity': 1}])
+
+    # The lines before the failing one were not applied, so a retry cannot add them twice
+    assert _cart() == {'prod-1': 2, 'prod-3': 'broken'}
+
+
+def test_failed_batch_add_releases_the_idempotency_key_without_partial_writes(aws, load_handler, api_event):
+    batch_write_items('Users', put_items=[{'userId': USER_ID, 'name': 'Ada'}])
+    batch_write_items('Product', put_items=[{'productId': f'prod-{number}', 'name': 'Mug', 'price': Decimal(5)}
+                                            for number in (1, 2)])
+    save_item({'userId': USER_ID, 'productId': 'prod-2', 'quantity': 'broken'}, 'Carts')
+    add_to_cart = load_handler('add-to-cart')
+    event = api_event({'userId': USER_ID, 'items': [{'productId': 'prod-1', 'quantity': 3},
+                                                    {'productId': 'prod-2', 'quantity': 1}]})
+    event['headers']['idempotency-key'] = 'batch-1'
+
+    assert add_to_cart(event, None)['statusCode'] == 500
+    assert _cart() == {'prod-2': 'broken'}
+
+    # Once the bad row is fixed, the retry applies every line exactly once
+    save_item({'userId': USER_ID, 'productId': 'prod-2', 'quantity': 1}, 'Carts')
+    response = add_to_cart(event, None)
+    assert response['statusCode'] == 201, response['body']
+    assert json.loads(response['body'])['items'] == [{'productId': 'prod-1', 'quantity': 3},
+                                                     {'productId': 'prod-2', 'quantity': 2}]
+    assert _cart() == {'prod-1': 3, 'prod-2': 2}
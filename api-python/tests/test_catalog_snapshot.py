@@ -0,0 +1,56 @@
+import json
+import time
+from decimal import Decimal
+
+from helper import catalog_snapshot
+from helper.db_helper import save_item, get_item, iter_orders
+
+
+def _product(price, **attributes):
+    return {'productId': 'prod-1', 'name': 'Mug', 'price': Decimal(price), 'stock': 10, **attributes}
+
+
+# Function to snapshot the product at one price, then change it in DynamoDB as another container would
+def _stale_snapshot(path, built_at=None):
+    save_item(_product('10.00'), 'Product')
+    catalog_snapshot.build_snapshot(str(path), built_at=built_at)
+    save_item(_product('12.50'), 'Product')  # Written before the snapshot is enabled, so not marked as written here
+    return catalog_snapshot.enable_catalog_snapshot(str(path))
+
+
+def test_fresh_local_snapshot_serves_reads(aws, tmp_path):
+    _stale_snapshot(tmp_path / 'fresh.snap')
+
+    assert get_item('Product', {'productId': 'prod-1'})['price'] == Decimal('10.00')
+
+
+def test_expired_local_snapshot_falls_back_to_dynamodb(aws, tmp_path):
+    built_at = time.time() - catalog_snapshot.CATALOG_SNAPSHOT_MAX_AGE_SECONDS - 1
+    _stale_snapshot(tmp_path / 'layer.snap', built_at=built_at)
+
+    assert get_item('Product', {'productId': 'prod-1'})['price'] == Decimal('12.50')
+
+
+def test_numbers_round_trip_as_decimal(aws, tmp_path):
+    save_item(_product('12345678901234567890.123456789', tags=['a', Decimal('0.1')]), 'Product')
+    path = tmp_path / 'numbers.snap'
+    catalog_snapshot.build_snapshot(str(path))
+
+    snapshot = catalog_snapshot.open_snapshot(str(path))
+    assert snapshot.get('prod-1') == get_item('Product', {'productId': 'prod-1'}, consistent_read=True)
+    assert isinstance(snapshot.get('prod-1')['stock'], Decimal)
+
+
+def test_checkout_charges_current_price_not_the_snapshot(aws, tmp_path, load_handler, api_event):
+    _stale_snapshot(tmp_path / 'checkout.snap')
+    checkout = load_handler('checkout')
+
+    response = checkout(api_event({
+        'userId': 'ada@example.com', 'shippingAddress': '1 Test Street', 'paymentMethod': 'card',
+        'cartItems': [{'productId': 'prod-1', 'quantity': 2}]
+    }), None)
+
+    assert response['statusCode'] == 201, response['body']
+    order_id = json.loads(response['body'])['orderId']
+    [order] = [order for order in iter_orders('ada@example.com', 'Orders') if order['orderId'] == order_id]
+    assert order['totalAmount'] == Decimal('25.00')
@@ -0,0 +1,34 @@
+import pytest
+
+from helper.response import accepts_gzip, build_response, GZIP_MIN_BYTES
+
+
+def _event(accept_encoding):
+    return {'headers': {'Accept-Encoding': accept_encoding}}
+
+
+@pytest.mark.parametrize('accept_encoding, expected', [
+    ('gzip', True),
+    ('br, GZIP;q=0.5', True),
+    ('x-gzip', True),
+    ('*', True),
+    ('gzip;q=0', False),
+    ('gzip; q=0.000, br', False),
+    ('*;q=0.8, gzip;q=0', False),
+    ('identity', False),
+    ('br;q=1, *;q=0', False),
+    ('gzip;q=oops', False),
+    ('', False),
+])
+def test_accepts_gzip_honours_q_values(accept_encoding, expected):
+    assert accepts_gzip(_event(accept_encoding)) is expected
+
+
+def test_refused_gzip_sends_a_large_body_plain():
+    body = {'text': 'x' * GZIP_MIN_BYTES}
+
+    plain = build_response(200, body, _event('gzip;q=0'))
+    assert plain['isBase64Encoded'] is False and 'Content-Encoding' not in plain['headers']
+
+    compressed = build_response(200, body, _event('gzip'))
+    assert compressed['isBase64Encoded'] is True and compressed['headers']['Content-Encoding'] == 'gzip'
@@ -0,0 +1,66 @@
+from decimal import Decimal
+
+import pytest
+
+from helper import db_helper
+from helper.db_helper import search_products, build_keyword_index_items, price_index_attributes, batch_write_items
+
+
+# Function to store products with their keyword index items and price index keys, as create-product does
+def _save_products(products):
+    batch_write_items('Product', put_items=[{**product, **price_index_attributes(product)} for product in products])
+    batch_write_items('ProductKeywords', put_items=[item for product in products for item in build_keyword_index_items(product)])
+
+
+def _product(number, keywords, price):
+    return {'productId': f'p{number:04d}', 'name': f'Product {number}', 'category': 'Kitchen', 'subcategory': 'Mugs',
+            'price': Decimal(price), 'keywords': keywords}
+
+
+# Fixture that counts the items each index returns to searches (Query responses on the keyword and price indexes)
+@pytest.fixture
+def reads(monkeypatch):
+    counts = {'ProductKeywords': 0, db_helper.CATEGORY_PRICE_INDEX: 0}
+    call = db_helper._call
+
+    def counting_call(operation, table, method, params, index=None, items=None):
+        response = call(operation, table, method, params, index=index, items=items)
+        if operation == 'Query':
+            counts[index or table] = counts.get(index or table, 0) + response.get('ScannedCount', 0)
+        return response
+
+    monkeypatch.setattr(db_helper, '_call', counting_call)
+    return counts
+
+
+@pytest.fixture
+def catalog(aws):
+    # 600 mugs across a wide price range; "enamel" is on 3 of them, "ceramic" on all of them
+    _save_products([_product(number, 'ceramic mug' + (' enamel' if number % 200 == 0 else ''), 1 + number % 100)
+                    for number in range(600)])
+
+
+def test_narrow_keyword_in_wide_price_range_uses_the_keyword_index(catalog, reads):
+    results = search_products({'keywords': 'enamel', 'category': 'Kitchen', 'minPrice': 0, 'maxPrice': 1000})
+
+    assert [product['productId'] for product in results] == ['p0000', 'p0200', 'p0400']
+    assert reads['ProductKeywords'] == 3
+    assert reads[db_helper.CATEGORY_PRICE_INDEX] <= db_helper.SEARCH_PROBE_ITEMS  # Only the first probe page
+
+
+def test_common_keyword_in_narrow_price_range_uses_the_price_index(catalog, reads):
+    results = search_products({'keywords': 'ceramic', 'category': 'Kitchen', 'minPrice': 10, 'maxPrice': 10})
+
+    assert sorted(product['productId'] for product in results) == [f'p{number:04d}' for number in range(9, 600, 100)]
+    assert reads[db_helper.CATEGORY_PRICE_INDEX] == 6
+    assert reads['ProductKeywords'] <= db_helper.SEARCH_PROBE_ITEMS
+
+
+def test_both_paths_return_the_same_results(catalog, monkeypatch):
+    params = {'keywords': 'ceramic enamel', 'category': 'Kitchen', 'minPrice': 1, 'maxPrice': 50}
+
+    with_race = search_products(params, match='any')
+    monkeypatch.setattr(db_helper, 'PRICE_INDEX_ENABLED', False)
+    keyword_only = search_products(params, match='any')
+
+    assert with_race == keyword_only and len(with_race) == 300
@@ -0,0 +1,36 @@
+from helper.suggest import PrefixIndex, SUGGEST_MAX_CANDIDATES
+
+
+def _cables(count):
+    return [{'productId': f'cable-{number}', 'name': f'Cable {number:04d} extra long name'} for number in range(count)]
+
+
+def test_short_match_survives_the_candidate_cap():
+    # "Cup" sorts after every "cable..." token, so an alphabetical walk fills the cap before reaching it
+    index = PrefixIndex.build(_cables(SUGGEST_MAX_CANDIDATES + 100) + [{'productId': 'cup', 'name': 'Cup'}])
+
+    assert index.suggest('c', 5)[0] == {'productId': 'cup', 'name': 'Cup'}
+
+
+def test_added_and_renamed_products_keep_rank_order():
+    index = PrefixIndex.build(_cables(SUGGEST_MAX_CANDIDATES + 100))
+    index.add({'productId': 'cup', 'name': 'Cup'})
+    assert index.suggest('c', 1) == [{'productId': 'cup', 'name': 'Cup'}]
+
+    # Renaming an existing product to a short name moves it ahead of the longer ones
+    index.add({'productId': 'cable-250', 'name': 'Cap'})
+    assert [item['name'] for item in index.suggest('c', 2)] == ['Cap', 'Cup']
+
+    # and a product renamed to a long name drops behind them
+    index.add({'productId': 'cup', 'name': 'Cup holder with an unusually long name'})
+    assert 'cup' not in [item['productId'] for item in index.suggest('c', 5)]
+
+
+def test_complete_words_narrow_the_prefix_match():
+    index = PrefixIndex.build([
+        {'productId': 'p1', 'name': 'Red cup'},
+        {'productId': 'p2', 'name': 'Blue cup'},
+        {'productId': 'p3', 'name': 'Red cable'},
+    ])
+
+    assert [item['productId'] for item in index.suggest('red c')] == ['p1', 'p3']